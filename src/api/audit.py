@@ -0,0 +1,70 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from typing import List, Optional
+from datetime import datetime
+from src.models.audit_log import AuditLogModel
+from src.services.access_control_service import AccessControlService
+from src.services.audit_service import AuditService
+from src.utils.audit_context import AuditContext
+from src.utils.blocking_io import stat_pool
+from src.models.user_session import UserSessionModel
+from src.api.dependencies import get_current_user, get_access_control_service, get_audit_service, get_audit_context
+from src.api.routing import TracedRoute
+
+router = APIRouter(route_class=TracedRoute)
+
+# Resource that guards the audit log itself
+AUDIT_RESOURCE = "audit:logs"
+
+@router.get("/audit/logs", response_model=List[AuditLogModel])
+async def query_audit_logs(
+    start: Optional[datetime] = Query(None, description="Only logs at or after this time"),
+    end: Optional[datetime] = Query(None, description="Only logs before this time"),
+    principal: Optional[str] = Query(None, description="Only logs of this principal"),
+    resource_prefix: Optional[str] = Query(None, description="Only logs whose resource starts with this prefix"),
+    outcome: Optional[str] = Query(None, description="Only logs with this outcome"),
+    limit: int = Query(100, description="Maximum number of logs to return", ge=1, le=1000),
+    user: UserSessionModel = Depends(get_current_user),
+    access_control_service: AccessControlService = Depends(get_access_control_service),
+    audit_service: AuditService = Depends(get_audit_service),
+    audit_context: AuditContext = Depends(get_audit_context)
+):
+    """
+    Query audit logs, newest first.
+    
+    To page through older logs, pass the timestamp of the last log returned
+    as the end of the next query.
+    
+    Args:
+        start: Only logs at or after this time
+        end: Only logs before this time
+        principal: Only logs of this principal
+        resource_prefix: Only logs whose resource starts with this prefix
+        outcome: Only logs with this outcome
+        limit: Maximum number of logs to return
+        user: Current user session (set by the authentication middleware)
+        access_control_service: Application-wide access control service
+        audit_service: Application-wide audit service
+        audit_context: Audit context of the request
+        
+    Returns:
+        List of matching AuditLogModel objects
+    """
+    audit_context.resource = AUDIT_RESOURCE
+    audit_context.action = "read"
+    
+    if not access_control_service.check_access(user, AUDIT_RESOURCE, "read"):
+        audit_context.decision = "deny"
+        audit_context.outcome = "denied"
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied"
+        )
+    audit_context.decision = "allow"
+    
+    # SQLite queries block, so run them off the event loop
+    with audit_context.stage("query"):
+        logs = await stat_pool.run(audit_service.get_logs, limit, start, end, principal, resource_prefix, outcome)
+    
+    audit_context.outcome = "success"
+    audit_context.details = f"Returned {len(logs)} audit logs"
+    return logs
\ No newline at end of file
@@ -0,0 +1,308 @@
+import codecs
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Query
+from pydantic import BaseModel, Field
+from pydantic_core import to_json
+from typing import Any, Dict, List, Optional
+from src.services.file_service import FileService
+from src.services.access_control_service import AccessControlService
+from src.utils.audit_context import AuditContext
+from src.utils.memory_budget import MemoryBudget, MemoryBudgetExceeded, LISTING_ENTRY_BYTES, READ_MEMORY_FACTOR
+from src.utils.rate_limiter import RateLimiter, retry_after_header
+from src.utils.cancellation import OperationCancelled
+from src.utils.listing import EntryRecord, parse_fields
+from src.utils.tracing import span
+from src.utils.blocking_io import stat_pool
+from src.config import settings
+from src.models.user_session import UserSessionModel
+from src.api.dependencies import get_current_user, get_access_control_service, get_audit_context, get_memory_budget, get_rate_limiter
+from src.utils.error_handler import handle_internal_error, handle_server_busy, handle_request_cancelled, handle_invalid_parameter
+from src.api.routing import TracedRoute
+
+router = APIRouter(route_class=TracedRoute)
+
+# Initialize services
+file_service = FileService()
+
+class BatchMetadataRequest(BaseModel):
+    paths: List[str] = Field(..., min_length=1, max_length=settings.BATCH_MAX_PATHS)
+
+class BatchReadRequest(BaseModel):
+    paths: Optional[List[str]] = Field(None, min_length=1, max_length=settings.BATCH_MAX_PATHS)
+    glob: Optional[str] = None
+    encoding: str = "utf-8"
+    max_bytes: int = Field(1048576, ge=1, le=settings.BATCH_READ_MAX_BYTES)
+
+def _error_code(error: Exception) -> str:
+    """Get the error code reported for a path that could not be stat'ed or read"""
+    if isinstance(error, UnicodeDecodeError):
+        return "DECODE_ERROR"
+    # Like /files, paths that fail validation are reported as not found
+    if isinstance(error, (ValueError, FileNotFoundError)):
+        return "FILE_NOT_FOUND"
+    if isinstance(error, PermissionError):
+        return "ACCESS_DENIED"
+    return "INTERNAL_ERROR"
+
+def _charge(rate_limiter: RateLimiter, user: UserSessionModel, audit_context: AuditContext, cost: int):
+    """Charge the user for work beyond what the rate limit middleware charged, or reject with 429"""
+    if not settings.RATE_LIMIT_ENABLED or cost <= 0:
+        return
+    retry_after = rate_limiter.charge(user.principal, user.scopes, cost)
+    if retry_after:
+        audit_context.decision = "throttle"
+        audit_context.outcome = "denied"
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Rate limit exceeded",
+            headers={"Retry-After": retry_after_header(retry_after)}
+        )
+
+@router.post("/batch/metadata")
+async def get_metadata_batch(
+    request: Request,
+    batch: BatchMetadataRequest,
+    fields: Optional[str] = Query(None, description="Comma-separated metadata fields to include, e.g. \"name,type,size\""),
+    user: UserSessionModel = Depends(get_current_user),
+    access_control_service: AccessControlService = Depends(get_access_control_service),
+    audit_context: AuditContext = Depends(get_audit_context),
+    memory_budget: MemoryBudget = Depends(get_memory_budget),
+    rate_limiter: RateLimiter = Depends(get_rate_limiter)
+):
+    """
+    Get the metadata of many files and directories in one request.
+    
+    The request is authenticated and audited once, access to the paths is
+    decided in bulk and the paths are stat'ed in parallel. Directories
+    also need access to list them as directories.
+    
+    Args:
+        request: Incoming request
+        batch: Paths of the files and directories
+        fields: Comma-separated fields to include; only these are computed
+        user: Current user session (set by the authentication middleware)
+        access_control_service: Application-wide access control service
+        audit_context: Audit context of the request
+        memory_budget: Application-wide memory budget
+        rate_limiter: Application-wide rate limiter
+        
+    Returns:
+        Per-path metadata or error code, in the order of the paths
+    """
+    paths = batch.paths
+    audit_context.resource = "batch:metadata"
+    audit_context.action = "list"
+    audit_context.details = f"paths={len(paths)}, fields={fields}"
+    
+    try:
+        projection = parse_fields(fields)
+    except ValueError as e:
+        audit_context.outcome = "error"
+        handle_invalid_parameter(str(e))
+    
+    # The rate limit middleware charged the batch as one stat; charge the rest
+    _charge(rate_limiter, user, audit_context, (len(paths) - 1) * settings.RATE_LIMIT_COST_STAT)
+    
+    # Check access control
+    allowed = access_control_service.check_access_many(user, [f"file:{path}" for path in paths], "list")
+    denied = [path for path, decision in zip(paths, allowed) if not decision]
+    audit_context.decision = "deny" if len(denied) == len(paths) else "partial" if denied else "allow"
+    
+    try:
+        with audit_context.stage("admit"):
+            await memory_budget.admit(request.scope["state"], len(paths) * LISTING_ENTRY_BYTES)
+    except MemoryBudgetExceeded as e:
+        audit_context.outcome = "error"
+        audit_context.details = f"Memory budget exhausted, {e.requested} bytes requested"
+        handle_server_busy("batch:metadata", retry_after_header(e.retry_after))
+    
+    try:
+        with audit_context.stage("stat"):
+            records = await file_service.get_file_records_async(
+                [path for path, decision in zip(paths, allowed) if decision], projection
+            )
+    except OperationCancelled as e:
+        audit_context.outcome = "error"
+        audit_context.details = str(e)
+        handle_request_cancelled("batch:metadata", e.reason)
+    except Exception as e:
+        audit_context.outcome = "error"
+        audit_context.details = f"Error getting metadata: {str(e)}"
+        handle_internal_error(e)
+    
+    # A directory also needs access to list it as a directory, as in listings
+    allowed_paths = [path for path, decision in zip(paths, allowed) if decision]
+    directories = [
+        index for index, record in enumerate(records)
+        if isinstance(record, EntryRecord) and record.kind == "directory"
+    ]
+    decisions = access_control_service.check_access_many(
+        user, [f"directory:{allowed_paths[index]}" for index in directories], "list"
+    )
+    for index, decision in zip(directories, decisions):
+        if not decision:
+            records[index] = PermissionError(f"Access denied: {allowed_paths[index]}")
+            denied.append(allowed_paths[index])
+    audit_context.decision = "deny" if len(denied) == len(paths) else "partial" if denied else "allow"
+    
+    results: List[Dict[str, Any]] = []
+    found = 0
+    records = iter(records)
+    for path, decision in zip(paths, allowed):
+        if not decision:
+            results.append({"path": path, "error": "ACCESS_DENIED"})
+            continue
+        record = next(records)
+        if isinstance(record, EntryRecord):
+            results.append({"path": path, "metadata": record.to_dict(projection)})
+            found += 1
+        else:
+            results.append({"path": path, "error": _error_code(record)})
+    
+    with span("serialize"):
+        body = to_json({"results": results})
+    
+    audit_context.outcome = "success"
+    audit_context.details = f"Got metadata of {found} of {len(paths)} paths"
+    if denied:
+        audit_context.details += f"; denied: {', '.join(denied)}"
+    
+    return Response(content=body, media_type="application/json")
+
+@router.post("/batch/files")
+async def read_files_batch(
+    request: Request,
+    batch: BatchReadRequest,
+    user: UserSessionModel = Depends(get_current_user),
+    access_control_service: AccessControlService = Depends(get_access_control_service),
+    audit_context: AuditContext = Depends(get_audit_context),
+    memory_budget: MemoryBudget = Depends(get_memory_budget),
+    rate_limiter: RateLimiter = Depends(get_rate_limiter)
+):
+    """
+    Read many files in one request, within a total byte budget.
+    
+    The files are given as a list of paths or a glob. The budget is
+    handed out in order; a file that does not fit in what is left is
+    truncated, and files after the budget runs out come back empty and
+    truncated. The files are read in parallel on the read pool.
+    
+    Args:
+        request: Incoming request
+        batch: Paths or glob of the files, their encoding and the byte budget
+        user: Current user session (set by the authentication middleware)
+        access_control_service: Application-wide access control service
+        audit_context: Audit context of the request
+        memory_budget: Application-wide memory budget
+        rate_limiter: Application-wide rate limiter
+        
+    Returns:
+        Per-file content or error code, in the order of the paths
+    """
+    audit_context.resource = "batch:files"
+    audit_context.action = "read"
+    audit_context.details = f"paths={len(batch.paths or [])}, glob={batch.glob}, encoding={batch.encoding}, max_bytes={batch.max_bytes}"
+    
+    if (batch.paths is None) == (batch.glob is None):
+        audit_context.outcome = "error"
+        handle_invalid_parameter("Give either paths or glob")
+    try:
+        codecs.lookup(batch.encoding)
+    except LookupError:
+        audit_context.outcome = "error"
+        handle_invalid_parameter(f"Unknown encoding: {batch.encoding}")
+    
+    try:
+        has_more = False
+        if batch.glob is not None:
+            # A glob walks the tree like a recursive listing; charge for the
+            # walk before doing any filesystem work
+            _charge(rate_limiter, user, audit_context, settings.RATE_LIMIT_COST_RECURSIVE)
+            try:
+                with audit_context.stage("glob"):
+                    paths, has_more = await stat_pool.run(FileService.expand_glob, batch.glob, settings.BATCH_MAX_PATHS)
+            except ValueError as e:
+                audit_context.outcome = "error"
+                handle_invalid_parameter(str(e))
+            # Like listings, matches the user may not read are left out
+            allowed = access_control_service.check_access_many(user, [f"file:{path}" for path in paths], "read")
+            paths = [path for path, decision in zip(paths, allowed) if decision]
+            allowed = [True] * len(paths)
+        else:
+            paths = batch.paths
+            allowed = access_control_service.check_access_many(user, [f"file:{path}" for path in paths], "read")
+        readable = [path for path, decision in zip(paths, allowed) if decision]
+        denied = [path for path, decision in zip(paths, allowed) if not decision]
+        audit_context.decision = "deny" if paths and len(denied) == len(paths) else "partial" if denied else "allow"
+        
+        # The rate limit middleware charged the batch as one stat; charge each read
+        _charge(rate_limiter, user, audit_context, len(readable) * settings.RATE_LIMIT_COST_READ - settings.RATE_LIMIT_COST_STAT)
+        
+        # Hand out the byte budget in order, by file size; directories cannot be read
+        with audit_context.stage("stat"):
+            records = [
+                FileNotFoundError(f"Not a file: {path}") if isinstance(record, EntryRecord) and record.kind != "file" else record
+                for path, record in zip(readable, await file_service.get_file_records_async(readable, ("size",)))
+            ]
+        reads = []
+        remaining = batch.max_bytes
+        for path, record in zip(readable, records):
+            if isinstance(record, EntryRecord):
+                limit = min(record.stat_info.st_size, remaining)
+                remaining -= limit
+                reads.append((path, limit))
+        
+        try:
+            with audit_context.stage("admit"):
+                await memory_budget.admit(request.scope["state"], (batch.max_bytes - remaining) * READ_MEMORY_FACTOR)
+        except MemoryBudgetExceeded as e:
+            audit_context.outcome = "error"
+            audit_context.details = f"Memory budget exhausted, {e.requested} bytes requested"
+            handle_server_busy("batch:files", retry_after_header(e.retry_after))
+        
+        with audit_context.stage("read"):
+            contents = iter(await file_service.read_file_prefixes_async(reads, batch.encoding))
+    except OperationCancelled as e:
+        audit_context.outcome = "error"
+        audit_context.details = str(e)
+        handle_request_cancelled("batch:files", e.reason)
+    except HTTPException:
+        raise
+    except Exception as e:
+        audit_context.outcome = "error"
+        audit_context.details = f"Error reading files: {str(e)}"
+        handle_internal_error(e)
+    
+    results: List[Dict[str, Any]] = []
+    records = iter(records)
+    bytes_read = 0
+    files_read = 0
+    for path, decision in zip(paths, allowed):
+        if not decision:
+            results.append({"path": path, "error": "ACCESS_DENIED"})
+            continue
+        record = next(records)
+        result = next(contents) if isinstance(record, EntryRecord) else record
+        if isinstance(result, Exception):
+            results.append({"path": path, "error": _error_code(result)})
+            continue
+        content, size, truncated = result
+        results.append({
+            "path": path,
+            "content": content,
+            "size": record.stat_info.st_size,
+            "bytes_read": size,
+            "truncated": truncated
+        })
+        bytes_read += size
+        files_read += 1
+    
+    with span("serialize"):
+        body = to_json({"files": results, "bytes_read": bytes_read, "has_more": has_more})
+    
+    audit_context.outcome = "success"
+    audit_context.bytes = bytes_read
+    audit_context.details = f"Read {bytes_read} bytes from {files_read} of {len(paths)} files"
+    if denied:
+        audit_context.details += f"; denied: {', '.join(denied)}"
+    
+    return Response(content=body, media_type="application/json")
\ No newline at end of file
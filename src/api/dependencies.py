@@ -0,0 +1,66 @@
+from fastapi import HTTPException, Request, status
+from src.models.user_session import UserSessionModel
+from src.services.access_control_service import AccessControlService
+from src.services.audit_service import AuditService
+from src.utils.audit_context import AuditContext
+from src.utils.memory_budget import MemoryBudget
+from src.utils.rate_limiter import RateLimiter
+
+def get_current_user(request: Request) -> UserSessionModel:
+    """
+    Dependency to get the current user session.
+    
+    The bearer token is validated once per request by AuthenticationMiddleware,
+    which stores the session on request.state; routes reuse that session here
+    instead of validating the token again.
+    
+    Args:
+        request: Incoming request
+        
+    Returns:
+        UserSessionModel attached by the authentication middleware
+    """
+    user_session = getattr(request.state, "user", None)
+    
+    if user_session is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated"
+        )
+    
+    return user_session
+
+def get_access_control_service(request: Request) -> AccessControlService:
+    """Dependency to get the application-wide AccessControlService"""
+    return request.app.state.access_control_service
+
+def get_audit_service(request: Request) -> AuditService:
+    """Dependency to get the application-wide AuditService"""
+    return request.app.state.audit_service
+
+def get_memory_budget(request: Request) -> MemoryBudget:
+    """Dependency to get the application-wide MemoryBudget"""
+    return request.app.state.memory_budget
+
+def get_rate_limiter(request: Request) -> RateLimiter:
+    """Dependency to get the application-wide RateLimiter"""
+    return request.app.state.rate_limiter
+
+def get_audit_context(request: Request) -> AuditContext:
+    """
+    Dependency to get the audit context of the current request.
+    
+    The context is created by AuditLoggingMiddleware; requests that did not
+    pass through it get a context that is never emitted.
+    
+    Args:
+        request: Incoming request
+        
+    Returns:
+        AuditContext for the request
+    """
+    audit_context = getattr(request.state, "audit_context", None)
+    if audit_context is None:
+        audit_context = AuditContext(request.method, request.url.path)
+        request.state.audit_context = audit_context
+    return audit_context
\ No newline at end of file
@@ -1,172 +1,235 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from typing import List, Union
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Query
+from typing import Dict, List, Optional, Union
 from src.models.directory import DirectoryModel
 from src.models.file import FileModel
 from src.services.directory_service import DirectoryService
-from src.services.auth_service import AuthService
-from src.services.access_control_service import AccessControlService
-from src.services.audit_service import AuditService
+from src.services.access_control_service import AccessControlService, SUBTREE_ALLOW, SUBTREE_DENY
+from src.utils.audit_context import AuditContext
+from src.utils.memory_budget import MemoryBudget, MemoryBudgetExceeded, LISTING_ENTRY_BYTES
+from src.utils.rate_limiter import retry_after_header
+from src.utils.cancellation import OperationCancelled
+from src.utils.listing import COLUMNS, parse_fields, serialize_listing, serialize_columnar_listing
+from src.utils.tracing import span
+from src.config import settings
 from src.models.user_session import UserSessionModel
-from src.utils.error_handler import handle_directory_not_found, handle_permission_denied, handle_internal_error
+from src.api.dependencies import get_current_user, get_access_control_service, get_audit_context, get_memory_budget
+from src.utils.error_handler import handle_directory_not_found, handle_permission_denied, handle_internal_error, handle_server_busy, handle_request_cancelled, handle_invalid_parameter
+from src.api.routing import TracedRoute
 
-router = APIRouter()
+router = APIRouter(route_class=TracedRoute)
 
 # Initialize services
-auth_service = AuthService()
-access_control_service = AccessControlService()
-audit_service = AuditService()
 directory_service = DirectoryService()
 
-def get_current_user(authorization: str = None) -> UserSessionModel:
-    """Dependency to get current user from authorization header"""
-    if not authorization:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Not authenticated"
-        )
-    
-    # Extract token from "Bearer <token>" format
-    if not authorization.startswith("Bearer "):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication scheme"
-        )
-    
-    token = authorization[7:]  # Remove "Bearer " prefix
-    user_session = auth_service.validate_session(token)
-    
-    if not user_session:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or expired token"
-        )
-    
-    return user_session
-
 class DirectoryResponse(DirectoryModel):
     contents: List[Union[FileModel, DirectoryModel]]
     total_count: int
     has_more: bool
 
+def _subtree_decisions(access_control_service: AccessControlService, user: UserSessionModel, prefix: str) -> Dict[str, str]:
+    """Get the subtree decision for listing files and directories under a prefix"""
+    return {
+        kind: access_control_service.check_subtree_access(user, f"{kind}:{prefix}", "list")
+        for kind in ("file", "directory")
+    }
+
+def _may_list(
+    access_control_service: AccessControlService,
+    user: UserSessionModel,
+    decisions: Dict[str, str],
+    kind: str,
+    entry_path: str
+) -> bool:
+    """Check whether the user may list one entry, given the subtree decisions of its directory"""
+    if decisions[kind] == SUBTREE_DENY:
+        return False
+    return decisions[kind] == SUBTREE_ALLOW or access_control_service.check_access(user, f"{kind}:{entry_path}", "list")
+
+def filter_authorized_contents(
+    access_control_service: AccessControlService,
+    user: UserSessionModel,
+    dir_path: str,
+    contents: List[Union[FileModel, DirectoryModel]],
+    recursive: bool = False
+) -> List[Union[FileModel, DirectoryModel]]:
+    """
+    Keep only the entries of a listing the user may list.
+    
+    Subtrees that are uniformly allowed are returned without per-entry checks
+    and subtrees that are uniformly denied are pruned without visiting them.
+    
+    Args:
+        access_control_service: Service used to evaluate policies
+        user: Current user session
+        dir_path: Path of the directory the entries belong to
+        contents: Entries of the directory
+        recursive: Whether to filter the contents of nested directories too
+        
+    Returns:
+        List of entries the user is allowed to see
+    """
+    prefix = dir_path.rstrip("/") + "/"
+    decisions = _subtree_decisions(access_control_service, user, prefix)
+    if decisions["file"] == SUBTREE_ALLOW and decisions["directory"] == SUBTREE_ALLOW:
+        return contents
+    if decisions["file"] == SUBTREE_DENY and decisions["directory"] == SUBTREE_DENY:
+        return []
+    
+    filtered = []
+    for entry in contents:
+        kind = "directory" if isinstance(entry, DirectoryModel) else "file"
+        entry_path = prefix + entry.name
+        if not _may_list(access_control_service, user, decisions, kind, entry_path):
+            continue
+        if recursive and kind == "directory" and entry.contents:
+            # Copy so the cached directory tree is never modified
+            entry = entry.model_copy(update={
+                "contents": filter_authorized_contents(access_control_service, user, entry_path, entry.contents, recursive)
+            })
+        filtered.append(entry)
+    return filtered
+
 @router.get("/directories/{path:path}", response_model=DirectoryResponse)
 async def list_directory(
+    request: Request,
     path: str,
     recursive: bool = Query(False, description="Whether to list contents recursively"),
     limit: int = Query(100, description="Maximum number of items to return", ge=1, le=1000),
     offset: int = Query(0, description="Number of items to skip", ge=0),
-    user: UserSessionModel = Depends(get_current_user)
+    format: str = Query("default", description="Response format, \"default\" or \"columnar\"", pattern="^(default|columnar)$"),
+    fields: Optional[str] = Query(None, description="Comma-separated entry fields to include, e.g. \"name,type,size\""),
+    user: UserSessionModel = Depends(get_current_user),
+    access_control_service: AccessControlService = Depends(get_access_control_service),
+    audit_context: AuditContext = Depends(get_audit_context),
+    memory_budget: MemoryBudget = Depends(get_memory_budget)
 ):
     """
     List the contents of a directory.
     
     Args:
+        request: Incoming request
         path: Path to the directory
         recursive: Whether to list contents recursively
         limit: Maximum number of items to return
         offset: Number of items to skip
-        user: Current user session (from authorization header)
+        format: Response format; "columnar" returns parallel arrays of entry
+            names, types, sizes, modification times and mode bits
+        fields: Comma-separated fields to include; only these are computed
+        user: Current user session (set by the authentication middleware)
+        access_control_service: Application-wide access control service
+        audit_context: Audit context of the request
+        memory_budget: Application-wide memory budget
         
     Returns:
         DirectoryResponse with directory information and contents
     """
-    # Log the access attempt
-    audit_service.log_access(
-        principal=user.principal,
-        resource=f"directory:{path}",
-        action="list",
-        outcome="attempt",
-        details=f"recursive={recursive}, limit={limit}, offset={offset}"
-    )
+    resource = f"directory:{path}"
+    audit_context.resource = resource
+    audit_context.action = "list"
+    audit_context.details = f"recursive={recursive}, limit={limit}, offset={offset}, format={format}, fields={fields}"
+    
+    try:
+        projection = parse_fields(fields)
+    except ValueError as e:
+        audit_context.outcome = "error"
+        handle_invalid_parameter(str(e))
+    if recursive and format == "columnar":
+        audit_context.outcome = "error"
+        handle_invalid_parameter("The columnar format does not support recursive listings")
+    if recursive and projection is not None:
+        audit_context.outcome = "error"
+        handle_invalid_parameter("Field projection is not supported for recursive listings")
+    if format == "columnar" and projection is not None and not set(projection) <= COLUMNS.keys():
+        audit_context.outcome = "error"
+        handle_invalid_parameter(f"The columnar format has no arrays for: {', '.join(sorted(set(projection) - COLUMNS.keys()))}")
     
     # Check access control
-    if not access_control_service.check_access(user, f"directory:{path}", "list"):
-        audit_service.log_access(
-            principal=user.principal,
-            resource=f"directory:{path}",
-            action="list",
-            outcome="denied",
-            details=f"Access denied for directory:{path}"
-        )
+    if not access_control_service.check_access(user, resource, "list"):
+        audit_context.decision = "deny"
+        audit_context.outcome = "denied"
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Access denied"
         )
+    audit_context.decision = "allow"
     
     # Check if directory exists
-    if not directory_service.directory_exists(path):
-        audit_service.log_access(
-            principal=user.principal,
-            resource=f"directory:{path}",
-            action="list",
-            outcome="error",
-            details=f"Directory not found: {path}"
-        )
+    if not await directory_service.directory_exists_async(path):
+        audit_context.outcome = "error"
+        audit_context.details = f"Directory not found: {path}"
         handle_directory_not_found(path)
     
+    # Reserve memory for building the listing; the size of a recursive
+    # listing is unknown until the tree has been walked
+    estimate = settings.MEMORY_BUDGET_RECURSIVE_BYTES if recursive else limit * LISTING_ENTRY_BYTES
+    try:
+        with audit_context.stage("admit"):
+            await memory_budget.admit(request.scope["state"], estimate)
+    except MemoryBudgetExceeded as e:
+        audit_context.outcome = "error"
+        audit_context.details = f"Memory budget exhausted, {e.requested} bytes requested"
+        handle_server_busy(path, retry_after_header(e.retry_after))
+    
     # Get directory information
     try:
-        directory_info = directory_service.get_directory_info(path)
-        
-        # If recursive is False, get paginated contents
+        # If recursive is False, filter the entries before paginating them
+        # so pages hold only visible entries, then build lightweight records
+        # for the page and encode them directly, skipping model validation
         if not recursive:
-            contents = directory_service.list_directory_contents(path, limit, offset)
-            total_count = len(directory_info.contents) if directory_info.contents else 0
+            with audit_context.stage("list"):
+                listing = await directory_service.get_directory_listing_async(path)
+            
+            prefix = path.rstrip("/") + "/"
+            decisions = _subtree_decisions(access_control_service, user, prefix)
+            visible = [
+                (kind, item) for kind, item in listing.entries
+                if _may_list(access_control_service, user, decisions, kind, prefix + item.name)
+            ]
+            total_count = len(visible)
             has_more = total_count > offset + limit
+            with audit_context.stage("stat"):
+                contents = await directory_service.get_entry_records_async(path, visible[offset:offset + limit], projection)
+            
+            serialize = serialize_columnar_listing if format == "columnar" else serialize_listing
+            with span("serialize"):
+                body = serialize(listing.directory, contents, total_count, has_more, projection)
             
-            # Update the response with paginated contents
-            response = DirectoryResponse(
-                id=directory_info.id,
-                name=directory_info.name,
-                path=directory_info.path,
-                size=directory_info.size,
-                modified_at=directory_info.modified_at,
-                created_at=directory_info.created_at,
-                permissions=directory_info.permissions,
-                contents=contents,
-                total_count=total_count,
-                has_more=has_more
-            )
-        else:
-            # For recursive listing, return all contents
-            response = DirectoryResponse(
-                id=directory_info.id,
-                name=directory_info.name,
-                path=directory_info.path,
-                size=directory_info.size,
-                modified_at=directory_info.modified_at,
-                created_at=directory_info.created_at,
-                permissions=directory_info.permissions,
-                contents=directory_info.contents,
-                total_count=len(directory_info.contents) if directory_info.contents else 0,
-                has_more=False
-            )
+            audit_context.outcome = "success"
+            audit_context.details = f"Listed directory with {len(contents)} items"
+            
+            return Response(content=body, media_type="application/json")
         
-        # Log successful access
-        audit_service.log_access(
-            principal=user.principal,
-            resource=f"directory:{path}",
-            action="list",
-            outcome="success",
-            details=f"Listed directory with {len(response.contents)} items"
+        # For recursive listing, return all contents the user may list
+        with audit_context.stage("list"):
+            directory_info = await directory_service.get_directory_info_async(path)
+        contents = filter_authorized_contents(access_control_service, user, path, directory_info.contents, recursive=True)
+        response = DirectoryResponse(
+            id=directory_info.id,
+            name=directory_info.name,
+            path=directory_info.path,
+            size=directory_info.size,
+            modified_at=directory_info.modified_at,
+            created_at=directory_info.created_at,
+            permissions=directory_info.permissions,
+            contents=contents,
+            total_count=len(contents),
+            has_more=False
         )
         
+        audit_context.outcome = "success"
+        audit_context.details = f"Listed directory with {len(response.contents)} items"
+        
         return response
         
     except PermissionError:
-        audit_service.log_access(
-            principal=user.principal,
-            resource=f"directory:{path}",
-            action="list",
-            outcome="error",
-            details=f"Permission denied for directory: {path}"
-        )
+        audit_context.outcome = "error"
+        audit_context.details = f"Permission denied for directory: {path}"
         handle_permission_denied(path)
+    except OperationCancelled as e:
+        audit_context.outcome = "error"
+        audit_context.details = str(e)
+        handle_request_cancelled(path, e.reason)
     except Exception as e:
-        audit_service.log_access(
-            principal=user.principal,
-            resource=f"directory:{path}",
-            action="list",
-            outcome="error",
-            details=f"Error listing directory: {str(e)}"
-        )
+        audit_context.outcome = "error"
+        audit_context.details = f"Error listing directory: {str(e)}"
         handle_internal_error(e)
\ No newline at end of file
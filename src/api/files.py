@@ -1,166 +1,125 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
+from fastapi.responses import PlainTextResponse
 from typing import Optional
 import pathlib
 from src.services.file_service import FileService
-from src.services.auth_service import AuthService
 from src.services.access_control_service import AccessControlService
-from src.services.audit_service import AuditService
+from src.utils.audit_context import AuditContext
+from src.utils.memory_budget import MemoryBudget, MemoryBudgetExceeded, READ_MEMORY_FACTOR
+from src.utils.rate_limiter import retry_after_header
+from src.utils.cancellation import OperationCancelled
 from src.models.user_session import UserSessionModel
-from src.utils.error_handler import handle_file_not_found, handle_permission_denied, handle_internal_error, handle_file_too_large
+from src.api.dependencies import get_current_user, get_access_control_service, get_audit_context, get_memory_budget
+from src.utils.error_handler import handle_file_not_found, handle_permission_denied, handle_internal_error, handle_file_too_large, handle_server_busy, handle_request_cancelled
+from src.api.routing import TracedRoute
 
-router = APIRouter()
+router = APIRouter(route_class=TracedRoute)
 
 # Initialize services
-auth_service = AuthService()
-access_control_service = AccessControlService()
-audit_service = AuditService()
 file_service = FileService()
 
-def get_current_user(authorization: str = None) -> UserSessionModel:
-    """Dependency to get current user from authorization header"""
-    if not authorization:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Not authenticated"
-        )
-    
-    # Extract token from "Bearer <token>" format
-    if not authorization.startswith("Bearer "):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication scheme"
-        )
-    
-    token = authorization[7:]  # Remove "Bearer " prefix
-    user_session = auth_service.validate_session(token)
-    
-    if not user_session:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or expired token"
-        )
-    
-    return user_session
-
-@router.get("/files/{path:path}", response_class=str)
+@router.get("/files/{path:path}", response_class=PlainTextResponse)
 async def read_file(
+    request: Request,
     path: str,
     encoding: str = Query("utf-8", description="File encoding"),
     limit: int = Query(10485760, description="Maximum number of bytes to read (default: 10MB)", ge=1, le=104857600),
-    user: UserSessionModel = Depends(get_current_user)
+    user: UserSessionModel = Depends(get_current_user),
+    access_control_service: AccessControlService = Depends(get_access_control_service),
+    audit_context: AuditContext = Depends(get_audit_context),
+    memory_budget: MemoryBudget = Depends(get_memory_budget)
 ):
     """
     Read the contents of a file.
     
     Args:
+        request: Incoming request
         path: Path to the file
         encoding: File encoding (default: utf-8)
         limit: Maximum number of bytes to read (default: 10MB)
-        user: Current user session (from authorization header)
+        user: Current user session (set by the authentication middleware)
+        access_control_service: Application-wide access control service
+        audit_context: Audit context of the request
+        memory_budget: Application-wide memory budget
         
     Returns:
         File content as string
     """
-    # Log the access attempt
-    audit_service.log_access(
-        principal=user.principal,
-        resource=f"file:{path}",
-        action="read",
-        outcome="attempt",
-        details=f"encoding={encoding}, limit={limit}"
-    )
+    resource = f"file:{path}"
+    audit_context.resource = resource
+    audit_context.action = "read"
+    audit_context.details = f"encoding={encoding}, limit={limit}"
     
     # Check access control
-    if not access_control_service.check_access(user, f"file:{path}", "read"):
-        audit_service.log_access(
-            principal=user.principal,
-            resource=f"file:{path}",
-            action="read",
-            outcome="denied",
-            details=f"Access denied for file:{path}"
-        )
+    if not access_control_service.check_access(user, resource, "read"):
+        audit_context.decision = "deny"
+        audit_context.outcome = "denied"
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Access denied"
         )
+    audit_context.decision = "allow"
     
     # Check if file exists
-    if not file_service.file_exists(path):
-        audit_service.log_access(
-            principal=user.principal,
-            resource=f"file:{path}",
-            action="read",
-            outcome="error",
-            details=f"File not found: {path}"
-        )
+    if not await file_service.file_exists_async(path):
+        audit_context.outcome = "error"
+        audit_context.details = f"File not found: {path}"
         handle_file_not_found(path)
     
+    # Reserve memory for the content before reading it; reads of files that
+    # cannot be stat'ed reserve the full limit and fail in the read below
+    try:
+        file_size = (await file_service.get_file_info_async(path)).size
+    except (OSError, ValueError):
+        file_size = limit
+    try:
+        with audit_context.stage("admit"):
+            await memory_budget.admit(request.scope["state"], min(file_size, limit) * READ_MEMORY_FACTOR)
+    except MemoryBudgetExceeded as e:
+        audit_context.outcome = "error"
+        audit_context.details = f"Memory budget exhausted, {e.requested} bytes requested"
+        handle_server_busy(path, retry_after_header(e.retry_after))
+    
     # Read file content
     try:
-        content = file_service.read_file_content(path, encoding, limit)
+        with audit_context.stage("read"):
+            content = await file_service.read_file_content_async(path, encoding, limit)
         
-        # Log successful access
-        audit_service.log_access(
-            principal=user.principal,
-            resource=f"file:{path}",
-            action="read",
-            outcome="success",
-            details=f"Read {len(content)} characters from file"
-        )
+        audit_context.outcome = "success"
+        audit_context.bytes = len(content)
+        audit_context.details = f"Read {len(content)} characters from file"
         
         return content
         
     except PermissionError:
-        audit_service.log_access(
-            principal=user.principal,
-            resource=f"file:{path}",
-            action="read",
-            outcome="error",
-            details=f"Permission denied for file: {path}"
-        )
+        audit_context.outcome = "error"
+        audit_context.details = f"Permission denied for file: {path}"
         handle_permission_denied(path)
     except UnicodeDecodeError:
-        audit_service.log_access(
-            principal=user.principal,
-            resource=f"file:{path}",
-            action="read",
-            outcome="error",
-            details=f"Unable to decode file with encoding: {encoding}"
-        )
+        audit_context.outcome = "error"
+        audit_context.details = f"Unable to decode file with encoding: {encoding}"
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Unable to decode file with encoding: {encoding}"
         )
     except ValueError as e:
+        audit_context.outcome = "error"
         if "exceeds limit" in str(e):
             # Handle file too large error
             try:
                 file_size = pathlib.Path(path).stat().st_size
-                audit_service.log_access(
-                    principal=user.principal,
-                    resource=f"file:{path}",
-                    action="read",
-                    outcome="error",
-                    details=f"File too large: {file_size} bytes, limit: {limit} bytes"
-                )
+                audit_context.details = f"File too large: {file_size} bytes, limit: {limit} bytes"
                 handle_file_too_large(path, file_size, limit)
             except:
                 handle_internal_error(e)
         else:
-            audit_service.log_access(
-                principal=user.principal,
-                resource=f"file:{path}",
-                action="read",
-                outcome="error",
-                details=f"Error reading file: {str(e)}"
-            )
+            audit_context.details = f"Error reading file: {str(e)}"
             handle_internal_error(e)
+    except OperationCancelled as e:
+        audit_context.outcome = "error"
+        audit_context.details = str(e)
+        handle_request_cancelled(path, e.reason)
     except Exception as e:
-        audit_service.log_access(
-            principal=user.principal,
-            resource=f"file:{path}",
-            action="read",
-            outcome="error",
-            details=f"Error reading file: {str(e)}"
-        )
+        audit_context.outcome = "error"
+        audit_context.details = f"Error reading file: {str(e)}"
         handle_internal_error(e)
\ No newline at end of file
@@ -0,0 +1,100 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import PlainTextResponse
+from typing import Dict, List
+from src.utils.directory_cache import directory_cache
+from src.utils.blocking_io import stat_pool, read_pool
+from src.utils.single_flight import single_flight
+from src.utils.metrics import format_metric
+
+router = APIRouter()
+
+# Content type of the Prometheus text exposition format
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def _hit_ratio(stats: Dict[str, int]) -> float:
+    """Get the hit ratio of cache counters, 0 before the first lookup"""
+    lookups = stats["hits"] + stats["misses"]
+    return stats["hits"] / lookups if lookups else 0.0
+
+def render_service_metrics(request: Request) -> List[str]:
+    """
+    Render the gauges and counters of the application services.
+    
+    Args:
+        request: Incoming request, used to reach the application services
+        
+    Returns:
+        Exposition lines
+    """
+    state = request.app.state
+    sessions = state.auth_service.get_session_stats()
+    decisions = state.access_control_service.get_cache_stats()
+    evaluations = state.access_control_service.get_evaluation_stats()
+    directories = directory_cache.get_stats()
+    audit = state.audit_service.writer.get_stats()
+    
+    lines = format_metric("mcp_sessions", "gauge", "Sessions in the session store by state", [
+        ((("state", "live"),), sessions["live"]),
+        ((("state", "expired"),), sessions["expired"]),
+    ])
+    lines += format_metric("mcp_sessions_evicted_total", "counter", "Expired sessions evicted by the sweeper", [
+        ((), sessions["evicted_total"])
+    ])
+    lines += format_metric("mcp_policies", "gauge", "Access policies in the active policy set", [
+        ((), len(state.access_control_service.policies))
+    ])
+    lines += format_metric("mcp_policy_evaluations_total", "counter", "Policy evaluations that missed the decision cache", [
+        ((("kind", "access"),), evaluations["evaluations"]),
+        ((("kind", "subtree"),), evaluations["subtree_evaluations"]),
+    ])
+    for cache, title, stats in (("access_decision", "Access decision", decisions), ("directory", "Directory", directories)):
+        lines += format_metric(f"mcp_{cache}_cache_hits_total", "counter", f"{title} cache hits", [((), stats["hits"])])
+        lines += format_metric(f"mcp_{cache}_cache_misses_total", "counter", f"{title} cache misses", [((), stats["misses"])])
+        lines += format_metric(f"mcp_{cache}_cache_hit_ratio", "gauge", f"{title} cache hit ratio since startup", [((), _hit_ratio(stats))])
+        lines += format_metric(f"mcp_{cache}_cache_size", "gauge", f"{title} cache entries", [((), stats["size"])])
+    lines += format_metric("mcp_audit_records_written_total", "counter", "Audit records written to the audit log", [((), audit["written"])])
+    lines += format_metric("mcp_audit_records_dropped_total", "counter", "Audit records dropped because the queue was full", [((), audit["dropped"])])
+    lines += format_metric("mcp_audit_records_queued", "gauge", "Audit records waiting for the writer", [((), audit["queued"])])
+    pools = [(pool.name, pool.get_stats()) for pool in (stat_pool, read_pool)]
+    lines += format_metric("mcp_io_pool_workers", "gauge", "Threads of the blocking I/O pools", [
+        ((("pool", name),), stats["workers"]) for name, stats in pools
+    ])
+    lines += format_metric("mcp_io_pool_in_flight", "gauge", "Blocking I/O calls running or queued", [
+        ((("pool", name),), stats["in_flight"]) for name, stats in pools
+    ])
+    lines += format_metric("mcp_io_pool_completed_total", "counter", "Blocking I/O calls completed", [
+        ((("pool", name),), stats["completed"]) for name, stats in pools
+    ])
+    limits = state.rate_limiter.get_stats()
+    lines += format_metric("mcp_rate_limited_total", "counter", "Requests rejected by the per-principal rate limiter", [
+        ((("reason", "rate"),), limits["rejected_rate"]),
+        ((("reason", "concurrency"),), limits["rejected_concurrency"]),
+    ])
+    lines += format_metric("mcp_rate_limit_principals", "gauge", "Principals with a rate limit bucket", [((), limits["principals"])])
+    budget = state.memory_budget.get_stats()
+    lines += format_metric("mcp_memory_budget_bytes", "gauge", "Memory budget for requests in flight", [((), budget["max_bytes"])])
+    lines += format_metric("mcp_memory_budget_in_use_bytes", "gauge", "Estimated bytes reserved by requests in flight", [((), budget["in_use"])])
+    lines += format_metric("mcp_memory_budget_utilization", "gauge", "Fraction of the memory budget in use", [((), budget["utilization"])])
+    lines += format_metric("mcp_memory_budget_waiting", "gauge", "Requests queued for room in the memory budget", [((), budget["waiting"])])
+    lines += format_metric("mcp_memory_budget_queued_total", "counter", "Requests that had to queue for room in the memory budget", [((), budget["queued"])])
+    lines += format_metric("mcp_memory_budget_rejected_total", "counter", "Requests rejected because the memory budget stayed full", [((), budget["rejected"])])
+    flights = single_flight.get_stats()
+    lines += format_metric("mcp_single_flight_calls_total", "counter", "Filesystem calls by whether they ran or joined an identical call in progress", [
+        ((("result", "executed"),), flights["executed"]),
+        ((("result", "coalesced"),), flights["coalesced"]),
+    ])
+    return lines
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics(request: Request):
+    """
+    Expose metrics in the Prometheus text format.
+    
+    Args:
+        request: Incoming request
+        
+    Returns:
+        Metrics exposition
+    """
+    lines = request.app.state.request_metrics.render() + render_service_metrics(request)
+    return PlainTextResponse("\n".join(lines) + "\n", media_type=PROMETHEUS_CONTENT_TYPE)
\ No newline at end of file
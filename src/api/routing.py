@@ -0,0 +1,43 @@
+import inspect
+import time
+from functools import wraps
+from typing import Any, Callable
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from src.utils.tracing import current_trace, span
+
+class TracedRoute(APIRoute):
+    """
+    Route that splits handling time into the endpoint and the framework work around it.
+    
+    The endpoint runs in an "endpoint" span; everything else the route
+    handler does (parameter parsing, dependencies, response validation and
+    serialization) is recorded as "serialize".
+    """
+    
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs):
+        if inspect.iscoroutinefunction(endpoint):
+            original = endpoint
+            
+            @wraps(original)
+            async def endpoint(*args, **endpoint_kwargs):
+                with span("endpoint"):
+                    return await original(*args, **endpoint_kwargs)
+        super().__init__(path, endpoint, **kwargs)
+    
+    def get_route_handler(self) -> Callable[[Request], Any]:
+        handler = super().get_route_handler()
+        
+        async def traced_handler(request: Request) -> Response:
+            trace = current_trace()
+            if trace is None:
+                return await handler(request)
+            endpoint_before = trace.spans.get("endpoint", (0.0,))[0]
+            start_time = time.perf_counter()
+            try:
+                return await handler(request)
+            finally:
+                total = (time.perf_counter() - start_time) * 1000
+                endpoint = trace.spans.get("endpoint", (0.0,))[0] - endpoint_before
+                trace.add("serialize", max(total - endpoint, 0.0))
+        return traced_handler
\ No newline at end of file
@@ -14,4 +14,60 @@ class Settings:
     SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key")
     ALLOWED_DIRECTORIES = os.getenv("ALLOWED_DIRECTORIES", "/tmp").split(",")
 
+    # Session configuration
+    SESSION_SWEEP_INTERVAL = float(os.getenv("SESSION_SWEEP_INTERVAL", 60))
+
+    # Access control configuration
+    ACCESS_DECISION_CACHE_SIZE = int(os.getenv("ACCESS_DECISION_CACHE_SIZE", 10000))
+    POLICY_FILE = os.getenv("POLICY_FILE", "policies.json")
+    POLICY_RELOAD_INTERVAL = float(os.getenv("POLICY_RELOAD_INTERVAL", 5))
+
+    # Audit configuration
+    AUDIT_LOG_FILE = os.getenv("AUDIT_LOG_FILE", "audit.log")
+    AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", 256))
+    AUDIT_FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL", 0.5))
+    AUDIT_QUEUE_SIZE = int(os.getenv("AUDIT_QUEUE_SIZE", 10000))
+    AUDIT_OVERFLOW_POLICY = os.getenv("AUDIT_OVERFLOW_POLICY", "drop")
+    AUDIT_BLOCK_TIMEOUT = float(os.getenv("AUDIT_BLOCK_TIMEOUT", 0.1))
+    AUDIT_DB_FILE = os.getenv("AUDIT_DB_FILE", "audit.db")
+    AUDIT_MAX_BYTES = int(os.getenv("AUDIT_MAX_BYTES", 104857600))
+    AUDIT_ROTATE_INTERVAL = float(os.getenv("AUDIT_ROTATE_INTERVAL", 86400))
+    AUDIT_RETENTION_DAYS = float(os.getenv("AUDIT_RETENTION_DAYS", 30))
+    AUDIT_MAX_SEGMENTS = int(os.getenv("AUDIT_MAX_SEGMENTS", 0))
+    AUDIT_SUCCESS_SAMPLE_RATE = float(os.getenv("AUDIT_SUCCESS_SAMPLE_RATE", 1.0))
+    AUDIT_SAMPLING_RULES = os.getenv("AUDIT_SAMPLING_RULES", "[]")
+    AUDIT_ROLLUP_INTERVAL = float(os.getenv("AUDIT_ROLLUP_INTERVAL", 60))
+
+    # Tracing configuration
+    SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "false").lower() == "true"
+    TRACE_LOG_SAMPLE_RATE = float(os.getenv("TRACE_LOG_SAMPLE_RATE", 0))
+
+    # Blocking I/O configuration
+    IO_STAT_WORKERS = int(os.getenv("IO_STAT_WORKERS", 16))
+    IO_READ_WORKERS = int(os.getenv("IO_READ_WORKERS", 4))
+
+    # Rate limit configuration
+    RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    RATE_LIMIT_RATE = float(os.getenv("RATE_LIMIT_RATE", 50))
+    RATE_LIMIT_BURST = float(os.getenv("RATE_LIMIT_BURST", 200))
+    RATE_LIMIT_MAX_IN_FLIGHT = int(os.getenv("RATE_LIMIT_MAX_IN_FLIGHT", 16))
+    RATE_LIMIT_SCOPE_LIMITS = os.getenv("RATE_LIMIT_SCOPE_LIMITS", "{}")
+    RATE_LIMIT_COST_STAT = float(os.getenv("RATE_LIMIT_COST_STAT", 1))
+    RATE_LIMIT_COST_READ = float(os.getenv("RATE_LIMIT_COST_READ", 2))
+    RATE_LIMIT_COST_LARGE_READ = float(os.getenv("RATE_LIMIT_COST_LARGE_READ", 10))
+    RATE_LIMIT_COST_RECURSIVE = float(os.getenv("RATE_LIMIT_COST_RECURSIVE", 20))
+    RATE_LIMIT_LARGE_READ_BYTES = int(os.getenv("RATE_LIMIT_LARGE_READ_BYTES", 1048576))
+
+    # Memory budget configuration
+    MEMORY_BUDGET_BYTES = int(os.getenv("MEMORY_BUDGET_BYTES", 268435456))
+    MEMORY_BUDGET_QUEUE_TIMEOUT = float(os.getenv("MEMORY_BUDGET_QUEUE_TIMEOUT", 5))
+    MEMORY_BUDGET_RECURSIVE_BYTES = int(os.getenv("MEMORY_BUDGET_RECURSIVE_BYTES", 8388608))
+
+    # Request cancellation configuration
+    REQUEST_TIMEOUT = float(os.getenv("REQUEST_TIMEOUT", 60))
+
+    # Batch configuration
+    BATCH_MAX_PATHS = int(os.getenv("BATCH_MAX_PATHS", 1000))
+    BATCH_READ_MAX_BYTES = int(os.getenv("BATCH_READ_MAX_BYTES", 10485760))
+
 settings = Settings()
\ No newline at end of file
@@ -1,38 +1,123 @@
 import sys
 import os
+import json
 
 # Add the parent directory to the Python path so we can import from src
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from src.api.directories import router as directories_router
 from src.api.files import router as files_router
+from src.api.batch import router as batch_router
+from src.api.audit import router as audit_router
+from src.api.metrics import router as metrics_router
 from src.services.auth_service import AuthService
 from src.services.access_control_service import AccessControlService
 from src.services.audit_service import AuditService
+from src.services.policy_loader import PolicyLoader
 from src.middleware.auth_middleware import AuthenticationMiddleware
 from src.middleware.access_control_middleware import AccessControlMiddleware
 from src.middleware.audit_logging_middleware import AuditLoggingMiddleware
-
-app = FastAPI(title="MCP Server for LLM File Browsing")
+from src.middleware.metrics_middleware import MetricsMiddleware
+from src.middleware.rate_limit_middleware import RateLimitMiddleware
+from src.middleware.memory_budget_middleware import MemoryBudgetMiddleware
+from src.middleware.cancellation_middleware import CancellationMiddleware
+from src.middleware.tracing_middleware import TracingMiddleware
+from src.utils.metrics import request_metrics
+from src.utils.blocking_io import stat_pool, read_pool
+from src.utils.rate_limiter import RateLimiter, RateLimits
+from src.utils.memory_budget import MemoryBudget
+from src.config import settings
 
 # Initialize services
 auth_service = AuthService()
 access_control_service = AccessControlService()
 audit_service = AuditService()
+policy_loader = PolicyLoader(access_control_service, settings.POLICY_FILE, settings.POLICY_RELOAD_INTERVAL)
+rate_limiter = RateLimiter(
+    RateLimits(settings.RATE_LIMIT_RATE, settings.RATE_LIMIT_BURST, settings.RATE_LIMIT_MAX_IN_FLIGHT),
+    {scope: RateLimits(**limits) for scope, limits in json.loads(settings.RATE_LIMIT_SCOPE_LIMITS).items()}
+)
+memory_budget = MemoryBudget(settings.MEMORY_BUDGET_BYTES, settings.MEMORY_BUDGET_QUEUE_TIMEOUT)
 
-# Add middleware
-app.add_middleware(AuthenticationMiddleware, auth_service=auth_service)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load access policies and watch the policy file for changes
+    policy_loader.load()
+    policy_loader.start_watcher()
+    # Start background maintenance tasks
+    auth_service.start_sweeper(settings.SESSION_SWEEP_INTERVAL)
+    audit_service.start_rollup_flusher(settings.AUDIT_ROLLUP_INTERVAL)
+    yield
+    # Stop background maintenance tasks
+    await auth_service.stop_sweeper()
+    await policy_loader.stop_watcher()
+    # Write the last rollup and any queued audit records before exiting
+    await audit_service.stop_rollup_flusher()
+    audit_service.close()
+    # Let in-flight filesystem calls finish and stop the I/O threads
+    stat_pool.shutdown()
+    read_pool.shutdown()
+
+app = FastAPI(title="MCP Server for LLM File Browsing", lifespan=lifespan)
+
+# Share one instance of each service between the middleware and the routes
+app.state.auth_service = auth_service
+app.state.access_control_service = access_control_service
+app.state.audit_service = audit_service
+app.state.request_metrics = request_metrics
+app.state.rate_limiter = rate_limiter
+app.state.memory_budget = memory_budget
+
+# Add middleware. The last middleware added is the outermost one, so requests
+# pass through tracing, metrics, audit logging, cancellation, authentication,
+# rate limiting, then access control; the session stored on request.state by
+# authentication is reused by everything after it, including the route
+# dependencies. Memory the routes reserve is released by the innermost
+# middleware once they have answered.
+app.add_middleware(MemoryBudgetMiddleware, memory_budget=memory_budget)
 app.add_middleware(AccessControlMiddleware, access_control_service=access_control_service)
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(
+        RateLimitMiddleware,
+        rate_limiter=rate_limiter,
+        costs={
+            "stat": settings.RATE_LIMIT_COST_STAT,
+            "read": settings.RATE_LIMIT_COST_READ,
+            "large_read": settings.RATE_LIMIT_COST_LARGE_READ,
+            "recursive": settings.RATE_LIMIT_COST_RECURSIVE,
+        },
+        large_read_bytes=settings.RATE_LIMIT_LARGE_READ_BYTES
+    )
+app.add_middleware(AuthenticationMiddleware, auth_service=auth_service)
+app.add_middleware(
+    CancellationMiddleware,
+    request_timeout=settings.REQUEST_TIMEOUT,
+    path_prefixes=("/files/", "/directories/", "/batch/")
+)
 app.add_middleware(AuditLoggingMiddleware, audit_service=audit_service)
+app.add_middleware(MetricsMiddleware, request_metrics=request_metrics)
+app.add_middleware(
+    TracingMiddleware,
+    server_timing=settings.SERVER_TIMING_ENABLED,
+    sample_rate=settings.TRACE_LOG_SAMPLE_RATE
+)
+
+@app.get("/health")
+async def health():
+    """Report server liveness and session store gauges"""
+    return {"status": "ok", "sessions": auth_service.get_session_stats()}
 
 # Include routers
 app.include_router(directories_router)
 app.include_router(files_router)
+app.include_router(batch_router)
+app.include_router(audit_router)
+app.include_router(metrics_router)
 
 if __name__ == "__main__":
     import uvicorn
-    from src.config import settings
     
     uvicorn.run(
         "src.main:app",
@@ -1,51 +1,68 @@
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
-from starlette.exceptions import HTTPException
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
 from src.services.access_control_service import AccessControlService
 from src.models.user_session import UserSessionModel
+from src.utils.audit_context import audit_stage
 import logging
 
 logger = logging.getLogger("access_control_middleware")
 
-class AccessControlMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app, access_control_service: AccessControlService):
-        super().__init__(app)
+class AccessControlMiddleware:
+    def __init__(self, app: ASGIApp, access_control_service: AccessControlService):
+        self.app = app
         self.access_control_service = access_control_service
     
-    async def dispatch(self, request: Request, call_next):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        path = scope["path"]
+        state = scope.setdefault("state", {})
+        
         # Skip access control for certain paths
-        if request.url.path in ["/health", "/metrics"]:
-            return await call_next(request)
+        if path in ["/health", "/metrics"]:
+            await self.app(scope, receive, send)
+            return
         
         # Skip access control if no user is authenticated
-        if not hasattr(request.state, "user") or request.state.user is None:
-            return await call_next(request)
-        
-        user_session = request.state.user
+        user_session = state.get("user")
+        if user_session is None:
+            await self.app(scope, receive, send)
+            return
         
         # Determine resource and action based on request
         resource = None
         action = None
         
-        if request.url.path.startswith("/directories/"):
-            resource = f"directory:{request.url.path[13:]}"  # Remove "/directories/" prefix
-            if request.method == "GET":
+        if path.startswith("/directories/"):
+            resource = f"directory:{path[13:]}"  # Remove "/directories/" prefix
+            if scope["method"] == "GET":
                 action = "list"
-        elif request.url.path.startswith("/files/"):
-            resource = f"file:{request.url.path[7:]}"  # Remove "/files/" prefix
-            if request.method == "GET":
+        elif path.startswith("/files/"):
+            resource = f"file:{path[7:]}"  # Remove "/files/" prefix
+            if scope["method"] == "GET":
                 action = "read"
         
         # If we can't determine resource or action, proceed without access control
         if not resource or not action:
-            return await call_next(request)
+            await self.app(scope, receive, send)
+            return
         
         # Check access
-        if not self.access_control_service.check_access(user_session, resource, action):
+        audit_context = state.get("audit_context")
+        with audit_stage(audit_context, "authz"):
+            allowed = self.access_control_service.check_access(user_session, resource, action)
+        if audit_context is not None:
+            audit_context.resource = resource
+            audit_context.action = action
+            audit_context.decision = "allow" if allowed else "deny"
+        
+        if not allowed:
             logger.warning(f"Access denied for user {user_session.principal} to {resource} with action {action}")
-            raise HTTPException(status_code=403, detail="Access denied")
+            response = JSONResponse(status_code=403, content={"detail": "Access denied"})
+            await response(scope, receive, send)
+            return
         
         # Continue with the request
-        response = await call_next(request)
-        return response
\ No newline at end of file
+        await self.app(scope, receive, send)
\ No newline at end of file
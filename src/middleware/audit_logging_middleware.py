@@ -1,71 +1,58 @@
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 import logging
-import time
 from src.services.audit_service import AuditService
-from src.models.user_session import UserSessionModel
+from src.utils.audit_context import AuditContext
 
 logger = logging.getLogger("audit_middleware")
 
-class AuditLoggingMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app, audit_service: AuditService):
-        super().__init__(app)
+class AuditLoggingMiddleware:
+    def __init__(self, app: ASGIApp, audit_service: AuditService):
+        self.app = app
         self.audit_service = audit_service
     
-    async def dispatch(self, request: Request, call_next):
-        # Record start time
-        start_time = time.time()
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
         
-        # Get user information if available
-        user_principal = "anonymous"
-        if hasattr(request.state, "user") and request.state.user:
-            user_principal = request.state.user.principal
+        method = scope["method"]
+        path = scope["path"]
         
         # Get client IP
-        client_ip = request.client.host if request.client else "unknown"
+        client = scope.get("client")
+        client_ip = client[0] if client else "unknown"
         
-        # Log the request
-        logger.info(f"Request: {request.method} {request.url.path} from {user_principal} ({client_ip})")
+        # Collect everything known about the request into one audit record
+        audit_context = AuditContext(method, path, client_ip)
+        state = scope.setdefault("state", {})
+        state["audit_context"] = audit_context
+        
+        async def send_with_status(message: Message) -> None:
+            # Only the status is read; the body passes through untouched
+            if message["type"] == "http.response.start":
+                audit_context.status_code = message["status"]
+            await send(message)
         
         try:
             # Process the request
-            response = await call_next(request)
-            
-            # Calculate duration
-            duration = time.time() - start_time
-            
-            # Log the response
-            logger.info(f"Response: {response.status_code} for {request.method} {request.url.path} (Duration: {duration:.3f}s)")
-            
-            # Log to audit service
-            self.audit_service.log_access(
-                principal=user_principal,
-                resource=request.url.path,
-                action=request.method.lower(),
-                outcome="success" if response.status_code < 400 else "error",
-                details=f"Status: {response.status_code}, Duration: {duration:.3f}s",
-                ip_address=client_ip
-            )
-            
-            return response
+            await self.app(scope, receive, send_with_status)
+            logger.debug(f"{audit_context.status_code} for {method} {path} from {client_ip} ({audit_context.elapsed_ms():.3f}ms)")
             
         except Exception as e:
-            # Calculate duration
-            duration = time.time() - start_time
+            if not audit_context.status_code:
+                audit_context.status_code = 500
+            audit_context.outcome = "error"
+            audit_context.details = f"Exception: {str(e)}"
             
             # Log the exception
-            logger.error(f"Exception: {str(e)} for {request.method} {request.url.path} (Duration: {duration:.3f}s)")
-            
-            # Log to audit service
-            self.audit_service.log_access(
-                principal=user_principal,
-                resource=request.url.path,
-                action=request.method.lower(),
-                outcome="error",
-                details=f"Exception: {str(e)}, Duration: {duration:.3f}s",
-                ip_address=client_ip
-            )
+            logger.error(f"Exception: {str(e)} for {method} {path} ({audit_context.elapsed_ms():.3f}ms)")
             
             # Re-raise the exception
-            raise
\ No newline at end of file
+            raise
+        
+        finally:
+            # The session is attached by the authentication middleware further in
+            user_session = state.get("user")
+            if user_session is not None:
+                audit_context.principal = user_session.principal
+            self.audit_service.log_request(audit_context)
\ No newline at end of file
@@ -1,52 +1,67 @@
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
-from starlette.exceptions import HTTPException
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
 from src.services.auth_service import AuthService
 from src.models.user_session import UserSessionModel
+from src.utils.audit_context import audit_stage
 import logging
 
 logger = logging.getLogger("auth_middleware")
 
-class AuthenticationMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app, auth_service: AuthService):
-        super().__init__(app)
+class AuthenticationMiddleware:
+    def __init__(self, app: ASGIApp, auth_service: AuthService):
+        self.app = app
         self.auth_service = auth_service
     
-    async def dispatch(self, request: Request, call_next):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        path = scope["path"]
+        # Request state shared with request.state further in
+        state = scope.setdefault("state", {})
+        
         # Skip authentication for certain paths (e.g., health checks)
-        if request.url.path in ["/health", "/metrics"]:
-            return await call_next(request)
+        if path in ["/health", "/metrics"]:
+            await self.app(scope, receive, send)
+            return
         
         # Extract authorization header
-        authorization = request.headers.get("Authorization")
+        authorization = Headers(scope=scope).get("authorization")
         
         if not authorization:
             # For some endpoints, we might allow unauthenticated access
             # But for file/directory operations, authentication is required
-            if request.url.path.startswith("/directories/") or request.url.path.startswith("/files/"):
-                logger.warning(f"Authentication required for {request.url.path}")
-                raise HTTPException(status_code=401, detail="Authentication required")
+            if path.startswith("/directories/") or path.startswith("/files/"):
+                logger.warning(f"Authentication required for {path}")
+                response = JSONResponse(status_code=401, content={"detail": "Authentication required"})
+                await response(scope, receive, send)
             else:
                 # For other endpoints, proceed without authentication
-                request.state.user = None
-                return await call_next(request)
+                state["user"] = None
+                await self.app(scope, receive, send)
+            return
         
         # Extract token from "Bearer <token>" format
         if not authorization.startswith("Bearer "):
             logger.warning("Invalid authentication scheme")
-            raise HTTPException(status_code=401, detail="Invalid authentication scheme")
+            response = JSONResponse(status_code=401, content={"detail": "Invalid authentication scheme"})
+            await response(scope, receive, send)
+            return
         
         token = authorization[7:]  # Remove "Bearer " prefix
-        user_session = self.auth_service.validate_session(token)
+        with audit_stage(state.get("audit_context"), "auth"):
+            user_session = self.auth_service.validate_session(token)
         
         if not user_session:
             logger.warning("Invalid or expired token")
-            raise HTTPException(status_code=401, detail="Invalid or expired token")
+            response = JSONResponse(status_code=401, content={"detail": "Invalid or expired token"})
+            await response(scope, receive, send)
+            return
         
         # Attach user session to request state
-        request.state.user = user_session
+        state["user"] = user_session
         
         # Continue with the request
-        response = await call_next(request)
-        return response
\ No newline at end of file
+        await self.app(scope, receive, send)
\ No newline at end of file
@@ -0,0 +1,95 @@
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+import asyncio
+import time
+from typing import Tuple
+from src.utils.cancellation import CancellationToken, CLIENT_DISCONNECTED, DEADLINE_EXCEEDED, set_token, reset_token
+
+class CancellationMiddleware:
+    def __init__(self, app: ASGIApp, request_timeout: float = 0, path_prefixes: Tuple[str, ...] = ("/",)):
+        """
+        Initialize the cancellation middleware.
+        
+        Watching for a disconnect takes two tasks per request, so only
+        requests that do slow work need to be covered.
+        
+        Args:
+            app: Application to wrap
+            request_timeout: Seconds a request may run before it is cancelled (0 disables the deadline)
+            path_prefixes: Paths of the requests that can be cancelled
+        """
+        if request_timeout < 0:
+            raise ValueError(f"Request timeout must not be negative, got {request_timeout!r}")
+        self.app = app
+        self.request_timeout = request_timeout
+        self.path_prefixes = path_prefixes
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.path_prefixes):
+            await self.app(scope, receive, send)
+            return
+        
+        deadline = time.monotonic() + self.request_timeout if self.request_timeout else None
+        cancellation_token = CancellationToken(deadline)
+        # Messages from the server are read here so a disconnect is noticed
+        # while the request is being handled, then handed on to the app
+        messages: asyncio.Queue = asyncio.Queue()
+        response_started = False
+        response_complete = False
+        
+        async def receive_queued() -> Message:
+            return await messages.get()
+        
+        async def send_tracking(message: Message) -> None:
+            nonlocal response_started, response_complete
+            if message["type"] == "http.response.start":
+                response_started = True
+            elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                response_complete = True
+            await send(message)
+        
+        def cancel(reason: str) -> None:
+            # Once the response is out, the rest of the handling is bookkeeping
+            if not response_complete:
+                cancellation_token.cancel(reason)
+                handler.cancel()
+        
+        async def watch_disconnect() -> None:
+            while True:
+                message = await receive()
+                messages.put_nowait(message)
+                if message["type"] == "http.disconnect":
+                    cancel(CLIENT_DISCONNECTED)
+                    return
+        
+        # The handler task inherits the token; worker threads get it from there
+        reset = set_token(cancellation_token)
+        try:
+            handler = asyncio.ensure_future(self.app(scope, receive_queued, send_tracking))
+        finally:
+            reset_token(reset)
+        watcher = asyncio.ensure_future(watch_disconnect())
+        timer = asyncio.get_running_loop().call_later(self.request_timeout, cancel, DEADLINE_EXCEEDED) if deadline else None
+        try:
+            await handler
+        except asyncio.CancelledError:
+            if cancellation_token.reason is None:
+                # This request itself was cancelled, e.g. on shutdown
+                raise
+        finally:
+            watcher.cancel()
+            if timer is not None:
+                timer.cancel()
+        
+        if cancellation_token.reason is None or response_started:
+            return
+        audit_context = scope.get("state", {}).get("audit_context")
+        if audit_context is not None:
+            audit_context.outcome = "error"
+            audit_context.details = f"Request cancelled: {cancellation_token.reason}"
+        if cancellation_token.reason == DEADLINE_EXCEEDED:
+            response = JSONResponse(status_code=504, content={"detail": "Request deadline exceeded"})
+            await response(scope, receive, send)
+        elif audit_context is not None:
+            # Nobody is left to answer; record the nginx-style "client closed request"
+            audit_context.status_code = 499
\ No newline at end of file
@@ -0,0 +1,22 @@
+from starlette.types import ASGIApp, Receive, Scope, Send
+from src.utils.memory_budget import MemoryBudget
+
+class MemoryBudgetMiddleware:
+    def __init__(self, app: ASGIApp, memory_budget: MemoryBudget):
+        self.app = app
+        self.memory_budget = memory_budget
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        state = scope.setdefault("state", {})
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            # Routes reserve memory as they go; it is held until the response
+            # has been sent, or the request failed or was abandoned
+            reserved = state.pop("memory_reserved", 0)
+            if reserved:
+                self.memory_budget.release(reserved)
\ No newline at end of file
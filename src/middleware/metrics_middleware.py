@@ -0,0 +1,54 @@
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+import time
+from src.utils.metrics import RequestMetrics, UNMATCHED_ROUTE
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp, request_metrics: RequestMetrics):
+        self.app = app
+        self.request_metrics = request_metrics
+    
+    @staticmethod
+    def _route_template(scope: Scope) -> str:
+        """
+        Get the route template of a request, so paths with parameters share one label.
+        
+        The router stores the matched route in the scope. Requests rejected by
+        middleware before routing are matched against the routes here.
+        """
+        route = scope.get("route")
+        if route is None:
+            application = scope.get("app")
+            for candidate in getattr(getattr(application, "router", None), "routes", ()):
+                match, _ = candidate.matches(scope)
+                if match == Match.FULL:
+                    route = candidate
+                    break
+        return getattr(route, "path", UNMATCHED_ROUTE)
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        start_time = time.perf_counter()
+        status_code = 500
+        
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+        
+        self.request_metrics.request_started()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            audit_context = scope.get("state", {}).get("audit_context")
+            self.request_metrics.request_finished(
+                scope["method"],
+                self._route_template(scope),
+                status_code,
+                time.perf_counter() - start_time,
+                audit_context.timings if audit_context is not None else None
+            )
\ No newline at end of file
@@ -0,0 +1,77 @@
+from starlette.datastructures import QueryParams
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+from typing import Dict
+from src.utils.rate_limiter import RateLimiter, retry_after_header
+
+# Query values FastAPI parses as True
+_TRUE_VALUES = {"1", "true", "on", "yes"}
+
+class RateLimitMiddleware:
+    def __init__(self, app: ASGIApp, rate_limiter: RateLimiter, costs: Dict[str, float],
+                 large_read_bytes: int):
+        """
+        Initialize the rate limit middleware.
+        
+        Args:
+            app: Application to wrap
+            rate_limiter: Per-principal rate limiter
+            costs: Tokens per operation class: "stat", "read", "large_read" and "recursive"
+            large_read_bytes: Reads allowed to return more than this many bytes are large
+        """
+        self.app = app
+        self.rate_limiter = rate_limiter
+        self.costs = costs
+        self.large_read_bytes = large_read_bytes
+    
+    def _operation(self, scope: Scope) -> str:
+        """
+        Classify a request by how expensive it is to serve.
+        
+        Only the path and query are used, so no filesystem work is done
+        before the request is admitted.
+        """
+        path = scope["path"]
+        if path.startswith("/directories/"):
+            recursive = QueryParams(scope["query_string"]).get("recursive", "")
+            return "recursive" if recursive.lower() in _TRUE_VALUES else "stat"
+        if path.startswith("/files/"):
+            limit = QueryParams(scope["query_string"]).get("limit")
+            # Without a limit a read may return up to the 10MB default
+            if limit is not None and limit.isdigit() and int(limit) <= self.large_read_bytes:
+                return "read"
+            return "large_read"
+        return "stat"
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        # Only authenticated requests are limited; health checks and metrics never are
+        state = scope.setdefault("state", {})
+        user_session = state.get("user")
+        if user_session is None or scope["path"] in ["/health", "/metrics"]:
+            await self.app(scope, receive, send)
+            return
+        
+        principal = user_session.principal
+        scopes = user_session.scopes
+        retry_after = self.rate_limiter.acquire(principal, scopes, self.costs[self._operation(scope)])
+        if retry_after:
+            audit_context = state.get("audit_context")
+            if audit_context is not None:
+                audit_context.decision = "throttle"
+                audit_context.outcome = "denied"
+            response = JSONResponse(
+                status_code=429,
+                content={"detail": "Rate limit exceeded"},
+                headers={"Retry-After": retry_after_header(retry_after)}
+            )
+            await response(scope, receive, send)
+            return
+        
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.rate_limiter.release(principal, scopes)
\ No newline at end of file
@@ -0,0 +1,70 @@
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+import json
+import logging
+import random
+import time
+from typing import Callable
+from src.utils.tracing import start_trace, end_trace
+
+logger = logging.getLogger("trace")
+
+class TracingMiddleware:
+    def __init__(self, app: ASGIApp, server_timing: bool = False, sample_rate: float = 0.0,
+                 random_source: Callable[[], float] = random.random):
+        """
+        Initialize the tracing middleware.
+        
+        Args:
+            app: Application to wrap
+            server_timing: Send stage durations in a Server-Timing response header
+            sample_rate: Fraction of requests whose stage durations are logged
+            random_source: Function returning a float in [0, 1)
+        """
+        if not 0 <= sample_rate <= 1:
+            raise ValueError(f"Trace log sample rate must be between 0 and 1, got {sample_rate!r}")
+        self.app = app
+        self.server_timing = server_timing
+        self.sample_rate = sample_rate
+        self.random_source = random_source
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        sampled = self.sample_rate > 0 and self.random_source() < self.sample_rate
+        if not (self.server_timing or sampled):
+            # No trace is started, so every span is a no-op
+            await self.app(scope, receive, send)
+            return
+        
+        start_time = time.perf_counter()
+        status_code = 500
+        trace, token = start_trace()
+        
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.server_timing:
+                    elapsed = (time.perf_counter() - start_time) * 1000
+                    # Stages recorded after the headers, like the audit write,
+                    # only appear in the trace log
+                    value = trace.server_timing()
+                    value = f"{value}, total;dur={elapsed:.3f}" if value else f"total;dur={elapsed:.3f}"
+                    MutableHeaders(scope=message).append("Server-Timing", value)
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            end_trace(token)
+            if sampled:
+                logger.info(json.dumps({
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "status_code": status_code,
+                    "duration_ms": round((time.perf_counter() - start_time) * 1000, 3),
+                    "stages": trace.to_dict()
+                }))
\ No newline at end of file
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Literal
 from datetime import datetime
 
 class AccessPolicyModel(BaseModel):
@@ -10,5 +10,6 @@ class AccessPolicyModel(BaseModel):
     principals: List[str]
     actions: List[str]
     conditions: Dict[str, Any]
+    effect: Literal["allow", "deny"] = "allow"
     created_at: datetime
     updated_at: datetime
\ No newline at end of file
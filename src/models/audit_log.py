@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
+from typing import Dict
 
 class AuditLogModel(BaseModel):
     id: str
@@ -9,4 +10,9 @@ class AuditLogModel(BaseModel):
     action: str
     outcome: str
     details: str
-    ip_address: str
\ No newline at end of file
+    ip_address: str
+    decision: str = ""
+    status_code: int = 0
+    bytes: int = 0
+    duration_ms: float = 0.0
+    timings: Dict[str, float] = {}
\ No newline at end of file
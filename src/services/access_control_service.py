@@ -1,12 +1,38 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Iterable, Sequence, Tuple
 from src.models.access_policy import AccessPolicyModel
 from src.models.user_session import UserSessionModel
-import fnmatch
+from src.utils.policy_index import PolicyIndex, PolicySnapshot, covers_prefix
+from src.utils.decision_cache import DecisionCache
+from src.utils.tracing import traced
+from src.config import settings
 from datetime import datetime
 
+# Results of a subtree access check
+SUBTREE_ALLOW = "allow"
+SUBTREE_DENY = "deny"
+SUBTREE_MIXED = "mixed"
+
+# Placeholder for condition keys that are absent from the session metadata
+_MISSING = object()
+
 class AccessControlService:
     def __init__(self):
-        self.policies: List[AccessPolicyModel] = []
+        # Compiled, indexed policy set; replaced as a whole whenever policies change
+        self._snapshot = PolicySnapshot()
+        self.decision_cache = DecisionCache(maxsize=settings.ACCESS_DECISION_CACHE_SIZE)
+        # Policy evaluations that missed the decision cache
+        self.evaluations = 0
+        self.subtree_evaluations = 0
+    
+    @property
+    def policies(self) -> List[AccessPolicyModel]:
+        """Policies of the current snapshot"""
+        return list(self._snapshot.policies)
+    
+    @property
+    def policy_index(self) -> PolicyIndex:
+        """Policy index of the current snapshot"""
+        return self._snapshot.index
     
     def add_policy(self, policy: AccessPolicyModel) -> None:
         """
@@ -15,8 +41,35 @@ class AccessControlService:
         Args:
             policy: AccessPolicyModel to add
         """
-        self.policies.append(policy)
+        self.swap_snapshot(self._snapshot.with_policy(policy))
+    
+    def load_policies(self, policies: Iterable[AccessPolicyModel]) -> None:
+        """
+        Replace all access policies.
+        
+        Args:
+            policies: AccessPolicyModel objects to use from now on
+        """
+        self.swap_snapshot(PolicySnapshot.from_policies(policies))
+    
+    def swap_snapshot(self, snapshot: PolicySnapshot) -> None:
+        """
+        Atomically replace the compiled policy set.
+        
+        In-flight checks finish against the snapshot they started with, and
+        decisions they compute are not cached because the version changes.
+        
+        Args:
+            snapshot: Compiled policy set to use from now on
+        """
+        self._snapshot = snapshot
+        self.decision_cache.invalidate()
     
+    def clear_policies(self) -> None:
+        """Remove all access policies."""
+        self.swap_snapshot(PolicySnapshot())
+    
+    @traced("policy")
     def check_access(self, user_session: UserSessionModel, resource: str, action: str) -> bool:
         """
         Check if a user has access to a resource for a specific action.
@@ -29,69 +82,175 @@ class AccessControlService:
         Returns:
             True if access is granted, False otherwise
         """
-        # Check each policy
-        for policy in self.policies:
-            # Check if the user matches the policy principals
-            if self._matches_principal(user_session.principal, policy.principals):
-                # Check if the resource matches the policy resources
-                if self._matches_resource(resource, policy.resources):
-                    # Check if the action is allowed
-                    if action in policy.actions:
-                        # Check conditions if any
-                        if self._check_conditions(policy.conditions, user_session.metadata):
-                            return True
-        return False
+        # Read the version before the snapshot so a concurrent swap can never
+        # cache a decision from the new snapshot under the old version or vice versa
+        version = self.decision_cache.version
+        snapshot = self._snapshot
+        metadata = user_session.metadata
+        cache_key = (
+            user_session.principal,
+            resource,
+            action,
+            tuple(repr(metadata.get(key, _MISSING)) for key in snapshot.condition_keys)
+        )
+        decision = self.decision_cache.get(cache_key)
+        if decision is None:
+            self.evaluations += 1
+            decision, cacheable = self._evaluate(snapshot, user_session, resource, action)
+            if cacheable:
+                self.decision_cache.set(cache_key, decision, version)
+        return decision
     
-    def _matches_principal(self, principal: str, principals: List[str]) -> bool:
+    @traced("policy")
+    def check_subtree_access(self, user_session: UserSessionModel, resource_prefix: str, action: str) -> str:
         """
-        Check if a principal matches any of the policy principals.
+        Check if access is uniform for every resource under a prefix.
+        
+        This lets listings and recursive walks skip per-entry checks in
+        subtrees that are entirely allowed and prune subtrees that are
+        entirely denied.
         
         Args:
-            principal: Principal to check
-            principals: List of policy principals (can include wildcards)
+            user_session: UserSessionModel for the user
+            resource_prefix: Prefix shared by the resources in the subtree (e.g. "file:docs/")
+            action: Action to check access for
             
         Returns:
-            True if principal matches, False otherwise
+            SUBTREE_ALLOW if every resource is allowed, SUBTREE_DENY if none is,
+            SUBTREE_MIXED if entries have to be checked individually
         """
-        for policy_principal in principals:
-            if fnmatch.fnmatch(principal, policy_principal):
-                return True
-        return False
+        version = self.decision_cache.version
+        snapshot = self._snapshot
+        metadata = user_session.metadata
+        cache_key = (
+            "subtree",
+            user_session.principal,
+            resource_prefix,
+            action,
+            tuple(repr(metadata.get(key, _MISSING)) for key in snapshot.condition_keys)
+        )
+        decision = self.decision_cache.get(cache_key)
+        if decision is None:
+            self.subtree_evaluations += 1
+            allow_covers = False
+            allow_partial = False
+            deny_partial = False
+            cacheable = True
+            for resource, compiled in snapshot.index.subtree_candidates(resource_prefix, action):
+                if not compiled.matches_principal(user_session.principal):
+                    continue
+                if compiled.time_dependent:
+                    cacheable = False
+                if not compiled.check_conditions(metadata):
+                    continue
+                covers = covers_prefix(resource, resource_prefix)
+                if compiled.deny:
+                    if covers:
+                        # A deny over the whole subtree overrides every allow
+                        allow_covers = allow_partial = False
+                        break
+                    deny_partial = True
+                elif covers:
+                    allow_covers = True
+                else:
+                    allow_partial = True
+            
+            if allow_covers and not deny_partial:
+                decision = SUBTREE_ALLOW
+            elif allow_covers or allow_partial:
+                decision = SUBTREE_MIXED
+            else:
+                decision = SUBTREE_DENY
+            if cacheable:
+                self.decision_cache.set(cache_key, decision, version)
+        return decision
     
-    def _matches_resource(self, resource: str, resources: List[str]) -> bool:
+    def check_access_many(self, user_session: UserSessionModel, resources: Sequence[str], action: str) -> List[bool]:
         """
-        Check if a resource matches any of the policy resources.
+        Check access to many resources at once.
+        
+        Resources are grouped by parent: when the subtree of a parent is
+        uniformly allowed or denied, one evaluation decides every resource
+        in it, and only resources in mixed subtrees are checked one by one.
+        Repeated resources are decided once.
         
         Args:
-            resource: Resource path to check
-            resources: List of policy resources (can include wildcards)
+            user_session: UserSessionModel for the user
+            resources: Resources to check, e.g. "file:docs/readme.md"
+            action: Action to check access for
             
         Returns:
-            True if resource matches, False otherwise
+            Decisions in the order of the resources
+        """
+        decisions: Dict[str, bool] = {}
+        subtrees: Dict[str, str] = {}
+        results = []
+        for resource in resources:
+            decision = decisions.get(resource)
+            if decision is None:
+                # Prefix of the parent, e.g. "file:docs/" for "file:docs/readme.md"
+                # and "file:" for "file:readme.md"
+                kind, _, path = resource.partition(":")
+                parent = path.rstrip("/").rpartition("/")[0]
+                prefix = f"{kind}:{parent}/" if parent else f"{kind}:"
+                subtree = subtrees.get(prefix)
+                if subtree is None:
+                    subtree = self.check_subtree_access(user_session, prefix, action)
+                    subtrees[prefix] = subtree
+                if subtree == SUBTREE_MIXED:
+                    decision = self.check_access(user_session, resource, action)
+                else:
+                    decision = subtree == SUBTREE_ALLOW
+                decisions[resource] = decision
+            results.append(decision)
+        return results
+    
+    def get_cache_stats(self) -> Dict[str, int]:
+        """
+        Get access decision cache counters.
+        
+        Returns:
+            Dictionary with hits, misses, size and policy-set version
         """
-        for policy_resource in resources:
-            if fnmatch.fnmatch(resource, policy_resource):
-                return True
-        return False
+        return self.decision_cache.get_stats()
     
-    def _check_conditions(self, conditions: Dict[str, Any], metadata: Dict[str, Any]) -> bool:
+    def get_evaluation_stats(self) -> Dict[str, int]:
         """
-        Check if all conditions are met.
+        Get policy evaluation counters.
+        
+        Returns:
+            Dictionary with the number of access and subtree evaluations that
+            missed the decision cache
+        """
+        return {"evaluations": self.evaluations, "subtree_evaluations": self.subtree_evaluations}
+    
+    def _evaluate(self, snapshot: PolicySnapshot, user_session: UserSessionModel, resource: str, action: str) -> Tuple[bool, bool]:
+        """
+        Evaluate the policies for an access check, bypassing the decision cache.
+        
+        Deny policies override allow policies.
         
         Args:
-            conditions: Policy conditions to check
-            metadata: User session metadata
+            snapshot: Compiled policy set to evaluate
+            user_session: UserSessionModel for the user
+            resource: Resource path to check access for
+            action: Action to check access for
             
         Returns:
-            True if all conditions are met, False otherwise
-        """
-        # For now, we'll implement a simple check
-        # In a real implementation, this would be more complex
-        for key, value in conditions.items():
-            if key in metadata:
-                if metadata[key] != value:
-                    return False
-            else:
-                # If condition key is not in metadata, condition is not met
-                return False
-        return True
\ No newline at end of file
+            Tuple of (decision, cacheable); decisions that depended on a time
+            window condition must not be cached
+        """
+        allowed = False
+        cacheable = True
+        # Only policies for the action on a matching resource are candidates
+        for compiled in snapshot.index.candidates(resource, action):
+            # Check if the user matches the policy principals
+            if compiled.matches_principal(user_session.principal):
+                if compiled.time_dependent:
+                    cacheable = False
+                # Check conditions if any
+                if compiled.check_conditions(user_session.metadata):
+                    if compiled.deny:
+                        return False, cacheable
+                    allowed = True
+        return allowed, cacheable
\ No newline at end of file
@@ -1,27 +1,52 @@
+import asyncio
 import json
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterator, List, Optional
 from src.models.audit_log import AuditLogModel
+from src.utils.audit_writer import AuditWriter
+from src.utils.audit_store import AuditStore
+from src.utils.audit_rotation import LogRotator
+from src.utils.audit_context import AuditContext
+from src.utils.audit_sampling import SamplingPolicy, AuditCounters
+from src.utils.tracing import span
+from src.config import settings
 from datetime import datetime
 import os
 
+logger = logging.getLogger("audit_service")
+
 class AuditService:
-    def __init__(self, log_file: str = "audit.log"):
-        self.log_file = log_file
-        # Set up logging
-        self.logger = logging.getLogger("audit")
-        self.logger.setLevel(logging.INFO)
-        
-        # Create file handler
-        handler = logging.FileHandler(log_file)
-        handler.setLevel(logging.INFO)
-        
-        # Create formatter
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        handler.setFormatter(formatter)
-        
-        # Add handler to logger
-        self.logger.addHandler(handler)
+    def __init__(self, log_file: Optional[str] = None, writer: Optional[AuditWriter] = None,
+                 store: Optional[AuditStore] = None, sampling: Optional[SamplingPolicy] = None):
+        # Resolve paths once so later working directory changes do not move the log
+        self.log_file = os.path.abspath(log_file or settings.AUDIT_LOG_FILE)
+        # Indexed copy of the log that backs get_logs
+        self.store = store or AuditStore(os.path.abspath(settings.AUDIT_DB_FILE))
+        # Records are written by a background thread in batches
+        self.writer = writer or AuditWriter(
+            self.log_file,
+            batch_size=settings.AUDIT_BATCH_SIZE,
+            flush_interval=settings.AUDIT_FLUSH_INTERVAL,
+            queue_size=settings.AUDIT_QUEUE_SIZE,
+            overflow_policy=settings.AUDIT_OVERFLOW_POLICY,
+            block_timeout=settings.AUDIT_BLOCK_TIMEOUT,
+            store=self.store,
+            rotator=LogRotator(
+                self.log_file,
+                max_bytes=settings.AUDIT_MAX_BYTES,
+                max_age=settings.AUDIT_ROTATE_INTERVAL,
+                retention_days=settings.AUDIT_RETENTION_DAYS,
+                max_segments=settings.AUDIT_MAX_SEGMENTS,
+                on_retention=self.store.delete_before
+            )
+        )
+        # Successes may be sampled; the counters keep exact totals for rollups
+        self.sampling = sampling or SamplingPolicy(
+            settings.AUDIT_SUCCESS_SAMPLE_RATE,
+            json.loads(settings.AUDIT_SAMPLING_RULES)
+        )
+        self.counters = AuditCounters()
+        self._rollup_task: Optional[asyncio.Task] = None
     
     def log_access(self, principal: str, resource: str, action: str, outcome: str, 
                    details: str = "", ip_address: str = "") -> AuditLogModel:
@@ -39,9 +64,11 @@ class AuditService:
         Returns:
             AuditLogModel with the log entry
         """
-        audit_log = AuditLogModel(
-            id=str(hash(f"{principal}{resource}{action}{datetime.now()}")),
-            timestamp=datetime.now(),
+        timestamp = datetime.now()
+        # Fields are built here, so skip pydantic validation on the request path
+        audit_log = AuditLogModel.model_construct(
+            id=str(hash(f"{principal}{resource}{action}{timestamp}")),
+            timestamp=timestamp,
             principal=principal,
             resource=resource,
             action=action,
@@ -50,32 +77,198 @@ class AuditService:
             ip_address=ip_address
         )
         
-        # Log to file
-        log_entry = {
+        # Queue for the background writer; serialization happens off the request path
+        self._submit({
             "id": audit_log.id,
-            "timestamp": audit_log.timestamp.isoformat(),
-            "principal": audit_log.principal,
-            "resource": audit_log.resource,
-            "action": audit_log.action,
-            "outcome": audit_log.outcome,
-            "details": audit_log.details,
-            "ip_address": audit_log.ip_address
+            "timestamp": timestamp.isoformat(),
+            "principal": principal,
+            "resource": resource,
+            "action": action,
+            "outcome": outcome,
+            "details": details,
+            "ip_address": ip_address
+        })
+        
+        return audit_log
+    
+    def log_request(self, context: AuditContext) -> AuditLogModel:
+        """
+        Log the single consolidated record of a request.
+        
+        Args:
+            context: Audit context collected while handling the request
+            
+        Returns:
+            AuditLogModel with the log entry
+        """
+        timestamp = datetime.now()
+        record = {
+            "id": str(hash(f"{context.principal}{context.path}{context.method}{timestamp}")),
+            "timestamp": timestamp.isoformat(),
+            "principal": context.principal,
+            "resource": context.resource or context.path,
+            "action": context.action or context.method.lower(),
+            "outcome": context.resolve_outcome(),
+            "details": context.details,
+            "ip_address": context.ip_address,
+            "decision": context.decision,
+            "status_code": context.status_code,
+            "bytes": context.bytes,
+            "duration_ms": context.elapsed_ms(),
+            "timings": context.timings
         }
+        with span("audit"):
+            self._submit(record)
         
-        self.logger.info(json.dumps(log_entry))
+        return AuditLogModel.model_construct(**{**record, "timestamp": timestamp})
+    
+    def _submit(self, record: Dict[str, Any]) -> bool:
+        """
+        Count a record and queue it for writing if it is sampled.
         
-        return audit_log
+        Args:
+            record: Audit record
+            
+        Returns:
+            True if the record was queued
+        """
+        principal, resource, outcome = record["principal"], record["resource"], record["outcome"]
+        self.counters.increment(principal, record["action"], outcome)
+        if not self.sampling.should_record(principal, resource, outcome):
+            return False
+        return self.writer.write(record)
     
-    def get_logs(self, limit: int = 100) -> List[AuditLogModel]:
+    def flush_rollups(self) -> int:
+        """
+        Write one rollup record per principal, action and outcome counted
+        since the last flush.
+        
+        Returns:
+            Number of rollup records written
+        """
+        window_start, window_end, counts = self.counters.drain()
+        for (principal, action, outcome), count in counts.items():
+            self.writer.write({
+                "id": str(hash(f"rollup{principal}{action}{outcome}{window_end}")),
+                "timestamp": window_end.isoformat(),
+                "principal": principal,
+                "resource": "*",
+                "action": action,
+                "outcome": outcome,
+                "details": f"Rollup: {count} requests since {window_start.isoformat()}",
+                "ip_address": "",
+                "record_type": "rollup",
+                "count": count,
+                "window_start": window_start.isoformat()
+            })
+        return len(counts)
+    
+    async def run_rollup_flusher(self, interval: float) -> None:
+        """
+        Periodically write rollup records until cancelled.
+        
+        Args:
+            interval: Seconds between rollups
+        """
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                self.flush_rollups()
+            except Exception as e:
+                logger.error(f"Audit rollup failed: {str(e)}", exc_info=True)
+    
+    def start_rollup_flusher(self, interval: float) -> asyncio.Task:
+        """
+        Start writing rollup records periodically on the running event loop.
+        
+        Args:
+            interval: Seconds between rollups
+            
+        Returns:
+            The rollup task
+            
+        Raises:
+            ValueError: If the interval is not positive
+        """
+        if interval <= 0:
+            raise ValueError(f"Audit rollup interval must be positive, got {interval}")
+        if self._rollup_task is None or self._rollup_task.done():
+            self._rollup_task = asyncio.get_running_loop().create_task(self.run_rollup_flusher(interval))
+        return self._rollup_task
+    
+    async def stop_rollup_flusher(self) -> None:
+        """Stop the periodic rollups and write the counts of the last window."""
+        if self._rollup_task is not None:
+            self._rollup_task.cancel()
+            try:
+                await self._rollup_task
+            except asyncio.CancelledError:
+                pass
+            self._rollup_task = None
+        self.flush_rollups()
+    
+    def flush(self) -> None:
+        """Wait until all queued audit records have been written."""
+        self.writer.flush()
+    
+    def close(self) -> None:
+        """Write all queued audit records and stop the background writer."""
+        self.writer.close()
+    
+    def iter_logs(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                  principal: Optional[str] = None, resource_prefix: Optional[str] = None,
+                  outcome: Optional[str] = None, limit: Optional[int] = None) -> Iterator[AuditLogModel]:
+        """
+        Stream audit logs matching the filters, newest first.
+        
+        Args:
+            start: Only logs at or after this time
+            end: Only logs before this time
+            principal: Only logs of this principal
+            resource_prefix: Only logs whose resource starts with this prefix
+            outcome: Only logs with this outcome
+            limit: Maximum number of logs
+            
+        Returns:
+            Iterator of AuditLogModel objects
+        """
+        for record in self.store.iter_logs(start, end, principal, resource_prefix, outcome, limit):
+            yield AuditLogModel.model_validate(record)
+    
+    def get_rollups(self, limit: int = 100, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                    principal: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Get recent rollup records, which get_logs leaves out.
+        
+        Args:
+            limit: Maximum number of rollups to return
+            start: Only rollups written at or after this time
+            end: Only rollups written before this time
+            principal: Only rollups of this principal
+            
+        Returns:
+            List of rollup records with their count and window_start, newest first
+        """
+        return list(self.store.iter_rollups(start, end, principal, limit))
+    
+    def get_logs(self, limit: int = 100, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                 principal: Optional[str] = None, resource_prefix: Optional[str] = None,
+                 outcome: Optional[str] = None) -> List[AuditLogModel]:
         """
         Get recent audit logs.
         
+        Records still queued for the writer are not visible yet. Rollups
+        are kept apart and returned by get_rollups.
+        
         Args:
             limit: Maximum number of logs to return
+            start: Only logs at or after this time
+            end: Only logs before this time
+            principal: Only logs of this principal
+            resource_prefix: Only logs whose resource starts with this prefix
+            outcome: Only logs with this outcome
             
         Returns:
-            List of AuditLogModel objects
+            List of AuditLogModel objects, newest first
         """
-        # In a real implementation, this would read from the log file
-        # or a database and return parsed logs
-        return []
\ No newline at end of file
+        return list(self.iter_logs(start, end, principal, resource_prefix, outcome, limit))
\ No newline at end of file
@@ -1,11 +1,23 @@
-from typing import Optional
+from typing import Optional, Dict, List, Tuple
 from src.models.user_session import UserSessionModel
 from datetime import datetime, timedelta
+import asyncio
+import heapq
+import logging
 import secrets
+import threading
+
+logger = logging.getLogger("auth_service")
 
 class AuthService:
     def __init__(self):
         self.sessions = {}  # In a real implementation, this would be a database
+        # Min-heap of (expires_at timestamp, token) used to evict expired sessions
+        # in expiry order without scanning the whole session dict
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self._lock = threading.Lock()
+        self._evicted_total = 0
+        self._sweeper_task: Optional[asyncio.Task] = None
     
     def create_session(self, principal: str, scopes: list, duration_hours: int = 24) -> UserSessionModel:
         """
@@ -34,7 +46,9 @@ class AuthService:
         )
         
         # Store session
-        self.sessions[token] = session
+        with self._lock:
+            self.sessions[token] = session
+            heapq.heappush(self._expiry_heap, (session.expires_at.timestamp(), token))
         
         return session
     
@@ -48,14 +62,16 @@ class AuthService:
         Returns:
             UserSessionModel if valid, None if invalid or expired
         """
-        if token in self.sessions:
-            session = self.sessions[token]
+        session = self.sessions.get(token)
+        if session is not None:
             # Check if session is expired
             if session.expires_at > datetime.now():
                 return session
             else:
-                # Remove expired session
-                del self.sessions[token]
+                # Remove expired session; its heap entry is discarded by the sweeper
+                with self._lock:
+                    if self.sessions.pop(token, None) is not None:
+                        self._evicted_total += 1
         return None
     
     def revoke_session(self, token: str) -> bool:
@@ -68,7 +84,123 @@ class AuthService:
         Returns:
             True if session was revoked, False if not found
         """
-        if token in self.sessions:
-            del self.sessions[token]
-            return True
-        return False
\ No newline at end of file
+        with self._lock:
+            if token in self.sessions:
+                del self.sessions[token]
+                self._compact_heap_if_stale()
+                return True
+        return False
+    
+    def sweep_expired(self, now: Optional[datetime] = None) -> int:
+        """
+        Evict all sessions whose expiry time has passed.
+        
+        Only heap entries that are due are visited, so the work done is
+        proportional to the number of expired sessions, not the session count.
+        
+        Args:
+            now: Reference time (default: current time)
+            
+        Returns:
+            Number of sessions evicted
+        """
+        cutoff = (now or datetime.now()).timestamp()
+        evicted = 0
+        with self._lock:
+            while self._expiry_heap and self._expiry_heap[0][0] <= cutoff:
+                expires_ts, token = heapq.heappop(self._expiry_heap)
+                session = self.sessions.get(token)
+                # Skip entries for sessions that were already revoked or removed
+                if session is not None and session.expires_at.timestamp() == expires_ts:
+                    del self.sessions[token]
+                    evicted += 1
+            self._evicted_total += evicted
+        return evicted
+    
+    def get_session_stats(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        """
+        Get session store gauges.
+        
+        The expired count only visits heap entries that are already due, so
+        the cost is proportional to the expired sessions awaiting the sweeper.
+        
+        Args:
+            now: Reference time (default: current time)
+            
+        Returns:
+            Dictionary with live, expired (not yet evicted) and evicted_total counts
+        """
+        cutoff = (now or datetime.now()).timestamp()
+        with self._lock:
+            expired = 0
+            # Depth-first walk of the heap, pruning subtrees that are not yet due
+            stack = [0] if self._expiry_heap else []
+            while stack:
+                index = stack.pop()
+                expires_ts, token = self._expiry_heap[index]
+                if expires_ts > cutoff:
+                    continue
+                session = self.sessions.get(token)
+                if session is not None and session.expires_at.timestamp() == expires_ts:
+                    expired += 1
+                for child in (2 * index + 1, 2 * index + 2):
+                    if child < len(self._expiry_heap):
+                        stack.append(child)
+            return {
+                "live": len(self.sessions) - expired,
+                "expired": expired,
+                "evicted_total": self._evicted_total,
+            }
+    
+    async def run_sweeper(self, interval: float) -> None:
+        """
+        Periodically evict expired sessions until cancelled.
+        
+        Args:
+            interval: Seconds between sweeps
+        """
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                evicted = self.sweep_expired()
+                if evicted:
+                    logger.info(f"Evicted {evicted} expired sessions")
+            except Exception as e:
+                logger.error(f"Session sweep failed: {str(e)}", exc_info=True)
+    
+    def start_sweeper(self, interval: float) -> asyncio.Task:
+        """
+        Start the background sweeper on the running event loop.
+        
+        Args:
+            interval: Seconds between sweeps
+            
+        Returns:
+            The sweeper task
+            
+        Raises:
+            ValueError: If the interval is not positive
+        """
+        if interval <= 0:
+            raise ValueError(f"Session sweep interval must be positive, got {interval}")
+        if self._sweeper_task is None or self._sweeper_task.done():
+            self._sweeper_task = asyncio.get_running_loop().create_task(self.run_sweeper(interval))
+        return self._sweeper_task
+    
+    async def stop_sweeper(self) -> None:
+        """Stop the background sweeper if it is running."""
+        if self._sweeper_task is not None:
+            self._sweeper_task.cancel()
+            try:
+                await self._sweeper_task
+            except asyncio.CancelledError:
+                pass
+            self._sweeper_task = None
+    
+    def _compact_heap_if_stale(self) -> None:
+        """Rebuild the expiry heap once revoked entries outnumber live sessions."""
+        if len(self._expiry_heap) > 2 * len(self.sessions) + 64:
+            self._expiry_heap = [
+                (session.expires_at.timestamp(), token) for token, session in self.sessions.items()
+            ]
+            heapq.heapify(self._expiry_heap)
\ No newline at end of file
@@ -1,11 +1,16 @@
 import os
 import pathlib
-from typing import List, Union
+from typing import List, Optional, Tuple, Union
 from src.models.directory import DirectoryModel
 from src.models.file import FileModel
 from src.services.file_service import FileService
 from src.utils.path_validator import validate_path
 from src.utils.directory_cache import directory_cache
+from src.utils.tracing import traced
+from src.utils.blocking_io import stat_pool
+from src.utils.single_flight import single_flight
+from src.utils.cancellation import check_cancelled
+from src.utils.listing import DirectoryListing, EntryRecord, STAT_FIELDS
 from datetime import datetime
 import stat
 import hashlib
@@ -13,6 +18,7 @@ from src.config import settings
 
 class DirectoryService:
     @staticmethod
+    @traced("resolve_path")
     def _resolve_path(relative_path: str) -> pathlib.Path:
         """
         Resolve a relative path to an absolute path within allowed directories.
@@ -99,6 +105,8 @@ class DirectoryService:
         if path.is_dir():
             try:
                 for item in path.iterdir():
+                    # Stop walking if the request has been cancelled
+                    check_cancelled()
                     if item.is_file():
                         # Create a relative path for the file
                         relative_item_path = DirectoryService._create_relative_path(item)
@@ -158,6 +166,7 @@ class DirectoryService:
                 paginated_items = items[offset:offset + limit]
                 
                 for item in paginated_items:
+                    check_cancelled()
                     if item.is_file():
                         # Create a relative path for the file
                         relative_item_path = DirectoryService._create_relative_path(item)
@@ -184,6 +193,89 @@ class DirectoryService:
                 
         return contents
     
+    @staticmethod
+    def get_directory_listing(dir_path: str) -> DirectoryListing:
+        """
+        Scan a directory without building its entries.
+        
+        Only the kind of each entry is determined, so the entries can be
+        filtered and paginated before get_entry_records builds the page.
+        
+        Args:
+            dir_path: Path to the directory
+            
+        Returns:
+            DirectoryListing with the directory and every entry's kind and scandir entry
+        """
+        # Validate path
+        if not validate_path(dir_path):
+            raise ValueError("Invalid directory path")
+        
+        path = DirectoryService._resolve_path(dir_path)
+        directory = EntryRecord(
+            "directory",
+            str(hash(dir_path)),
+            path.name,
+            os.path.join(settings.ALLOWED_DIRECTORIES[0], dir_path),
+            path.stat()
+        )
+        
+        entries = []
+        if path.is_dir():
+            try:
+                with os.scandir(path) as scan:
+                    items = list(scan)
+                for item in items:
+                    check_cancelled()
+                    if item.is_file():
+                        entries.append(("file", item))
+                    elif item.is_dir():
+                        entries.append(("directory", item))
+            except PermissionError:
+                # Handle permission errors gracefully
+                pass
+        
+        return DirectoryListing(directory, entries)
+    
+    @staticmethod
+    def get_entry_records(dir_path: str, entries: List[Tuple[str, os.DirEntry]],
+                          fields: Optional[Tuple[str, ...]] = None) -> List[EntryRecord]:
+        """
+        Build lightweight records for entries of a directory listing.
+        
+        Produces the same entries as get_directory_info and
+        list_directory_contents without building validated models. Entries
+        are only stat'ed, and their ids and paths only computed, when the
+        fields ask for them.
+        
+        Args:
+            dir_path: Path to the directory
+            entries: (kind, scandir entry) of the entries, from get_directory_listing
+            fields: Fields the entries are serialized with, or None for all
+            
+        Returns:
+            List of EntryRecord objects, in the order of the entries
+        """
+        relative_dir = DirectoryService._create_relative_path(DirectoryService._resolve_path(dir_path))
+        need_id = fields is None or "id" in fields
+        need_path = fields is None or "path" in fields
+        need_stat = fields is None or not STAT_FIELDS.isdisjoint(fields)
+        
+        records = []
+        for kind, item in entries:
+            check_cancelled()
+            relative_item_path = item.name if relative_dir == "." else os.path.join(relative_dir, item.name)
+            entry_id = str(hash(relative_item_path)) if need_id else None
+            stat_info = item.stat() if need_stat else None
+            if kind == "file":
+                # Files are reported under their resolved name, like FileService.get_file_info
+                name = os.path.basename(os.path.realpath(item.path)) if item.is_symlink() else item.name
+                entry_path = os.path.join(settings.ALLOWED_DIRECTORIES[0], relative_item_path) if need_path else None
+                records.append(EntryRecord("file", entry_id, name, entry_path, stat_info))
+            else:
+                records.append(EntryRecord("directory", entry_id, item.name, item.path, stat_info))
+        return records
+    
     @staticmethod
     def directory_exists(dir_path: str) -> bool:
         """
@@ -203,4 +295,95 @@ class DirectoryService:
             path = DirectoryService._resolve_path(dir_path)
             return path.is_dir()
         except FileNotFoundError:
-            return False
\ No newline at end of file
+            return False
+    
+    @staticmethod
+    async def get_directory_info_async(dir_path: str) -> DirectoryModel:
+        """
+        Get information about a directory on the stat pool.
+        
+        Concurrent calls for the same path share one walk, so a burst of
+        identical requests that all miss the directory cache walks once.
+        
+        Args:
+            dir_path: Path to the directory
+            
+        Returns:
+            DirectoryModel with directory information
+        """
+        return await single_flight.do(
+            ("directory_info", dir_path),
+            lambda: stat_pool.run(DirectoryService.get_directory_info, dir_path)
+        )
+    
+    @staticmethod
+    async def list_directory_contents_async(dir_path: str, limit: int = 100, offset: int = 0) -> List[Union[FileModel, DirectoryModel]]:
+        """
+        List the contents of a directory with pagination on the stat pool.
+        
+        Concurrent calls with the same arguments share one listing.
+        
+        Args:
+            dir_path: Path to the directory
+            limit: Maximum number of items to return
+            offset: Number of items to skip
+            
+        Returns:
+            List of FileModel and DirectoryModel objects
+        """
+        return await single_flight.do(
+            ("list", dir_path, limit, offset),
+            lambda: stat_pool.run(DirectoryService.list_directory_contents, dir_path, limit, offset)
+        )
+    
+    @staticmethod
+    async def directory_exists_async(dir_path: str) -> bool:
+        """
+        Check if a directory exists on the stat pool.
+        
+        Concurrent calls for the same path share one check.
+        
+        Args:
+            dir_path: Path to the directory
+            
+        Returns:
+            True if directory exists, False otherwise
+        """
+        return await single_flight.do(
+            ("directory_exists", dir_path),
+            lambda: stat_pool.run(DirectoryService.directory_exists, dir_path)
+        )
+    
+    @staticmethod
+    async def get_directory_listing_async(dir_path: str) -> DirectoryListing:
+        """
+        Scan a directory without building its entries on the stat pool.
+        
+        Concurrent calls for the same path share one scan.
+        
+        Args:
+            dir_path: Path to the directory
+            
+        Returns:
+            DirectoryListing with the directory and every entry's kind and scandir entry
+        """
+        return await single_flight.do(
+            ("listing", dir_path),
+            lambda: stat_pool.run(DirectoryService.get_directory_listing, dir_path)
+        )
+    
+    @staticmethod
+    async def get_entry_records_async(dir_path: str, entries: List[Tuple[str, os.DirEntry]],
+                                      fields: Optional[Tuple[str, ...]] = None) -> List[EntryRecord]:
+        """
+        Build lightweight records for entries of a directory listing on the stat pool.
+        
+        Args:
+            dir_path: Path to the directory
+            entries: (kind, scandir entry) of the entries, from get_directory_listing
+            fields: Fields the entries are serialized with, or None for all
+            
+        Returns:
+            List of EntryRecord objects, in the order of the entries
+        """
+        return await stat_pool.run(DirectoryService.get_entry_records, dir_path, entries, fields)
\ No newline at end of file
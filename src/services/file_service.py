@@ -1,14 +1,27 @@
+import asyncio
+import codecs
+import glob
+import heapq
 import os
 import pathlib
-from typing import List, Optional
+from typing import List, Optional, Sequence, Tuple, Union
 from src.models.file import FileModel
 from src.utils.path_validator import validate_path
+from src.utils.tracing import span, traced
+from src.utils.blocking_io import stat_pool, read_pool
+from src.utils.single_flight import single_flight
+from src.utils.cancellation import check_cancelled
+from src.utils.listing import EntryRecord
 from datetime import datetime
 import stat
 from src.config import settings
 
+# Bytes read between cancellation checks
+READ_CHUNK_SIZE = 1048576
+
 class FileService:
     @staticmethod
+    @traced("resolve_path")
     def _resolve_path(relative_path: str) -> pathlib.Path:
         """
         Resolve a relative path to an absolute path within allowed directories.
@@ -70,6 +83,68 @@ class FileService:
             permissions=stat.filemode(stat_info.st_mode)
         )
     
+    @staticmethod
+    def get_file_record(file_path: str, fields: Optional[Tuple[str, ...]] = None) -> EntryRecord:
+        """
+        Get information about a file or directory as a lightweight record.
+        
+        A file's record serializes like the FileModel of get_file_info and
+        a directory's like a DirectoryModel without contents; the id and
+        path are only computed when the fields ask for them.
+        
+        Args:
+            file_path: Path to the file
+            fields: Fields the record is serialized with, or None for all
+            
+        Returns:
+            EntryRecord of the file or directory
+            
+        Raises:
+            ValueError: If the path is invalid
+            FileNotFoundError: If the path does not exist or is neither a file nor a directory
+        """
+        # Validate path
+        if not validate_path(file_path):
+            raise ValueError("Invalid file path")
+        
+        path = FileService._resolve_path(file_path)
+        stat_info = path.stat()
+        if stat.S_ISREG(stat_info.st_mode):
+            kind = "file"
+        elif stat.S_ISDIR(stat_info.st_mode):
+            kind = "directory"
+        else:
+            raise FileNotFoundError(f"Not a file or directory: {file_path}")
+        
+        return EntryRecord(
+            kind,
+            str(hash(file_path)) if fields is None or "id" in fields else None,
+            path.name,
+            os.path.join(settings.ALLOWED_DIRECTORIES[0], file_path) if fields is None or "path" in fields else None,
+            stat_info
+        )
+    
+    @staticmethod
+    def get_file_records(file_paths: Sequence[str], fields: Optional[Tuple[str, ...]] = None) -> List[Union[EntryRecord, Exception]]:
+        """
+        Get information about many files or directories, keeping going past failures.
+        
+        Args:
+            file_paths: Paths to the files or directories
+            fields: Fields the records are serialized with, or None for all
+            
+        Returns:
+            For each path in order, its EntryRecord or the error it raised
+        """
+        records = []
+        for file_path in file_paths:
+            check_cancelled()
+            try:
+                records.append(FileService.get_file_record(file_path, fields))
+            except (OSError, ValueError) as e:
+                records.append(e)
+        return records
+    
     @staticmethod
     def read_file_content(file_path: str, encoding: str = "utf-8", limit: int = 10485760) -> str:
         """
@@ -94,10 +169,134 @@ class FileService:
         if path.stat().st_size > limit:
             raise ValueError(f"File size exceeds limit of {limit} bytes")
         
-        with open(path, "r", encoding=encoding) as file:
-            # Read up to limit bytes
-            content = file.read(limit)
-            return content
+        data = FileService._read_bytes(path, limit)
+        
+        with span("decode"):
+            # Normalize newlines the way text mode would
+            return data.decode(encoding).replace("\r\n", "\n").replace("\r", "\n")
+    
+    @staticmethod
+    def _read_bytes(path: pathlib.Path, limit: int) -> bytes:
+        """
+        Read up to limit bytes from the start of a file.
+        
+        The file is read in chunks, stopping early if the request is cancelled.
+        
+        Args:
+            path: Resolved path to the file
+            limit: Maximum number of bytes to read
+            
+        Returns:
+            Bytes read
+        """
+        with span("disk_read"):
+            with open(path, "rb") as file:
+                chunks = []
+                remaining = limit
+                while remaining > 0:
+                    check_cancelled()
+                    chunk = file.read(min(READ_CHUNK_SIZE, remaining))
+                    chunks.append(chunk)
+                    remaining -= len(chunk)
+                    if len(chunk) < READ_CHUNK_SIZE:
+                        break
+                return b"".join(chunks)
+    
+    @staticmethod
+    def read_file_prefix(file_path: str, encoding: str = "utf-8", limit: int = 10485760) -> Tuple[str, int, bool]:
+        """
+        Read the start of a file.
+        
+        Unlike read_file_content, a file larger than the limit is truncated
+        rather than rejected; a character cut in half by the limit is dropped.
+        
+        Args:
+            file_path: Path to the file
+            encoding: File encoding (default: utf-8)
+            limit: Maximum number of bytes to read (default: 10MB)
+            
+        Returns:
+            Tuple of (content, number of bytes read, whether the file was truncated)
+            
+        Raises:
+            ValueError: If the path is invalid
+            FileNotFoundError: If the path does not exist or is not a file
+            UnicodeDecodeError: If the content cannot be decoded
+        """
+        # Validate path
+        if not validate_path(file_path):
+            raise ValueError("Invalid file path")
+        
+        path = FileService._resolve_path(file_path)
+        stat_info = path.stat()
+        if not stat.S_ISREG(stat_info.st_mode):
+            raise FileNotFoundError(f"Not a file: {file_path}")
+        
+        data = FileService._read_bytes(path, limit)
+        truncated = stat_info.st_size > len(data)
+        
+        with span("decode"):
+            if truncated:
+                # A non-final incremental decode holds back an incomplete trailing character
+                content = codecs.getincrementaldecoder(encoding)().decode(data)
+            else:
+                content = data.decode(encoding)
+            # Normalize newlines the way text mode would
+            return content.replace("\r\n", "\n").replace("\r", "\n"), len(data), truncated
+    
+    @staticmethod
+    def read_file_prefixes(reads: Sequence[Tuple[str, int]], encoding: str = "utf-8") -> List[Union[Tuple[str, int, bool], Exception]]:
+        """
+        Read the start of many files, keeping going past failures.
+        
+        Args:
+            reads: (path, maximum number of bytes) of each file
+            encoding: File encoding (default: utf-8)
+            
+        Returns:
+            For each file in order, the result of read_file_prefix or the error it raised
+        """
+        results = []
+        for file_path, limit in reads:
+            check_cancelled()
+            try:
+                results.append(FileService.read_file_prefix(file_path, encoding, limit))
+            except (OSError, ValueError) as e:
+                results.append(e)
+        return results
+    
+    @staticmethod
+    def expand_glob(pattern: str, max_matches: int) -> Tuple[List[str], bool]:
+        """
+        Find the files matching a glob pattern in the allowed directories.
+        
+        Args:
+            pattern: Relative glob pattern; "**" matches any number of directories
+            max_matches: Maximum number of files to return
+            
+        Returns:
+            Tuple of (sorted relative paths of the matching files, whether more files matched)
+            
+        Raises:
+            ValueError: If the pattern is absolute or leaves the allowed directories
+        """
+        if not pattern or os.path.isabs(pattern) or ".." in pattern.split("/"):
+            raise ValueError("Invalid glob pattern")
+        
+        def matches():
+            seen = set()
+            for allowed_dir in settings.ALLOWED_DIRECTORIES:
+                for match in glob.iglob(pattern, root_dir=allowed_dir, recursive=True):
+                    check_cancelled()
+                    if match in seen or not os.path.isfile(os.path.join(allowed_dir, match)):
+                        continue
+                    seen.add(match)
+                    yield match
+        
+        # iglob order is arbitrary; keep the first matches in sorted order
+        # with a bounded heap rather than sorting every match
+        first = heapq.nsmallest(max_matches + 1, matches())
+        return first[:max_matches], len(first) > max_matches
     
     @staticmethod
     def file_exists(file_path: str) -> bool:
@@ -118,4 +317,101 @@ class FileService:
             path = FileService._resolve_path(file_path)
             return path.is_file()
         except FileNotFoundError:
-            return False
\ No newline at end of file
+            return False
+    
+    @staticmethod
+    async def get_file_info_async(file_path: str) -> FileModel:
+        """
+        Get information about a file on the stat pool.
+        
+        Concurrent calls for the same path share one stat.
+        
+        Args:
+            file_path: Path to the file
+            
+        Returns:
+            FileModel with file information
+        """
+        return await single_flight.do(
+            ("file_info", file_path),
+            lambda: stat_pool.run(FileService.get_file_info, file_path)
+        )
+    
+    @staticmethod
+    async def read_file_content_async(file_path: str, encoding: str = "utf-8", limit: int = 10485760) -> str:
+        """
+        Read the content of a file on the read pool.
+        
+        Concurrent calls with the same arguments share one read.
+        
+        Args:
+            file_path: Path to the file
+            encoding: File encoding (default: utf-8)
+            limit: Maximum number of bytes to read (default: 10MB)
+            
+        Returns:
+            File content as string
+        """
+        return await single_flight.do(
+            ("read", file_path, encoding, limit),
+            lambda: read_pool.run(FileService.read_file_content, file_path, encoding, limit)
+        )
+    
+    @staticmethod
+    async def file_exists_async(file_path: str) -> bool:
+        """
+        Check if a file exists on the stat pool.
+        
+        Concurrent calls for the same path share one check.
+        
+        Args:
+            file_path: Path to the file
+            
+        Returns:
+            True if file exists, False otherwise
+        """
+        return await single_flight.do(
+            ("file_exists", file_path),
+            lambda: stat_pool.run(FileService.file_exists, file_path)
+        )
+    
+    @staticmethod
+    async def get_file_records_async(file_paths: Sequence[str], fields: Optional[Tuple[str, ...]] = None) -> List[Union[EntryRecord, Exception]]:
+        """
+        Get information about many files in parallel on the stat pool.
+        
+        The paths are split into one chunk per pool worker, so a large batch
+        costs a handful of pool calls rather than one per path.
+        
+        Args:
+            file_paths: Paths to the files
+            fields: Fields the records are serialized with, or None for all
+            
+        Returns:
+            For each path in order, its EntryRecord or the error it raised
+        """
+        chunk_size = max(1, -(-len(file_paths) // stat_pool.max_workers))
+        chunks = await asyncio.gather(*(
+            stat_pool.run(FileService.get_file_records, file_paths[start:start + chunk_size], fields)
+            for start in range(0, len(file_paths), chunk_size)
+        ))
+        return [record for chunk in chunks for record in chunk]
+    
+    @staticmethod
+    async def read_file_prefixes_async(reads: Sequence[Tuple[str, int]], encoding: str = "utf-8") -> List[Union[Tuple[str, int, bool], Exception]]:
+        """
+        Read the start of many files in parallel on the read pool.
+        
+        Args:
+            reads: (path, maximum number of bytes) of each file
+            encoding: File encoding (default: utf-8)
+            
+        Returns:
+            For each file in order, the result of read_file_prefix or the error it raised
+        """
+        chunk_size = max(1, -(-len(reads) // read_pool.max_workers))
+        chunks = await asyncio.gather(*(
+            read_pool.run(FileService.read_file_prefixes, reads[start:start + chunk_size], encoding)
+            for start in range(0, len(reads), chunk_size)
+        ))
+        return [result for chunk in chunks for result in chunk]
\ No newline at end of file
@@ -0,0 +1,159 @@
+import asyncio
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from src.models.access_policy import AccessPolicyModel
+from src.services.access_control_service import AccessControlService
+from src.utils.policy_index import PolicySnapshot
+
+logger = logging.getLogger("policy_loader")
+
+class PolicyLoader:
+    def __init__(self, access_control_service: AccessControlService, policy_file: str, poll_interval: float = 5.0):
+        """
+        Initialize the policy loader.
+        
+        Args:
+            access_control_service: Service whose policies are replaced on reload
+            policy_file: Path to the JSON policy file
+            poll_interval: Seconds between checks for file changes
+        """
+        self.access_control_service = access_control_service
+        self.policy_file = policy_file
+        self.poll_interval = poll_interval
+        # (mtime in ns, size) of the file the current snapshot was built from
+        self._signature: Optional[Tuple[int, int]] = None
+        self._watcher_task: Optional[asyncio.Task] = None
+    
+    @staticmethod
+    def parse_policies(entries: List[Dict[str, Any]], loaded_at: datetime) -> List[AccessPolicyModel]:
+        """
+        Parse policy file entries into policy models.
+        
+        Entries written by hand may omit id, description, conditions and
+        timestamps; the name is used as id and the load time as timestamps.
+        
+        Args:
+            entries: Decoded JSON policy entries
+            loaded_at: Timestamp for entries without created_at/updated_at
+            
+        Returns:
+            List of AccessPolicyModel objects
+        """
+        if not isinstance(entries, list):
+            raise ValueError("Policy file must contain a list of policies")
+        
+        policies = []
+        for position, entry in enumerate(entries):
+            defaults = {
+                "id": entry.get("name", f"policy-{position}"),
+                "description": "",
+                "conditions": {},
+                "created_at": loaded_at,
+                "updated_at": loaded_at,
+            }
+            policies.append(AccessPolicyModel(**{**defaults, **entry}))
+        return policies
+    
+    def _file_signature(self) -> Optional[Tuple[int, int]]:
+        """Get the (mtime, size) signature of the policy file, or None if it is missing"""
+        try:
+            stat_info = os.stat(self.policy_file)
+        except FileNotFoundError:
+            return None
+        return (stat_info.st_mtime_ns, stat_info.st_size)
+    
+    def build_snapshot(self) -> PolicySnapshot:
+        """
+        Read, parse and compile the policy file.
+        
+        Returns:
+            Compiled PolicySnapshot
+        """
+        with open(self.policy_file, "r", encoding="utf-8") as file:
+            entries = json.load(file)
+        loaded_at = datetime.fromtimestamp(os.path.getmtime(self.policy_file))
+        return PolicySnapshot.from_policies(self.parse_policies(entries, loaded_at))
+    
+    def load(self) -> bool:
+        """
+        Load the policy file if it exists and swap in its policies.
+        
+        Returns:
+            True if policies were loaded, False if the file does not exist
+        """
+        signature = self._file_signature()
+        if signature is None:
+            logger.warning(f"Policy file not found: {self.policy_file}")
+            return False
+        
+        snapshot = self.build_snapshot()
+        self.access_control_service.swap_snapshot(snapshot)
+        self._signature = signature
+        logger.info(f"Loaded {len(snapshot.policies)} policies from {self.policy_file}")
+        return True
+    
+    async def reload_if_changed(self) -> bool:
+        """
+        Rebuild and swap the policies if the policy file changed.
+        
+        Parsing and compiling run in a worker thread, so in-flight access
+        checks keep using the previous snapshot without waiting. A file that
+        fails to parse is logged and the previous snapshot stays active.
+        
+        Returns:
+            True if a new snapshot was swapped in, False otherwise
+        """
+        signature = self._file_signature()
+        if signature is None or signature == self._signature:
+            return False
+        
+        try:
+            snapshot = await asyncio.to_thread(self.build_snapshot)
+        except Exception as e:
+            logger.error(f"Failed to reload policies from {self.policy_file}: {str(e)}")
+            # Do not retry until the file changes again
+            self._signature = signature
+            return False
+        
+        self.access_control_service.swap_snapshot(snapshot)
+        self._signature = signature
+        logger.info(f"Reloaded {len(snapshot.policies)} policies from {self.policy_file}")
+        return True
+    
+    async def run_watcher(self) -> None:
+        """Poll the policy file for changes until cancelled."""
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await self.reload_if_changed()
+            except Exception as e:
+                logger.error(f"Policy reload check failed: {str(e)}", exc_info=True)
+    
+    def start_watcher(self) -> asyncio.Task:
+        """
+        Start watching the policy file on the running event loop.
+        
+        Returns:
+            The watcher task
+            
+        Raises:
+            ValueError: If the poll interval is not positive
+        """
+        if self.poll_interval <= 0:
+            raise ValueError(f"Policy reload interval must be positive, got {self.poll_interval}")
+        if self._watcher_task is None or self._watcher_task.done():
+            self._watcher_task = asyncio.get_running_loop().create_task(self.run_watcher())
+        return self._watcher_task
+    
+    async def stop_watcher(self) -> None:
+        """Stop watching the policy file if the watcher is running."""
+        if self._watcher_task is not None:
+            self._watcher_task.cancel()
+            try:
+                await self._watcher_task
+            except asyncio.CancelledError:
+                pass
+            self._watcher_task = None
\ No newline at end of file
@@ -0,0 +1,79 @@
+import time
+from contextlib import contextmanager, nullcontext
+from typing import ContextManager, Dict, Iterator, Optional
+
+class AuditContext:
+    """
+    Request-scoped audit information.
+    
+    Middleware and routes fill in what they learn while handling a request;
+    the audit middleware emits it as a single record when the request ends.
+    """
+    
+    __slots__ = (
+        "method", "path", "ip_address", "principal", "resource", "action", "decision",
+        "outcome", "details", "status_code", "bytes", "timings", "_start"
+    )
+    
+    def __init__(self, method: str = "", path: str = "", ip_address: str = ""):
+        self.method = method
+        self.path = path
+        self.ip_address = ip_address
+        self.principal = "anonymous"
+        # Resource and action default to the request path and method
+        self.resource: Optional[str] = None
+        self.action: Optional[str] = None
+        self.decision = ""
+        self.outcome: Optional[str] = None
+        self.details = ""
+        self.status_code = 0
+        self.bytes = 0
+        # Stage name -> duration in milliseconds
+        self.timings: Dict[str, float] = {}
+        self._start = time.perf_counter()
+    
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Time a stage of request handling.
+        
+        Args:
+            name: Stage name, e.g. "auth" or "authz"
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = round((time.perf_counter() - start) * 1000, 3)
+    
+    def elapsed_ms(self) -> float:
+        """Get the milliseconds since the request started"""
+        return round((time.perf_counter() - self._start) * 1000, 3)
+    
+    def resolve_outcome(self) -> str:
+        """
+        Get the request outcome.
+        
+        Returns:
+            The outcome set by the route, or one derived from the status code
+        """
+        if self.outcome:
+            return self.outcome
+        if self.status_code in (401, 403):
+            return "denied"
+        if 0 < self.status_code < 400:
+            return "success"
+        return "error"
+
+def audit_stage(audit_context: Optional[AuditContext], name: str) -> ContextManager:
+    """
+    Time a stage of request handling if the request has an audit context.
+    
+    Args:
+        audit_context: Audit context of the request, or None
+        name: Stage name
+        
+    Returns:
+        Context manager timing the stage
+    """
+    return audit_context.stage(name) if audit_context is not None else nullcontext()
\ No newline at end of file
@@ -0,0 +1,203 @@
+import gzip
+import logging
+import os
+import queue
+import shutil
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional
+
+logger = logging.getLogger("audit_rotation")
+
+_STOP = object()
+
+class LogRotator:
+    """
+    Rotates a log file into timestamped segments by size and age.
+    
+    Rotation itself is a rename done by the thread that writes the log.
+    Closed segments are gzip-compressed and old segments deleted by a
+    separate background thread, so neither delays the writer.
+    """
+    
+    def __init__(self, log_file: str, max_bytes: int = 0, max_age: float = 0,
+                 retention_days: float = 0, max_segments: int = 0,
+                 on_retention: Optional[Callable[[datetime], None]] = None):
+        """
+        Initialize the log rotator.
+        
+        Args:
+            log_file: Path to the active log file
+            max_bytes: Rotate before the file would exceed this size (0 disables)
+            max_age: Rotate segments older than this many seconds (0 disables)
+            retention_days: Delete segments older than this many days (0 keeps them)
+            max_segments: Keep at most this many closed segments (0 keeps all)
+            on_retention: Called with the retention cutoff after old segments are deleted
+        """
+        if max_bytes < 0 or max_age < 0 or retention_days < 0 or max_segments < 0:
+            raise ValueError("Audit rotation limits must not be negative")
+        
+        self.log_file = log_file
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.retention_days = retention_days
+        self.max_segments = max_segments
+        self.on_retention = on_retention
+        self.rotations = 0
+        # Size and start time of the active segment; an existing file counts
+        # as started now since its creation time is not portable
+        self._size = os.path.getsize(log_file) if os.path.exists(log_file) else 0
+        self._started = time.time()
+        self._queue: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+    
+    def before_write(self, size: int) -> Optional[str]:
+        """
+        Rotate the log file if writing more data would exceed the limits.
+        
+        Must be called by the thread that writes the log file.
+        
+        Args:
+            size: Number of bytes about to be written
+            
+        Returns:
+            Path of the closed segment, or None if the file was not rotated
+        """
+        if self._size == 0:
+            return None
+        too_big = self.max_bytes and self._size + size > self.max_bytes
+        too_old = self.max_age and time.time() - self._started >= self.max_age
+        if not (too_big or too_old):
+            return None
+        return self.rotate()
+    
+    def after_write(self, size: int) -> None:
+        """
+        Account for data written to the active segment.
+        
+        Args:
+            size: Number of bytes written
+        """
+        self._size += size
+    
+    def rotate(self) -> Optional[str]:
+        """
+        Close the active segment and queue it for compression.
+        
+        Returns:
+            Path of the closed segment, or None if there was nothing to rotate
+        """
+        if not os.path.exists(self.log_file):
+            return None
+        segment = f"{self.log_file}.{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}"
+        os.replace(self.log_file, segment)
+        self._size = 0
+        self._started = time.time()
+        self.rotations += 1
+        self._ensure_started()
+        self._queue.put(segment)
+        return segment
+    
+    def list_segments(self) -> List[str]:
+        """
+        List closed segments, oldest first.
+        
+        Returns:
+            Paths of compressed and uncompressed segments
+        """
+        directory = os.path.dirname(self.log_file) or "."
+        prefix = os.path.basename(self.log_file) + "."
+        names = sorted(name for name in os.listdir(directory) if name.startswith(prefix))
+        return [os.path.join(directory, name) for name in names]
+    
+    def apply_retention(self, now: Optional[datetime] = None) -> int:
+        """
+        Delete segments beyond the retention age or count.
+        
+        Args:
+            now: Current time, for testing
+            
+        Returns:
+            Number of segments deleted
+        """
+        segments = self.list_segments()
+        expired = set()
+        if self.max_segments and len(segments) > self.max_segments:
+            expired.update(segments[:len(segments) - self.max_segments])
+        
+        cutoff = None
+        if self.retention_days:
+            cutoff = (now or datetime.now()) - timedelta(days=self.retention_days)
+            for segment in segments:
+                if datetime.fromtimestamp(os.path.getmtime(segment)) < cutoff:
+                    expired.add(segment)
+        
+        for segment in expired:
+            try:
+                os.remove(segment)
+            except FileNotFoundError:
+                pass
+        if cutoff is not None and self.on_retention is not None:
+            self.on_retention(cutoff)
+        return len(expired)
+    
+    def flush(self) -> None:
+        """Wait until every closed segment has been compressed."""
+        if self._thread is not None:
+            self._queue.join()
+    
+    def close(self) -> None:
+        """Compress pending segments and stop the background thread."""
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join()
+    
+    def _ensure_started(self) -> None:
+        """Start the compression thread on first use."""
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="audit-compressor", daemon=True)
+                    self._thread.start()
+    
+    def _run(self) -> None:
+        """Compress closed segments and apply the retention policy."""
+        while True:
+            segment = self._queue.get()
+            try:
+                if segment is _STOP:
+                    break
+                self._compress(segment)
+                self.apply_retention()
+            except FileNotFoundError:
+                # Already removed by the retention policy
+                pass
+            except Exception as e:
+                logger.error(f"Failed to process audit segment {segment}: {str(e)}", exc_info=True)
+            finally:
+                self._queue.task_done()
+    
+    @staticmethod
+    def _compress(segment: str) -> str:
+        """
+        Gzip a closed segment and remove the uncompressed file.
+        
+        Args:
+            segment: Path of the segment
+            
+        Returns:
+            Path of the compressed segment
+        """
+        compressed = segment + ".gz"
+        with open(segment, "rb") as source, gzip.open(compressed, "wb") as target:
+            shutil.copyfileobj(source, target)
+        # Keep the segment's age so retention is based on when it was written
+        stat_info = os.stat(segment)
+        os.utime(compressed, ns=(stat_info.st_atime_ns, stat_info.st_mtime_ns))
+        os.remove(segment)
+        return compressed
\ No newline at end of file
@@ -0,0 +1,121 @@
+import random
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from src.utils.policy_index import compile_glob
+
+# Outcomes that are always recorded in full, whatever the sampling rate
+ALWAYS_RECORDED = frozenset({"denied", "error"})
+
+class SamplingPolicy:
+    """
+    Decides which successful requests get a full audit record.
+    
+    Rules match a principal and resource glob and are checked in order;
+    the first match sets the sampling rate, otherwise the default applies.
+    Denials and errors are never sampled out.
+    """
+    
+    def __init__(self, default_rate: float = 1.0, rules: Optional[List[Dict[str, Any]]] = None,
+                 random_source: Callable[[], float] = random.random):
+        """
+        Initialize the sampling policy.
+        
+        Args:
+            default_rate: Fraction of successes recorded when no rule matches
+            rules: Rules like {"principal": "llm-*", "resource": "file:public/*", "rate": 0.01};
+                principal and resource default to "*"
+            random_source: Function returning a float in [0, 1)
+            
+        Raises:
+            ValueError: If a rate is outside [0, 1] or a rule is malformed
+        """
+        self.default_rate = self._check_rate(default_rate)
+        self.rules = []
+        for rule in rules or []:
+            if not isinstance(rule, dict) or "rate" not in rule:
+                raise ValueError(f"Audit sampling rule needs a rate: {rule!r}")
+            self.rules.append((
+                compile_glob(rule.get("principal", "*")),
+                compile_glob(rule.get("resource", "*")),
+                self._check_rate(rule["rate"])
+            ))
+        self.random_source = random_source
+    
+    @staticmethod
+    def _check_rate(rate: Any) -> float:
+        """Validate a sampling rate"""
+        if isinstance(rate, bool) or not isinstance(rate, (int, float)) or not 0 <= rate <= 1:
+            raise ValueError(f"Audit sampling rate must be between 0 and 1, got {rate!r}")
+        return float(rate)
+    
+    def rate_for(self, principal: str, resource: str) -> float:
+        """
+        Get the sampling rate for successes of a principal on a resource.
+        
+        Args:
+            principal: Principal of the request
+            resource: Resource of the request
+            
+        Returns:
+            Fraction of successes to record
+        """
+        for principal_pattern, resource_pattern, rate in self.rules:
+            if principal_pattern.match(principal) and resource_pattern.match(resource):
+                return rate
+        return self.default_rate
+    
+    def should_record(self, principal: str, resource: str, outcome: str) -> bool:
+        """
+        Decide whether a request gets a full audit record.
+        
+        Args:
+            principal: Principal of the request
+            resource: Resource of the request
+            outcome: Outcome of the request
+            
+        Returns:
+            True if the record should be written
+        """
+        if outcome in ALWAYS_RECORDED:
+            return True
+        rate = self.rate_for(principal, resource)
+        if rate >= 1:
+            return True
+        return rate > 0 and self.random_source() < rate
+
+class AuditCounters:
+    """Exact request counts per principal, action and outcome since the last drain"""
+    
+    def __init__(self):
+        self.counts: Dict[Tuple[str, str, str], int] = {}
+        self.window_start = datetime.now()
+        self._lock = threading.Lock()
+    
+    def increment(self, principal: str, action: str, outcome: str) -> None:
+        """
+        Count one request.
+        
+        Args:
+            principal: Principal of the request
+            action: Action of the request
+            outcome: Outcome of the request
+        """
+        key = (principal, action, outcome)
+        with self._lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+    
+    def drain(self) -> Tuple[datetime, datetime, Dict[Tuple[str, str, str], int]]:
+        """
+        Take the current counts and start a new window.
+        
+        Returns:
+            Tuple of (window start, window end, counts)
+        """
+        with self._lock:
+            counts = self.counts
+            window_start = self.window_start
+            window_end = datetime.now()
+            self.counts = {}
+            self.window_start = window_end
+        return window_start, window_end, counts
\ No newline at end of file
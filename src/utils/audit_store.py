@@ -0,0 +1,262 @@
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+# Columns in insertion order with the value used when a record omits them;
+# timings are stored as a JSON object
+COLUMN_DEFAULTS = {
+    "id": "",
+    "timestamp": "",
+    "principal": "",
+    "resource": "",
+    "action": "",
+    "outcome": "",
+    "details": "",
+    "ip_address": "",
+    "decision": "",
+    "status_code": 0,
+    "bytes": 0,
+    "duration_ms": 0.0,
+    "timings": {},
+}
+COLUMNS = tuple(COLUMN_DEFAULTS)
+
+# Columns of rollup records, which are kept apart from request records so
+# their counts are never mistaken for requests
+ROLLUP_COLUMNS = ("id", "timestamp", "window_start", "principal", "action", "outcome", "count")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS audit_log (
+    id TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    principal TEXT NOT NULL,
+    resource TEXT NOT NULL,
+    action TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    details TEXT NOT NULL DEFAULT '',
+    ip_address TEXT NOT NULL DEFAULT '',
+    decision TEXT NOT NULL DEFAULT '',
+    status_code INTEGER NOT NULL DEFAULT 0,
+    bytes INTEGER NOT NULL DEFAULT 0,
+    duration_ms REAL NOT NULL DEFAULT 0,
+    timings TEXT NOT NULL DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS audit_log_timestamp ON audit_log (timestamp);
+CREATE INDEX IF NOT EXISTS audit_log_principal ON audit_log (principal, timestamp);
+CREATE INDEX IF NOT EXISTS audit_log_resource ON audit_log (resource, timestamp);
+CREATE INDEX IF NOT EXISTS audit_log_outcome ON audit_log (outcome, timestamp);
+CREATE TABLE IF NOT EXISTS audit_rollup (
+    id TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    window_start TEXT NOT NULL,
+    principal TEXT NOT NULL,
+    action TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    count INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS audit_rollup_timestamp ON audit_rollup (timestamp);
+CREATE INDEX IF NOT EXISTS audit_rollup_principal ON audit_rollup (principal, timestamp);
+"""
+
+# Upper bound for resource prefix range scans
+_MAX_CHAR = "\U0010ffff"
+
+class AuditStore:
+    """
+    Indexed audit record store backed by SQLite in WAL mode.
+    
+    The audit writer thread inserts batches while queries run on their own
+    connections; WAL lets readers proceed without waiting for the writer.
+    Timestamps are ISO 8601 strings, so string order is time order.
+    """
+    
+    def __init__(self, db_file: str):
+        """
+        Initialize the audit store.
+        
+        Args:
+            db_file: Path to the SQLite database file
+        """
+        self.db_file = db_file
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Get this thread's connection, creating the schema on first use"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.db_file)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        if not self._schema_ready:
+            with self._schema_lock:
+                if not self._schema_ready:
+                    connection.executescript(_SCHEMA)
+                    self._schema_ready = True
+        return connection
+    
+    def insert_batch(self, records: List[Dict[str, Any]]) -> None:
+        """
+        Insert a batch of audit records in one transaction.
+        
+        Rollup records ("record_type": "rollup") go to their own table.
+        
+        Args:
+            records: Audit records as written to the log file
+        """
+        rows = []
+        rollup_rows = []
+        for record in records:
+            if record.get("record_type") == "rollup":
+                rollup_rows.append(tuple(record[column] for column in ROLLUP_COLUMNS))
+                continue
+            row = {**COLUMN_DEFAULTS, **record}
+            row["timings"] = json.dumps(row["timings"])
+            rows.append(tuple(row[column] for column in COLUMNS))
+        connection = self._connect()
+        with connection:
+            if rows:
+                connection.executemany(
+                    f"INSERT INTO audit_log ({', '.join(COLUMNS)}) VALUES ({', '.join('?' for _ in COLUMNS)})",
+                    rows
+                )
+            if rollup_rows:
+                connection.executemany(
+                    f"INSERT INTO audit_rollup ({', '.join(ROLLUP_COLUMNS)}) VALUES ({', '.join('?' for _ in ROLLUP_COLUMNS)})",
+                    rollup_rows
+                )
+    
+    def iter_logs(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        principal: Optional[str] = None,
+        resource_prefix: Optional[str] = None,
+        outcome: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream matching audit records, newest first.
+        
+        Every filter is served by an index, so a query only reads the rows
+        it returns plus the index entries in the requested time range.
+        
+        Args:
+            start: Only records at or after this time
+            end: Only records before this time
+            principal: Only records of this principal
+            resource_prefix: Only records whose resource starts with this prefix
+            outcome: Only records with this outcome
+            limit: Maximum number of records
+            
+        Returns:
+            Iterator of audit record dictionaries
+        """
+        clauses = []
+        params: List[Any] = []
+        if start is not None:
+            clauses.append("timestamp >= ?")
+            params.append(start.isoformat())
+        if end is not None:
+            clauses.append("timestamp < ?")
+            params.append(end.isoformat())
+        if principal is not None:
+            clauses.append("principal = ?")
+            params.append(principal)
+        if resource_prefix:
+            clauses.append("resource >= ? AND resource < ?")
+            params.extend([resource_prefix, resource_prefix + _MAX_CHAR])
+        if outcome is not None:
+            clauses.append("outcome = ?")
+            params.append(outcome)
+        
+        sql = f"SELECT {', '.join(COLUMNS)} FROM audit_log"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY timestamp DESC, rowid DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        
+        cursor = self._connect().execute(sql, params)
+        try:
+            for row in cursor:
+                record = dict(zip(COLUMNS, row))
+                record["timings"] = json.loads(record["timings"])
+                yield record
+        finally:
+            cursor.close()
+    
+    def iter_rollups(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        principal: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream matching rollup records, newest first.
+        
+        Args:
+            start: Only rollups written at or after this time
+            end: Only rollups written before this time
+            principal: Only rollups of this principal
+            limit: Maximum number of rollups
+            
+        Returns:
+            Iterator of rollup record dictionaries
+        """
+        clauses = []
+        params: List[Any] = []
+        if start is not None:
+            clauses.append("timestamp >= ?")
+            params.append(start.isoformat())
+        if end is not None:
+            clauses.append("timestamp < ?")
+            params.append(end.isoformat())
+        if principal is not None:
+            clauses.append("principal = ?")
+            params.append(principal)
+        
+        sql = f"SELECT {', '.join(ROLLUP_COLUMNS)} FROM audit_rollup"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY timestamp DESC, rowid DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        
+        cursor = self._connect().execute(sql, params)
+        try:
+            for row in cursor:
+                yield dict(zip(ROLLUP_COLUMNS, row))
+        finally:
+            cursor.close()
+    
+    def delete_before(self, cutoff: datetime) -> int:
+        """
+        Delete records and rollups older than a cutoff.
+        
+        Args:
+            cutoff: Records before this time are deleted
+            
+        Returns:
+            Number of records deleted
+        """
+        connection = self._connect()
+        with connection:
+            cursor = connection.execute("DELETE FROM audit_log WHERE timestamp < ?", (cutoff.isoformat(),))
+            deleted = cursor.rowcount
+            cursor = connection.execute("DELETE FROM audit_rollup WHERE timestamp < ?", (cutoff.isoformat(),))
+        return deleted + cursor.rowcount
+    
+    def close(self) -> None:
+        """Close this thread's connection."""
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
\ No newline at end of file
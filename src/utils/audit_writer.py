@@ -0,0 +1,175 @@
+import json
+import logging
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from src.utils.audit_store import AuditStore
+from src.utils.audit_rotation import LogRotator
+
+logger = logging.getLogger("audit_writer")
+
+# What to do with a record when the queue is full
+OVERFLOW_BLOCK = "block"
+OVERFLOW_DROP = "drop"
+
+_STOP = object()
+
+class AuditWriter:
+    def __init__(self, log_file: str, batch_size: int = 256, flush_interval: float = 0.5,
+                 queue_size: int = 10000, overflow_policy: str = OVERFLOW_DROP, block_timeout: float = 0.1,
+                 store: Optional[AuditStore] = None, rotator: Optional[LogRotator] = None):
+        """
+        Initialize the audit writer.
+        
+        Records are queued by the caller and appended to the log file in
+        batches by a background thread, so request handling never waits on
+        disk I/O. Records are written on the event loop thread, so when the
+        queue is full even the "block" policy waits at most block_timeout
+        before dropping the record; waiting longer would stall every request.
+        
+        Args:
+            log_file: Path to the audit log file
+            batch_size: Maximum number of records per write
+            flush_interval: Maximum seconds a queued record waits before being written
+            queue_size: Maximum number of queued records
+            overflow_policy: "drop" to discard the record and count it when the
+                queue is full, "block" to wait up to block_timeout for space first
+            block_timeout: Maximum seconds the "block" policy waits for space
+            store: Indexed store that also receives every batch, if any
+            rotator: Rotates the log file into segments, if any
+        """
+        if batch_size < 1:
+            raise ValueError(f"Audit batch size must be at least 1, got {batch_size}")
+        if flush_interval <= 0:
+            raise ValueError(f"Audit flush interval must be positive, got {flush_interval}")
+        if overflow_policy not in (OVERFLOW_BLOCK, OVERFLOW_DROP):
+            raise ValueError(f"Unknown audit overflow policy: {overflow_policy}")
+        if block_timeout < 0:
+            raise ValueError(f"Audit block timeout must not be negative, got {block_timeout}")
+        
+        self.log_file = log_file
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow_policy = overflow_policy
+        self.block_timeout = block_timeout
+        self.store = store
+        self.rotator = rotator
+        self.written = 0
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+    
+    def write(self, record: Dict[str, Any]) -> bool:
+        """
+        Queue a record for writing.
+        
+        Args:
+            record: JSON-serializable audit record
+            
+        Returns:
+            True if the record was queued, False if it was dropped
+        """
+        self._ensure_started()
+        try:
+            if self.overflow_policy == OVERFLOW_BLOCK:
+                self._queue.put(record, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(record)
+            return True
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+    
+    def flush(self) -> None:
+        """Wait until every queued record has been written."""
+        if self._thread is not None:
+            self._queue.join()
+    
+    def close(self) -> None:
+        """Write all queued records and stop the writer thread."""
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join()
+        if self.rotator is not None:
+            self.rotator.close()
+    
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get writer counters.
+        
+        Returns:
+            Dictionary with written, dropped and queued record counts
+        """
+        return {
+            "written": self.written,
+            "dropped": self.dropped,
+            "queued": self._queue.qsize(),
+        }
+    
+    def _ensure_started(self) -> None:
+        """Start the writer thread on first use."""
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+                    self._thread.start()
+    
+    def _run(self) -> None:
+        """Collect queued records into batches and append them to the log file."""
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                self._queue.task_done()
+                break
+            
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    self._queue.task_done()
+                    stopping = True
+                    break
+                batch.append(item)
+            
+            try:
+                self._write_batch(batch)
+            except Exception as e:
+                logger.error(f"Failed to write {len(batch)} audit records: {str(e)}", exc_info=True)
+            if self.store is not None:
+                try:
+                    self.store.insert_batch(batch)
+                except Exception as e:
+                    logger.error(f"Failed to index {len(batch)} audit records: {str(e)}", exc_info=True)
+            for _ in batch:
+                self._queue.task_done()
+        
+        if self.store is not None:
+            self.store.close()
+    
+    def _write_batch(self, batch: List[Dict[str, Any]]) -> None:
+        """
+        Append a batch of records to the log file as JSON lines.
+        
+        Args:
+            batch: Records to write
+        """
+        data = "".join(json.dumps(record) + "\n" for record in batch).encode("utf-8")
+        if self.rotator is not None:
+            self.rotator.before_write(len(data))
+        with open(self.log_file, "ab") as file:
+            file.write(data)
+        if self.rotator is not None:
+            self.rotator.after_write(len(data))
+        self.written += len(batch)
\ No newline at end of file
@@ -0,0 +1,97 @@
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from src.config import settings
+
+class BlockingIOPool:
+    """
+    Bounded thread pool for one class of blocking filesystem work.
+    
+    Each class of work gets its own pool, separate from the event loop's
+    default executor, so a burst of bulk reads cannot starve the stat calls
+    other requests are waiting on. The pool is created on first use and can
+    be shut down and reused.
+    """
+    
+    def __init__(self, name: str, max_workers: int):
+        """
+        Initialize the pool.
+        
+        Args:
+            name: Pool name, used for thread names and metrics
+            max_workers: Maximum number of threads
+            
+        Raises:
+            ValueError: If max_workers is not positive
+        """
+        if max_workers < 1:
+            raise ValueError(f"Blocking I/O pool {name!r} needs at least one worker, got {max_workers}")
+        self.name = name
+        self.max_workers = max_workers
+        # Calls submitted and not yet finished, running or queued
+        self.in_flight = 0
+        self.completed = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Get the executor, creating it on first use"""
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix=f"io-{self.name}")
+        return self._executor
+    
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run a blocking function on the pool without blocking the event loop.
+        
+        Context variables, like the request trace, are visible to the function.
+        
+        Args:
+            func: Blocking function
+            *args: Positional arguments for the function
+            **kwargs: Keyword arguments for the function
+            
+        Returns:
+            Return value of the function
+        """
+        call = functools.partial(contextvars.copy_context().run, func, *args, **kwargs)
+        with self._lock:
+            self.in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._get_executor(), call)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+                self.completed += 1
+    
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get pool counters.
+        
+        Returns:
+            Dictionary with workers, in_flight and completed
+        """
+        return {"workers": self.max_workers, "in_flight": self.in_flight, "completed": self.completed}
+    
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stop the pool's threads; the next call starts a new executor.
+        
+        Args:
+            wait: Wait for running calls to finish
+        """
+        with self._lock:
+            executor = self._executor
+            self._executor = None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+# Pool for metadata calls: stat, exists, directory walks
+stat_pool = BlockingIOPool("stat", settings.IO_STAT_WORKERS)
+# Pool for bulk file reads
+read_pool = BlockingIOPool("read", settings.IO_READ_WORKERS)
\ No newline at end of file
@@ -0,0 +1,109 @@
+import threading
+import time
+from contextvars import ContextVar, Token
+from typing import Optional
+
+# Reasons a request is cancelled
+CLIENT_DISCONNECTED = "client disconnected"
+DEADLINE_EXCEEDED = "deadline exceeded"
+ABANDONED = "abandoned by every caller"
+
+class OperationCancelled(Exception):
+    """Raised by cancellation checks once the request has been cancelled"""
+    
+    def __init__(self, reason: str):
+        super().__init__(f"Request cancelled: {reason}")
+        self.reason = reason
+
+class CancellationToken:
+    """
+    Cancellation state of one request, shared with the threads doing its work.
+    
+    Long filesystem loops call check() between steps, so work for a client
+    that has gone away, or that has run past its deadline, stops at the next
+    step instead of running to completion.
+    """
+    
+    __slots__ = ("deadline", "reason", "_event")
+    
+    def __init__(self, deadline: Optional[float] = None):
+        """
+        Initialize the token.
+        
+        Args:
+            deadline: time.monotonic() value after which the request is cancelled, or None
+        """
+        self.deadline = deadline
+        self.reason: Optional[str] = None
+        self._event = threading.Event()
+    
+    def cancel(self, reason: str) -> None:
+        """
+        Cancel the request; the first reason given is kept.
+        
+        Args:
+            reason: Why the request was cancelled
+        """
+        if not self._event.is_set():
+            self.reason = reason
+            self._event.set()
+    
+    @property
+    def cancelled(self) -> bool:
+        """Whether the request has been cancelled or is past its deadline"""
+        if self._event.is_set():
+            return True
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            self.cancel(DEADLINE_EXCEEDED)
+            return True
+        return False
+    
+    def check(self) -> None:
+        """
+        Stop the current operation if the request has been cancelled.
+        
+        Raises:
+            OperationCancelled: If the request has been cancelled
+        """
+        if self.cancelled:
+            raise OperationCancelled(self.reason)
+
+_current_token: ContextVar[Optional[CancellationToken]] = ContextVar("cancellation_token", default=None)
+
+def check_cancelled() -> None:
+    """
+    Stop the current operation if the current request has been cancelled.
+    
+    A no-op outside of a request.
+    
+    Raises:
+        OperationCancelled: If the request has been cancelled
+    """
+    token = _current_token.get()
+    if token is not None:
+        token.check()
+
+def current_token() -> Optional[CancellationToken]:
+    """Get the cancellation token of the current request, if any"""
+    return _current_token.get()
+
+def set_token(token: Optional[CancellationToken]) -> Token:
+    """
+    Make a token the current request's token.
+    
+    Args:
+        token: Token to use, or None for no cancellation
+        
+    Returns:
+        Token to pass to reset_token
+    """
+    return _current_token.set(token)
+
+def reset_token(token: Token) -> None:
+    """
+    Restore the token that was current before set_token.
+    
+    Args:
+        token: Value returned by set_token
+    """
+    _current_token.reset(token)
\ No newline at end of file
@@ -0,0 +1,85 @@
+from collections import OrderedDict
+import threading
+from typing import Any, Dict, Hashable, Optional
+
+class DecisionCache:
+    def __init__(self, maxsize: int = 10000):
+        """
+        Initialize the access decision cache.
+        
+        Entries are tagged with the policy-set version they were computed
+        under, so bumping the version invalidates every entry at once.
+        
+        Args:
+            maxsize: Maximum number of entries in the cache
+        """
+        self.maxsize = maxsize
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.cache: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Get a cached decision.
+        
+        Args:
+            key: Cache key
+            
+        Returns:
+            Cached decision or None if not found or computed under an older policy set
+        """
+        with self._lock:
+            entry = self.cache.get(key)
+            if entry is None or entry[0] != self.version:
+                self.misses += 1
+                return None
+            self.cache.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+    
+    def set(self, key: Hashable, decision: Any, version: int) -> None:
+        """
+        Cache a decision.
+        
+        Args:
+            key: Cache key
+            decision: Access decision
+            version: Policy-set version the decision was computed under
+        """
+        with self._lock:
+            # Drop decisions that raced with a policy change
+            if version != self.version:
+                return
+            self.cache[key] = (version, decision)
+            self.cache.move_to_end(key)
+            # Evict least recently used entries beyond max size
+            while len(self.cache) > self.maxsize:
+                self.cache.popitem(last=False)
+    
+    def invalidate(self) -> int:
+        """
+        Invalidate all cached decisions by bumping the policy-set version.
+        
+        Returns:
+            The new policy-set version
+        """
+        with self._lock:
+            self.version += 1
+            self.cache.clear()
+            return self.version
+    
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get cache counters.
+        
+        Returns:
+            Dictionary with hits, misses, size and version
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self.cache),
+            "version": self.version,
+        }
\ No newline at end of file
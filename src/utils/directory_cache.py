@@ -1,4 +1,5 @@
 from functools import lru_cache
+import threading
 import time
 from typing import Dict, Any, Optional
 
@@ -15,6 +16,12 @@ class DirectoryCache:
         self.ttl = ttl
         self.cache: Dict[str, Dict[str, Any]] = {}
         self.access_times: Dict[str, float] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Listings are built on the blocking I/O threads, so entries are
+        # read and written from several threads at once
+        self._lock = threading.Lock()
     
     def get(self, key: str) -> Optional[Any]:
         """
@@ -26,19 +33,23 @@ class DirectoryCache:
         Returns:
             Cached value or None if not found or expired
         """
-        if key not in self.cache:
-            return None
-        
-        # Check if entry is expired
-        if time.time() - self.access_times[key] > self.ttl:
-            # Remove expired entry
-            del self.cache[key]
-            del self.access_times[key]
-            return None
-        
-        # Update access time
-        self.access_times[key] = time.time()
-        return self.cache[key]["value"]
+        with self._lock:
+            if key not in self.cache:
+                self.misses += 1
+                return None
+            
+            # Check if entry is expired
+            if time.time() - self.access_times[key] > self.ttl:
+                # Remove expired entry
+                del self.cache[key]
+                del self.access_times[key]
+                self.misses += 1
+                return None
+            
+            # Update access time
+            self.access_times[key] = time.time()
+            self.hits += 1
+            return self.cache[key]["value"]
     
     def set(self, key: str, value: Any) -> None:
         """
@@ -48,20 +59,37 @@ class DirectoryCache:
             key: Cache key
             value: Value to cache
         """
-        # If cache is at max size, remove oldest entry
-        if len(self.cache) >= self.maxsize:
-            oldest_key = min(self.access_times.keys(), key=lambda k: self.access_times[k])
-            del self.cache[oldest_key]
-            del self.access_times[oldest_key]
+        with self._lock:
+            # If cache is at max size, remove oldest entry
+            if len(self.cache) >= self.maxsize:
+                oldest_key = min(self.access_times.keys(), key=lambda k: self.access_times[k])
+                del self.cache[oldest_key]
+                del self.access_times[oldest_key]
+                self.evictions += 1
+            
+            # Add new entry
+            self.cache[key] = {"value": value}
+            self.access_times[key] = time.time()
+    
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get cache counters.
         
-        # Add new entry
-        self.cache[key] = {"value": value}
-        self.access_times[key] = time.time()
+        Returns:
+            Dictionary with hits, misses, evictions and size
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self.cache),
+        }
     
     def clear(self) -> None:
         """Clear the cache."""
-        self.cache.clear()
-        self.access_times.clear()
+        with self._lock:
+            self.cache.clear()
+            self.access_times.clear()
 
 # Global directory cache instance
 directory_cache = DirectoryCache()
\ No newline at end of file
@@ -1,6 +1,7 @@
 from fastapi import HTTPException, status
-from typing import Optional
+from typing import Dict, Optional
 import logging
+from src.utils.cancellation import DEADLINE_EXCEEDED
 
 # Set up logging
 logger = logging.getLogger("mcp_server")
@@ -9,8 +10,9 @@ logger.setLevel(logging.INFO)
 class MCPException(HTTPException):
     """Custom exception class for MCP Server"""
     
-    def __init__(self, status_code: int, detail: str, error_code: Optional[str] = None):
-        super().__init__(status_code=status_code, detail=detail)
+    def __init__(self, status_code: int, detail: str, error_code: Optional[str] = None,
+                 headers: Optional[Dict[str, str]] = None):
+        super().__init__(status_code=status_code, detail=detail, headers=headers)
         self.error_code = error_code
 
 def handle_file_not_found(path: str) -> None:
@@ -58,6 +60,40 @@ def handle_invalid_path(path: str) -> None:
         error_code="INVALID_PATH"
     )
 
+def handle_invalid_parameter(detail: str) -> None:
+    """Handle query parameters that are valid alone but not together"""
+    logger.warning(f"Invalid parameter: {detail}")
+    raise MCPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=detail,
+        error_code="INVALID_PARAMETER"
+    )
+
+def handle_server_busy(path: str, retry_after: str) -> None:
+    """Handle requests rejected because the server is at its memory budget"""
+    logger.warning(f"Server busy, rejected request for {path}")
+    raise MCPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Server busy",
+        error_code="SERVER_BUSY",
+        headers={"Retry-After": retry_after}
+    )
+
+def handle_request_cancelled(path: str, reason: str) -> None:
+    """Handle requests cancelled by a client disconnect or their deadline"""
+    logger.info(f"Request for {path} cancelled: {reason}")
+    if reason == DEADLINE_EXCEEDED:
+        raise MCPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail="Request deadline exceeded",
+            error_code="DEADLINE_EXCEEDED"
+        )
+    raise MCPException(
+        status_code=499,
+        detail="Client closed request",
+        error_code="CLIENT_CLOSED_REQUEST"
+    )
+
 def handle_internal_error(error: Exception) -> None:
     """Handle internal server errors"""
     logger.error(f"Internal server error: {str(error)}", exc_info=True)
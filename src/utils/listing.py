@@ -0,0 +1,205 @@
+import os
+import stat
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from pydantic_core import to_json
+
+# Fields of a listing entry, in the order of the models
+ENTRY_FIELDS = ("id", "name", "path", "size", "type", "modified_at", "created_at", "permissions")
+
+# Fields that need a stat of the entry
+STAT_FIELDS = frozenset({"size", "modified_at", "created_at", "permissions"})
+
+# Array of the columnar format holding each field that has one
+COLUMNS = {"name": "names", "type": "types", "size": "sizes", "modified_at": "mtimes", "permissions": "modes"}
+
+def _suffix(name: str) -> str:
+    """Get the extension of a file name the way pathlib does"""
+    index = name.rfind(".")
+    return name[index:] if 0 < index < len(name) - 1 else ""
+
+def parse_fields(value: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """
+    Parse a comma-separated field projection.
+    
+    Args:
+        value: Value of the fields parameter, e.g. "name,type,size", or None
+        
+    Returns:
+        Requested fields in model order, or None to include every field
+        
+    Raises:
+        ValueError: If no field or an unknown field is requested
+    """
+    if value is None:
+        return None
+    requested = {field.strip() for field in value.split(",") if field.strip()}
+    if not requested:
+        raise ValueError("No fields requested")
+    unknown = requested.difference(ENTRY_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return tuple(field for field in ENTRY_FIELDS if field in requested)
+
+class EntryRecord:
+    """
+    Listing entry kept as plain values until it is serialized.
+    
+    Serializes to the same JSON as FileModel, or DirectoryModel with empty
+    contents, without constructing or validating a model. Stat values are
+    kept raw and only formatted by the serializer that needs them; values
+    left out of a projection may be None.
+    """
+    
+    __slots__ = ("kind", "id", "name", "path", "stat_info")
+    
+    def __init__(self, kind: str, id: Optional[str], name: str, path: Optional[str],
+                 stat_info: Optional[os.stat_result]):
+        """
+        Initialize the record.
+        
+        Args:
+            kind: "file" or "directory"
+            id: Entry id, or None if not requested
+            name: Entry name
+            path: Entry path as reported to clients, or None if not requested
+            stat_info: Result of stat on the entry, or None if no stat field was requested
+        """
+        self.kind = kind
+        self.id = id
+        self.name = name
+        self.path = path
+        self.stat_info = stat_info
+    
+    def to_dict(self, fields: Optional[Tuple[str, ...]] = None) -> Dict[str, Any]:
+        """
+        Get the record in the public schema, with fields in model order.
+        
+        Args:
+            fields: Fields to include, or None for the full model; a
+                projection leaves out the contents of directories
+                
+        Returns:
+            JSON-serializable dictionary
+        """
+        if fields is not None:
+            return {field: _FORMATTERS[field](self) for field in fields if field != "type" or self.kind == "file"}
+        
+        stat_info = self.stat_info
+        # Formatted the way pydantic serializes naive datetimes
+        modified_at = datetime.fromtimestamp(stat_info.st_mtime).isoformat()
+        created_at = datetime.fromtimestamp(stat_info.st_ctime).isoformat()
+        if self.kind == "file":
+            return {
+                "id": self.id,
+                "name": self.name,
+                "path": self.path,
+                "size": stat_info.st_size,
+                "type": _suffix(self.name),
+                "modified_at": modified_at,
+                "created_at": created_at,
+                "permissions": stat.filemode(stat_info.st_mode),
+            }
+        return {
+            "id": self.id,
+            "name": self.name,
+            "path": self.path,
+            "size": stat_info.st_size,
+            "modified_at": modified_at,
+            "created_at": created_at,
+            "permissions": stat.filemode(stat_info.st_mode),
+            "contents": [],
+        }
+
+# Value of each field of a record in the default format
+_FORMATTERS: Dict[str, Callable[[EntryRecord], Any]] = {
+    "id": lambda record: record.id,
+    "name": lambda record: record.name,
+    "path": lambda record: record.path,
+    "size": lambda record: record.stat_info.st_size,
+    "type": lambda record: _suffix(record.name),
+    "modified_at": lambda record: datetime.fromtimestamp(record.stat_info.st_mtime).isoformat(),
+    "created_at": lambda record: datetime.fromtimestamp(record.stat_info.st_ctime).isoformat(),
+    "permissions": lambda record: stat.filemode(record.stat_info.st_mode),
+}
+
+# Value of each column of a record in the columnar format
+_COLUMN_VALUES: Dict[str, Callable[[EntryRecord], Any]] = {
+    "name": lambda record: record.name,
+    "type": lambda record: record.kind,
+    "size": lambda record: record.stat_info.st_size,
+    "modified_at": lambda record: record.stat_info.st_mtime,
+    "permissions": lambda record: record.stat_info.st_mode,
+}
+
+class DirectoryListing:
+    """A directory and the kind and scandir entry of each of its entries"""
+    
+    __slots__ = ("directory", "entries")
+    
+    def __init__(self, directory: EntryRecord, entries: List[Tuple[str, os.DirEntry]]):
+        """
+        Initialize the listing.
+        
+        Args:
+            directory: Record of the directory itself
+            entries: (kind, scandir entry) of every file and subdirectory
+        """
+        self.directory = directory
+        self.entries = entries
+
+def serialize_listing(directory: EntryRecord, contents: List[EntryRecord], total_count: int, has_more: bool,
+                      fields: Optional[Tuple[str, ...]] = None) -> bytes:
+    """
+    Serialize a listing page to JSON in the DirectoryResponse schema.
+    
+    The output matches what FastAPI produces for the response model,
+    without validating the entries again; encoding is done by pydantic's
+    serializer, which is several times faster than the json module.
+    
+    Args:
+        directory: Record of the directory
+        contents: Records of the entries to include
+        total_count: Number of entries the user may list
+        has_more: Whether entries follow the page
+        fields: Fields of the directory and its entries to include, or None for all
+        
+    Returns:
+        UTF-8 encoded JSON
+    """
+    body = directory.to_dict(fields)
+    body["contents"] = [entry.to_dict(fields) for entry in contents]
+    body["total_count"] = total_count
+    body["has_more"] = has_more
+    return to_json(body)
+
+def serialize_columnar_listing(directory: EntryRecord, contents: List[EntryRecord], total_count: int, has_more: bool,
+                               fields: Optional[Tuple[str, ...]] = None) -> bytes:
+    """
+    Serialize a listing page to JSON as parallel arrays.
+    
+    Keys are written once per listing instead of once per entry, entries
+    are named relative to the directory's path, and times and permissions
+    are sent raw rather than formatted.
+    
+    Args:
+        directory: Record of the directory
+        contents: Records of the entries to include
+        total_count: Number of entries the user may list
+        has_more: Whether entries follow the page
+        fields: Fields whose arrays to include, or None for all; fields
+            without an array are ignored
+            
+    Returns:
+        UTF-8 encoded JSON
+    """
+    body = {
+        "path": directory.path,
+        "total_count": total_count,
+        "has_more": has_more,
+    }
+    for field, column in COLUMNS.items():
+        if fields is None or field in fields:
+            value = _COLUMN_VALUES[field]
+            body[column] = [value(entry) for entry in contents]
+    return to_json(body)
\ No newline at end of file
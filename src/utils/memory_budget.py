@@ -0,0 +1,153 @@
+import asyncio
+from collections import deque
+from typing import Any, Deque, Dict, Tuple
+
+# Peak memory of a read per byte of file: the raw bytes, the decoded text
+# and the encoded response body
+READ_MEMORY_FACTOR = 3
+
+# Estimated memory per entry of a directory listing, models and JSON included
+LISTING_ENTRY_BYTES = 1024
+
+class MemoryBudgetExceeded(Exception):
+    """Raised when a request cannot be admitted within the memory budget"""
+    
+    def __init__(self, requested: int, retry_after: float):
+        super().__init__(f"Memory budget exhausted, {requested} bytes requested")
+        self.requested = requested
+        self.retry_after = retry_after
+
+class MemoryBudget:
+    """
+    Server-wide budget for the estimated bytes held by requests in flight.
+    
+    Requests reserve their estimated peak memory before doing expensive
+    work. When the budget is full they queue in arrival order for up to
+    queue_timeout seconds and are rejected after that. Reservations are
+    made and released on the event loop.
+    """
+    
+    def __init__(self, max_bytes: int, queue_timeout: float = 5.0):
+        """
+        Initialize the memory budget.
+        
+        Args:
+            max_bytes: Bytes that may be reserved at once (0 disables the budget)
+            queue_timeout: Seconds a request waits for room before it is rejected (0 rejects at once)
+            
+        Raises:
+            ValueError: If a limit is negative
+        """
+        if max_bytes < 0 or queue_timeout < 0:
+            raise ValueError("Memory budget limits must not be negative")
+        self.max_bytes = max_bytes
+        self.queue_timeout = queue_timeout
+        self.in_use = 0
+        self.queued = 0
+        self.rejected = 0
+        self._waiters: Deque[Tuple[int, asyncio.Future]] = deque()
+    
+    async def acquire(self, nbytes: int) -> int:
+        """
+        Reserve bytes, waiting for room if the budget is full.
+        
+        Args:
+            nbytes: Estimated bytes; capped at the budget so any request can run on its own
+            
+        Returns:
+            Bytes reserved, to pass to release
+            
+        Raises:
+            MemoryBudgetExceeded: If there was no room within the queue timeout
+        """
+        if not self.max_bytes:
+            return 0
+        nbytes = min(max(nbytes, 0), self.max_bytes)
+        # Requests already waiting go first so large ones are not starved
+        if not self._waiters and self.in_use + nbytes <= self.max_bytes:
+            self.in_use += nbytes
+            return nbytes
+        if not self.queue_timeout:
+            self.rejected += 1
+            raise MemoryBudgetExceeded(nbytes, 1.0)
+        
+        granted = asyncio.get_running_loop().create_future()
+        entry = (nbytes, granted)
+        self._waiters.append(entry)
+        self.queued += 1
+        try:
+            await asyncio.wait_for(asyncio.shield(granted), self.queue_timeout)
+        except asyncio.TimeoutError:
+            # The reservation may have been granted just as the wait timed out
+            if not granted.done():
+                self._leave_queue(entry)
+                self.rejected += 1
+                raise MemoryBudgetExceeded(nbytes, self.queue_timeout) from None
+        except BaseException:
+            # Cancelled while waiting; give back a reservation granted meanwhile
+            if granted.done():
+                self.release(nbytes)
+            else:
+                self._leave_queue(entry)
+            raise
+        return nbytes
+    
+    def _leave_queue(self, entry: Tuple[int, asyncio.Future]) -> None:
+        """Remove a waiter that gave up"""
+        entry[1].cancel()
+        self._waiters.remove(entry)
+        # The waiter may have been what blocked the ones behind it
+        self._wake()
+    
+    def release(self, nbytes: int) -> None:
+        """
+        Return reserved bytes and admit queued requests that now fit.
+        
+        Args:
+            nbytes: Bytes returned by acquire
+        """
+        self.in_use -= nbytes
+        self._wake()
+    
+    def _wake(self) -> None:
+        """Grant reservations to waiters in arrival order while they fit"""
+        while self._waiters:
+            nbytes, future = self._waiters[0]
+            if self.in_use + nbytes > self.max_bytes:
+                break
+            self._waiters.popleft()
+            self.in_use += nbytes
+            future.set_result(None)
+    
+    async def admit(self, state: Dict[str, Any], nbytes: int) -> None:
+        """
+        Reserve bytes for a request until it has been answered.
+        
+        The reservation is recorded in the request state and released by
+        MemoryBudgetMiddleware once the response has been sent.
+        
+        Args:
+            state: Request state (scope["state"])
+            nbytes: Estimated bytes
+            
+        Raises:
+            MemoryBudgetExceeded: If there was no room within the queue timeout
+        """
+        reserved = await self.acquire(nbytes)
+        state["memory_reserved"] = state.get("memory_reserved", 0) + reserved
+    
+    def get_stats(self) -> Dict[str, float]:
+        """
+        Get budget counters.
+        
+        Returns:
+            Dictionary with max_bytes, in_use, utilization, waiting, queued and rejected
+        """
+        return {
+            "max_bytes": self.max_bytes,
+            "in_use": self.in_use,
+            "utilization": self.in_use / self.max_bytes if self.max_bytes else 0.0,
+            "waiting": len(self._waiters),
+            "queued": self.queued,
+            "rejected": self.rejected,
+        }
\ No newline at end of file
@@ -0,0 +1,184 @@
+import threading
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Latency histogram bucket upper bounds in seconds
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Route label for requests that match no route
+UNMATCHED_ROUTE = "unmatched"
+
+Labels = Tuple[Tuple[str, str], ...]
+
+class _Shard:
+    """Metrics recorded by one thread; only that thread writes to it"""
+    
+    __slots__ = ("requests", "histograms", "in_flight")
+    
+    def __init__(self):
+        # (method, route, status) -> count
+        self.requests: Dict[Tuple[str, str, str], int] = {}
+        # (route, stage) -> [bucket counts..., +Inf count, sum]
+        self.histograms: Dict[Tuple[str, str], List[float]] = {}
+        self.in_flight = 0
+
+class RequestMetrics:
+    """
+    Request counters, latency histograms and the in-flight gauge.
+    
+    Each thread records into its own shard without locking; shards are
+    summed when metrics are scraped, so the hot path is a few dictionary
+    updates.
+    """
+    
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        """
+        Initialize request metrics.
+        
+        Args:
+            buckets: Histogram bucket upper bounds in seconds, ascending
+        """
+        self.buckets = tuple(buckets)
+        self._local = threading.local()
+        self._shards: List[_Shard] = []
+        self._lock = threading.Lock()
+    
+    def _shard(self) -> _Shard:
+        """Get the calling thread's shard, registering it on first use"""
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = _Shard()
+            self._local.shard = shard
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+    
+    def request_started(self) -> None:
+        """Count a request as in flight."""
+        self._shard().in_flight += 1
+    
+    def request_finished(self, method: str, route: str, status: int, duration: float,
+                         stages: Optional[Dict[str, float]] = None) -> None:
+        """
+        Record a completed request.
+        
+        Must be called on the thread that called request_started.
+        
+        Args:
+            method: HTTP method
+            route: Route template, e.g. "/files/{path:path}"
+            status: Response status code
+            duration: Total duration in seconds
+            stages: Stage durations in milliseconds, e.g. {"auth": 0.1}
+        """
+        shard = self._shard()
+        shard.in_flight -= 1
+        key = (method, route, str(status))
+        shard.requests[key] = shard.requests.get(key, 0) + 1
+        self._observe(shard, (route, "total"), duration)
+        if stages:
+            for stage, milliseconds in stages.items():
+                self._observe(shard, (route, stage), milliseconds / 1000)
+    
+    def _observe(self, shard: _Shard, key: Tuple[str, str], seconds: float) -> None:
+        """Add an observation to a histogram of a shard"""
+        histogram = shard.histograms.get(key)
+        if histogram is None:
+            histogram = [0] * (len(self.buckets) + 1) + [0.0]
+            shard.histograms[key] = histogram
+        # Index len(buckets) is the +Inf bucket
+        histogram[bisect_left(self.buckets, seconds)] += 1
+        histogram[-1] += seconds
+    
+    def collect(self) -> Tuple[Dict[Tuple[str, str, str], int], Dict[Tuple[str, str], List[float]], int]:
+        """
+        Sum the shards of every thread.
+        
+        Returns:
+            Tuple of (request counts, histograms, requests in flight)
+        """
+        with self._lock:
+            shards = list(self._shards)
+        
+        requests: Dict[Tuple[str, str, str], int] = {}
+        histograms: Dict[Tuple[str, str], List[float]] = {}
+        in_flight = 0
+        for shard in shards:
+            for key, count in dict(shard.requests).items():
+                requests[key] = requests.get(key, 0) + count
+            for key, values in dict(shard.histograms).items():
+                total = histograms.setdefault(key, [0] * len(values))
+                for index, value in enumerate(list(values)):
+                    total[index] += value
+            in_flight += shard.in_flight
+        return requests, histograms, in_flight
+    
+    def render(self) -> List[str]:
+        """
+        Render request metrics in the Prometheus text format.
+        
+        Returns:
+            Exposition lines
+        """
+        requests, histograms, in_flight = self.collect()
+        lines = format_metric(
+            "mcp_requests_total", "counter", "HTTP requests by method, route and status",
+            [((("method", method), ("route", route), ("status", status)), count)
+             for (method, route, status), count in sorted(requests.items())]
+        )
+        lines += format_metric(
+            "mcp_requests_in_flight", "gauge", "HTTP requests being handled", [((), in_flight)]
+        )
+        lines += [
+            "# HELP mcp_request_duration_seconds Request latency by route and stage",
+            "# TYPE mcp_request_duration_seconds histogram",
+        ]
+        for (route, stage), histogram in sorted(histograms.items()):
+            labels = (("route", route), ("stage", stage))
+            cumulative = 0
+            for bound, count in zip(self.buckets, histogram):
+                cumulative += count
+                lines.append(f"mcp_request_duration_seconds_bucket{format_labels(labels + (('le', repr(bound)),))} {cumulative}")
+            cumulative += histogram[len(self.buckets)]
+            lines.append(f"mcp_request_duration_seconds_bucket{format_labels(labels + (('le', '+Inf'),))} {cumulative}")
+            lines.append(f"mcp_request_duration_seconds_sum{format_labels(labels)} {histogram[-1]}")
+            lines.append(f"mcp_request_duration_seconds_count{format_labels(labels)} {cumulative}")
+        return lines
+
+def _escape(value: str) -> str:
+    """Escape a label value"""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def format_labels(labels: Labels) -> str:
+    """
+    Format a label set, escaping values as the text format requires.
+    
+    Args:
+        labels: (name, value) pairs
+        
+    Returns:
+        Label string including braces, or "" if there are no labels
+    """
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+def format_metric(name: str, metric_type: str, help_text: str, samples: Iterable[Tuple[Labels, float]]) -> List[str]:
+    """
+    Format a counter or gauge in the Prometheus text format.
+    
+    Args:
+        name: Metric name
+        metric_type: "counter" or "gauge"
+        help_text: Metric description
+        samples: (labels, value) pairs
+        
+    Returns:
+        Exposition lines
+    """
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}"]
+    lines.extend(f"{name}{format_labels(labels)} {value}" for labels, value in samples)
+    return lines
+
+# Global request metrics instance
+request_metrics = RequestMetrics()
\ No newline at end of file
@@ -2,7 +2,9 @@ import re
 import os
 from pathlib import Path
 from src.config import settings
+from src.utils.tracing import traced
 
+@traced("validate_path")
 def validate_path(path: str) -> bool:
     """
     Validate a file or directory path.
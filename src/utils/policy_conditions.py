@@ -0,0 +1,136 @@
+from datetime import datetime, time
+from typing import Any, Callable, Dict, List, Tuple
+
+# Relative evaluation cost of each predicate kind; cheaper predicates run first
+COST_EQUALS = 0
+COST_MEMBERSHIP = 1
+COST_PREFIX = 1
+COST_RANGE = 2
+COST_TIME_WINDOW = 3
+
+_MISSING = object()
+
+Predicate = Callable[[Dict[str, Any]], bool]
+
+def _parse_time(value: str) -> time:
+    """Parse an "HH:MM" or "HH:MM:SS" time of day"""
+    if not isinstance(value, str):
+        raise ValueError(f"Invalid time of day: {value!r}")
+    return time.fromisoformat(value)
+
+def _equals(key: str, expected: Any) -> Predicate:
+    def predicate(metadata: Dict[str, Any]) -> bool:
+        return metadata.get(key, _MISSING) == expected
+    return predicate
+
+def _membership(key: str, allowed: List[Any]) -> Predicate:
+    try:
+        allowed_set = frozenset(allowed)
+    except TypeError:
+        # Unhashable members fall back to a list scan
+        allowed_set = None
+    
+    def predicate(metadata: Dict[str, Any]) -> bool:
+        value = metadata.get(key, _MISSING)
+        if value is _MISSING:
+            return False
+        if allowed_set is not None:
+            try:
+                return value in allowed_set
+            except TypeError:
+                return False
+        return value in allowed
+    return predicate
+
+def _prefix(key: str, prefix: str) -> Predicate:
+    def predicate(metadata: Dict[str, Any]) -> bool:
+        value = metadata.get(key)
+        return isinstance(value, str) and value.startswith(prefix)
+    return predicate
+
+def _numeric_range(key: str, bounds: Dict[str, Any]) -> Predicate:
+    low = bounds.get("min")
+    high = bounds.get("max")
+    
+    def predicate(metadata: Dict[str, Any]) -> bool:
+        value = metadata.get(key)
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return False
+        if low is not None and value < low:
+            return False
+        if high is not None and value > high:
+            return False
+        return True
+    return predicate
+
+def _time_window(start: time, end: time, clock: Callable[[], datetime]) -> Predicate:
+    def predicate(metadata: Dict[str, Any]) -> bool:
+        now = clock().time()
+        if start <= end:
+            return start <= now < end
+        # Window wraps around midnight, e.g. 22:00-06:00
+        return now >= start or now < end
+    return predicate
+
+def compile_condition(key: str, spec: Any, clock: Callable[[], datetime] = datetime.now) -> Tuple[int, Predicate, bool]:
+    """
+    Compile one policy condition into a predicate over session metadata.
+    
+    A plain value means equality. A dictionary selects an operator:
+    {"in": [...]} for membership, {"prefix": "..."} for string prefixes,
+    {"min": n, "max": n} for numeric ranges (either bound optional) and
+    {"time_between": ["09:00", "17:00"]} for a window on the current time of day.
+    
+    Args:
+        key: Metadata key the condition applies to
+        spec: Condition value or operator dictionary
+        clock: Function returning the current time, for time windows
+        
+    Returns:
+        Tuple of (cost, predicate, time_dependent)
+        
+    Raises:
+        ValueError: If the operator dictionary is not valid
+    """
+    if not isinstance(spec, dict):
+        return COST_EQUALS, _equals(key, spec), False
+    
+    operators = set(spec)
+    if operators == {"in"}:
+        if not isinstance(spec["in"], list):
+            raise ValueError(f"Condition '{key}': 'in' expects a list")
+        return COST_MEMBERSHIP, _membership(key, spec["in"]), False
+    if operators == {"prefix"}:
+        if not isinstance(spec["prefix"], str):
+            raise ValueError(f"Condition '{key}': 'prefix' expects a string")
+        return COST_PREFIX, _prefix(key, spec["prefix"]), False
+    if operators and operators <= {"min", "max"}:
+        for bound in operators:
+            if isinstance(spec[bound], bool) or not isinstance(spec[bound], (int, float)):
+                raise ValueError(f"Condition '{key}': '{bound}' expects a number")
+        return COST_RANGE, _numeric_range(key, spec), False
+    if operators == {"time_between"}:
+        window = spec["time_between"]
+        if not isinstance(window, list) or len(window) != 2:
+            raise ValueError(f"Condition '{key}': 'time_between' expects [start, end]")
+        start, end = (_parse_time(value) for value in window)
+        return COST_TIME_WINDOW, _time_window(start, end, clock), True
+    
+    raise ValueError(f"Condition '{key}': unsupported operators {sorted(operators)}")
+
+def compile_conditions(conditions: Dict[str, Any], clock: Callable[[], datetime] = datetime.now) -> Tuple[List[Predicate], bool]:
+    """
+    Compile policy conditions into predicates ordered cheapest first.
+    
+    Args:
+        conditions: Policy conditions
+        clock: Function returning the current time, for time windows
+        
+    Returns:
+        Tuple of (predicates, time_dependent)
+    """
+    compiled = [compile_condition(key, spec, clock) for key, spec in conditions.items()]
+    compiled.sort(key=lambda item: item[0])
+    predicates = [predicate for _, predicate, _ in compiled]
+    time_dependent = any(item[2] for item in compiled)
+    return predicates, time_dependent
\ No newline at end of file
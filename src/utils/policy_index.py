@@ -0,0 +1,269 @@
+import fnmatch
+import re
+from typing import Dict, Iterable, List, Pattern, Sequence, Set
+from src.models.access_policy import AccessPolicyModel
+from src.utils.policy_conditions import compile_conditions
+
+WILDCARD_CHARS = "*?["
+
+def literal_prefix(pattern: str) -> str:
+    """
+    Get the literal part of a glob pattern before its first wildcard.
+    
+    Args:
+        pattern: Glob pattern
+        
+    Returns:
+        Literal prefix of the pattern (the whole pattern if it has no wildcards)
+    """
+    for index, char in enumerate(pattern):
+        if char in WILDCARD_CHARS:
+            return pattern[:index]
+    return pattern
+
+def covers_prefix(pattern: str, prefix: str) -> bool:
+    """
+    Check if a glob pattern matches every string that starts with a prefix.
+    
+    Only patterns of the form "<literal>*" whose literal is a prefix of the
+    given prefix qualify, which is exact for the patterns policies use.
+    
+    Args:
+        pattern: Glob pattern
+        prefix: String prefix
+        
+    Returns:
+        True if every string starting with prefix matches the pattern
+    """
+    literal = literal_prefix(pattern)
+    rest = pattern[len(literal):]
+    return rest != "" and rest.strip("*") == "" and prefix.startswith(literal)
+
+def compile_glob(pattern: str) -> Pattern:
+    """
+    Compile a glob pattern into a regular expression.
+    
+    Matching is case-sensitive, like fnmatch.fnmatch on POSIX systems.
+    
+    Args:
+        pattern: Glob pattern
+        
+    Returns:
+        Compiled regular expression
+    """
+    return re.compile(fnmatch.translate(pattern))
+
+class CompiledPolicy:
+    """An access policy with its glob patterns compiled once"""
+    
+    __slots__ = (
+        "policy", "deny", "principal_literals", "principal_patterns", "resource_patterns",
+        "conditions", "time_dependent"
+    )
+    
+    def __init__(self, policy: AccessPolicyModel):
+        self.policy = policy
+        self.deny = policy.effect == "deny"
+        # Principals without wildcards are checked with a set lookup
+        self.principal_literals: Set[str] = {
+            principal for principal in policy.principals if literal_prefix(principal) == principal
+        }
+        self.principal_patterns: List[Pattern] = [
+            compile_glob(principal) for principal in policy.principals if principal not in self.principal_literals
+        ]
+        self.resource_patterns: Dict[str, Pattern] = {
+            resource: compile_glob(resource) for resource in policy.resources
+        }
+        # Condition predicates ordered cheapest first
+        self.conditions, self.time_dependent = compile_conditions(policy.conditions)
+    
+    def matches_principal(self, principal: str) -> bool:
+        """
+        Check if a principal matches any of the policy principals.
+        
+        Args:
+            principal: Principal to check
+            
+        Returns:
+            True if principal matches, False otherwise
+        """
+        if principal in self.principal_literals:
+            return True
+        for pattern in self.principal_patterns:
+            if pattern.match(principal):
+                return True
+        return False
+    
+    def check_conditions(self, metadata: Dict) -> bool:
+        """
+        Check if all policy conditions are met.
+        
+        Args:
+            metadata: User session metadata
+            
+        Returns:
+            True if all conditions are met, False otherwise
+        """
+        for predicate in self.conditions:
+            if not predicate(metadata):
+                return False
+        return True
+
+class PolicyIndex:
+    """
+    Index of compiled policies by action and literal resource prefix.
+    
+    A lookup only visits the policies whose resource patterns could match,
+    i.e. those whose literal prefix is a prefix of the requested resource.
+    """
+    
+    def __init__(self):
+        # action -> literal resource prefix -> [(resource glob, resource regex, compiled policy)]
+        self._by_action: Dict[str, Dict[str, List[tuple]]] = {}
+        # action -> distinct literal prefix lengths present in the index
+        self._prefix_lengths: Dict[str, List[int]] = {}
+        self.size = 0
+    
+    def add(self, compiled: CompiledPolicy) -> None:
+        """
+        Add a compiled policy to the index.
+        
+        Args:
+            compiled: CompiledPolicy to add
+        """
+        for action in set(compiled.policy.actions):
+            buckets = self._by_action.setdefault(action, {})
+            lengths = self._prefix_lengths.setdefault(action, [])
+            for resource, pattern in compiled.resource_patterns.items():
+                prefix = literal_prefix(resource)
+                buckets.setdefault(prefix, []).append((resource, pattern, compiled))
+                if len(prefix) not in lengths:
+                    lengths.append(len(prefix))
+                    lengths.sort()
+        self.size += 1
+    
+    def copy_with(self, compiled: CompiledPolicy) -> "PolicyIndex":
+        """
+        Build a new index with one more policy, leaving this index unchanged.
+        
+        Bucket dictionaries are copied shallowly; only the buckets the policy
+        is added to get new lists.
+        
+        Args:
+            compiled: CompiledPolicy to add
+            
+        Returns:
+            New PolicyIndex
+        """
+        index = PolicyIndex()
+        index._by_action = {action: dict(buckets) for action, buckets in self._by_action.items()}
+        index._prefix_lengths = {action: list(lengths) for action, lengths in self._prefix_lengths.items()}
+        index.size = self.size
+        for action in set(compiled.policy.actions):
+            buckets = index._by_action.get(action, {})
+            for resource in compiled.resource_patterns:
+                prefix = literal_prefix(resource)
+                buckets[prefix] = list(buckets.get(prefix, ()))
+        index.add(compiled)
+        return index
+    
+    def candidates(self, resource: str, action: str) -> List[CompiledPolicy]:
+        """
+        Get the policies whose resource patterns match a resource for an action.
+        
+        Args:
+            resource: Resource to look up
+            action: Action to look up
+            
+        Returns:
+            List of compiled policies, without duplicates
+        """
+        buckets = self._by_action.get(action)
+        if not buckets:
+            return []
+        
+        matches: List[CompiledPolicy] = []
+        seen: Set[int] = set()
+        for length in self._prefix_lengths[action]:
+            if length > len(resource):
+                break
+            for _, pattern, compiled in buckets.get(resource[:length], ()):
+                if id(compiled) not in seen and pattern.match(resource):
+                    seen.add(id(compiled))
+                    matches.append(compiled)
+        return matches
+    
+    def subtree_candidates(self, prefix: str, action: str) -> List[tuple]:
+        """
+        Get the resource patterns that could match some resource under a prefix.
+        
+        Args:
+            prefix: Resource prefix shared by every resource in the subtree
+            action: Action to look up
+            
+        Returns:
+            List of (resource glob, compiled policy) tuples
+        """
+        buckets = self._by_action.get(action)
+        if not buckets:
+            return []
+        
+        matches = []
+        for literal, entries in buckets.items():
+            # Patterns whose literal part lies inside the subtree can only match
+            # resources in it; patterns whose literal part is a prefix of the
+            # subtree may match resources in it through their wildcards
+            if literal.startswith(prefix) or prefix.startswith(literal):
+                matches.extend(
+                    (resource, compiled) for resource, _, compiled in entries
+                    if resource != literal or literal.startswith(prefix)
+                )
+        return matches
+
+class PolicySnapshot:
+    """
+    Immutable compiled view of a policy set.
+    
+    Snapshots are never modified after construction; policy changes build a
+    new snapshot and swap it in, so in-flight checks keep a consistent view.
+    """
+    
+    def __init__(self, compiled: Sequence[CompiledPolicy] = (), index: PolicyIndex = None, condition_keys: tuple = None):
+        self.compiled = tuple(compiled)
+        self.policies = tuple(item.policy for item in self.compiled)
+        if index is None:
+            index = PolicyIndex()
+            for item in self.compiled:
+                index.add(item)
+        self.index = index
+        # Metadata keys referenced by any policy condition; only these affect decisions
+        if condition_keys is None:
+            condition_keys = tuple(sorted({key for item in self.compiled for key in item.policy.conditions}))
+        self.condition_keys = condition_keys
+    
+    @classmethod
+    def from_policies(cls, policies: Iterable[AccessPolicyModel]) -> "PolicySnapshot":
+        """
+        Compile a policy set into a snapshot.
+        
+        Args:
+            policies: Policies to compile
+            
+        Returns:
+            New PolicySnapshot
+        """
+        return cls([CompiledPolicy(policy) for policy in policies])
+    
+    def with_policy(self, policy: AccessPolicyModel) -> "PolicySnapshot":
+        """
+        Build a new snapshot with one more policy, reusing compiled policies.
+        
+        Args:
+            policy: Policy to add
+            
+        Returns:
+            New PolicySnapshot
+        """
+        compiled = CompiledPolicy(policy)
+        condition_keys = tuple(sorted(set(self.condition_keys) | set(policy.conditions)))
+        return PolicySnapshot(self.compiled + (compiled,), self.index.copy_with(compiled), condition_keys)
\ No newline at end of file
@@ -0,0 +1,197 @@
+import math
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+class RateLimits:
+    """Token bucket and concurrency limits of one tier of principals"""
+    
+    __slots__ = ("rate", "burst", "max_in_flight")
+    
+    def __init__(self, rate: float, burst: float, max_in_flight: int = 0):
+        """
+        Initialize the limits.
+        
+        Args:
+            rate: Tokens added to the bucket per second
+            burst: Bucket capacity, the most a principal can spend at once
+            max_in_flight: Maximum concurrent requests (0 disables the cap)
+            
+        Raises:
+            ValueError: If a limit is out of range
+        """
+        if rate <= 0 or burst <= 0 or max_in_flight < 0:
+            raise ValueError("Rate limits need a positive rate and burst and a non-negative in-flight cap")
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.max_in_flight = int(max_in_flight)
+
+class _Bucket:
+    """Token bucket and in-flight count of one principal"""
+    
+    __slots__ = ("tokens", "updated", "in_flight")
+    
+    def __init__(self, tokens: float, now: float):
+        self.tokens = tokens
+        self.updated = now
+        self.in_flight = 0
+
+class RateLimiter:
+    """
+    Per-principal token buckets with a cap on requests in flight.
+    
+    Each request spends tokens according to its cost; buckets refill at a
+    steady rate up to their burst capacity. The tier of limits comes from
+    the session's scopes, so a scope can grant a principal more headroom.
+    """
+    
+    def __init__(self, default_limits: RateLimits, scope_limits: Optional[Dict[str, RateLimits]] = None,
+                 clock: Callable[[], float] = time.monotonic, max_principals: int = 10000):
+        """
+        Initialize the rate limiter.
+        
+        Args:
+            default_limits: Limits of sessions with no scope in scope_limits
+            scope_limits: Limits by scope; a session with several gets the highest rate
+            clock: Monotonic clock in seconds
+            max_principals: Number of buckets above which idle ones are discarded
+        """
+        self.default_limits = default_limits
+        self.scope_limits = scope_limits or {}
+        self.clock = clock
+        self.max_principals = max_principals
+        self.rejected = {"rate": 0, "concurrency": 0}
+        self._buckets: Dict[Tuple[str, str], _Bucket] = {}
+        self._lock = threading.Lock()
+    
+    def limits_for(self, scopes: Iterable[str]) -> Tuple[str, RateLimits]:
+        """
+        Get the tier of limits that applies to a session.
+        
+        Args:
+            scopes: Scopes of the session
+            
+        Returns:
+            Tuple of (tier name, limits)
+        """
+        tier, limits = "default", self.default_limits
+        for scope in scopes:
+            candidate = self.scope_limits.get(scope)
+            if candidate is not None and candidate.rate > limits.rate:
+                tier, limits = scope, candidate
+        return tier, limits
+    
+    def acquire(self, principal: str, scopes: Iterable[str], cost: float) -> float:
+        """
+        Admit a request, spending its cost and counting it as in flight.
+        
+        Args:
+            principal: Principal of the request
+            scopes: Scopes of the session
+            cost: Tokens the request costs; capped at the burst so it can always succeed eventually
+            
+        Returns:
+            0 if the request is admitted and must be released, otherwise
+            the number of seconds to wait before retrying
+        """
+        tier, limits = self.limits_for(scopes)
+        cost = min(cost, limits.burst)
+        now = self.clock()
+        with self._lock:
+            bucket = self._refill(principal, tier, limits, now)
+            if limits.max_in_flight and bucket.in_flight >= limits.max_in_flight:
+                self.rejected["concurrency"] += 1
+                # No way to know when a slot frees up; ask for a short pause
+                return 1.0
+            if bucket.tokens < cost:
+                self.rejected["rate"] += 1
+                return (cost - bucket.tokens) / limits.rate
+            bucket.tokens -= cost
+            bucket.in_flight += 1
+            return 0.0
+    
+    def charge(self, principal: str, scopes: Iterable[str], cost: float) -> float:
+        """
+        Spend more tokens for an admitted request.
+        
+        Used by requests whose full cost is only known once their body has
+        been read, such as batches; the in-flight count is not changed.
+        
+        Args:
+            principal: Principal of the request
+            scopes: Scopes of the session
+            cost: Additional tokens; capped at the burst so it can always succeed eventually
+            
+        Returns:
+            0 if the tokens were spent, otherwise the number of seconds to
+            wait before retrying; nothing is spent then
+        """
+        tier, limits = self.limits_for(scopes)
+        cost = min(cost, limits.burst)
+        now = self.clock()
+        with self._lock:
+            bucket = self._refill(principal, tier, limits, now)
+            if bucket.tokens < cost:
+                self.rejected["rate"] += 1
+                return (cost - bucket.tokens) / limits.rate
+            bucket.tokens -= cost
+            return 0.0
+    
+    def _refill(self, principal: str, tier: str, limits: RateLimits, now: float) -> _Bucket:
+        """Get the bucket of a principal with the tokens earned since its last use; needs the lock"""
+        bucket = self._buckets.get((principal, tier))
+        if bucket is None:
+            if len(self._buckets) >= self.max_principals:
+                self._discard_idle(now)
+            bucket = _Bucket(limits.burst, now)
+            self._buckets[(principal, tier)] = bucket
+        else:
+            bucket.tokens = min(limits.burst, bucket.tokens + (now - bucket.updated) * limits.rate)
+            bucket.updated = now
+        return bucket
+    
+    def release(self, principal: str, scopes: Iterable[str]) -> None:
+        """
+        Count an admitted request as finished.
+        
+        Args:
+            principal: Principal of the request
+            scopes: Scopes of the session, as passed to acquire
+        """
+        tier, _ = self.limits_for(scopes)
+        with self._lock:
+            bucket = self._buckets.get((principal, tier))
+            if bucket is not None and bucket.in_flight > 0:
+                bucket.in_flight -= 1
+    
+    def _discard_idle(self, now: float) -> None:
+        """Drop buckets that are full again and have nothing in flight"""
+        for key, bucket in list(self._buckets.items()):
+            _, limits = self.limits_for((key[1],))
+            if bucket.in_flight == 0 and bucket.tokens + (now - bucket.updated) * limits.rate >= limits.burst:
+                del self._buckets[key]
+    
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get rate limiter counters.
+        
+        Returns:
+            Dictionary with principals, rejected_rate and rejected_concurrency
+        """
+        return {
+            "principals": len(self._buckets),
+            "rejected_rate": self.rejected["rate"],
+            "rejected_concurrency": self.rejected["concurrency"],
+        }
+
+def retry_after_header(seconds: float) -> str:
+    """
+    Format a wait as a Retry-After header value.
+    
+    Args:
+        seconds: Seconds to wait
+        
+    Returns:
+        Whole seconds, at least 1
+    """
+    return str(max(1, math.ceil(seconds)))
\ No newline at end of file
@@ -0,0 +1,85 @@
+import asyncio
+import contextvars
+from typing import Any, Awaitable, Callable, Dict, Hashable
+from src.utils.cancellation import ABANDONED, CancellationToken, set_token
+
+class _Call:
+    """A computation in progress and the number of callers waiting for it"""
+    
+    __slots__ = ("task", "cancellation_token", "waiters")
+    
+    def __init__(self, task: asyncio.Task, cancellation_token: CancellationToken):
+        self.task = task
+        self.cancellation_token = cancellation_token
+        self.waiters = 0
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls into one computation.
+    
+    The first caller for a key starts the computation; callers arriving
+    while it runs await the same result or exception. Nothing is kept once
+    it finishes, so the next call computes afresh. A caller that is
+    cancelled stops waiting without affecting the others, and the
+    computation is cancelled only when every caller has given up: it runs
+    with a cancellation token of its own rather than the first caller's.
+    """
+    
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self.executed = 0
+        self.coalesced = 0
+    
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run a computation, or join the one already running for the key.
+        
+        Args:
+            key: Identifies identical calls, e.g. ("read", path, encoding, limit)
+            func: Function returning the awaitable that computes the result
+            
+        Returns:
+            Result of the computation
+        """
+        loop = asyncio.get_running_loop()
+        call = self._calls.get(key)
+        if call is None or call.task.get_loop() is not loop:
+            cancellation_token = CancellationToken()
+            context = contextvars.copy_context()
+            context.run(set_token, cancellation_token)
+            call = _Call(context.run(loop.create_task, func()), cancellation_token)
+            self._calls[key] = call
+            call.task.add_done_callback(lambda task: self._forget(key, call))
+            self.executed += 1
+        else:
+            self.coalesced += 1
+        
+        call.waiters += 1
+        try:
+            # Shielded so cancelling one caller does not cancel the shared task
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # Every caller gave up; later callers start a new computation
+                self._forget(key, call)
+                call.cancellation_token.cancel(ABANDONED)
+                call.task.cancel()
+    
+    def _forget(self, key: Hashable, call: _Call) -> None:
+        """Stop handing out a call to new callers"""
+        if self._calls.get(key) is call:
+            del self._calls[key]
+    
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get coalescing counters.
+        
+        Returns:
+            Dictionary with executed, coalesced and in_flight
+        """
+        return {"executed": self.executed, "coalesced": self.coalesced, "in_flight": len(self._calls)}
+
+# Global single-flight group shared by the filesystem services; keys start
+# with the operation name so they never collide
+single_flight = SingleFlight()
\ No newline at end of file
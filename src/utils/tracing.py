@@ -0,0 +1,139 @@
+import time
+from contextvars import ContextVar, Token
+from functools import wraps
+from typing import Callable, Dict, List, Optional, Tuple
+
+class Trace:
+    """Stage durations collected while handling one request"""
+    
+    __slots__ = ("spans",)
+    
+    def __init__(self):
+        # Stage name -> [total milliseconds, count], in first-seen order
+        self.spans: Dict[str, List[float]] = {}
+    
+    def add(self, name: str, milliseconds: float) -> None:
+        """
+        Add a stage duration; repeated stages are summed.
+        
+        Args:
+            name: Stage name
+            milliseconds: Duration in milliseconds
+        """
+        span = self.spans.get(name)
+        if span is None:
+            self.spans[name] = [milliseconds, 1]
+        else:
+            span[0] += milliseconds
+            span[1] += 1
+    
+    def server_timing(self) -> str:
+        """
+        Format the stages as a Server-Timing header value.
+        
+        Returns:
+            Header value, e.g. "validate_path;dur=0.041, disk_read;dur=0.215"
+        """
+        return ", ".join(f"{name};dur={total:.3f}" for name, (total, _) in self.spans.items())
+    
+    def to_dict(self) -> Dict[str, Dict[str, float]]:
+        """
+        Get the stages as a JSON-serializable dictionary.
+        
+        Returns:
+            Dictionary of stage name to {"ms": total, "count": count}
+        """
+        return {name: {"ms": round(total, 3), "count": count} for name, (total, count) in self.spans.items()}
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+
+class _Span:
+    """Times a block into the current trace"""
+    
+    __slots__ = ("trace", "name", "start")
+    
+    def __init__(self, trace: Trace, name: str):
+        self.trace = trace
+        self.name = name
+    
+    def __enter__(self) -> "_Span":
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.trace.add(self.name, (time.perf_counter() - self.start) * 1000)
+
+class _NoopSpan:
+    """Span used when no trace is active"""
+    
+    __slots__ = ()
+    
+    def __enter__(self) -> "_NoopSpan":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+_NOOP_SPAN = _NoopSpan()
+
+def span(name: str):
+    """
+    Time a block as a stage of the current request.
+    
+    When tracing is off for the request this costs one context variable
+    lookup and returns a shared no-op context manager.
+    
+    Args:
+        name: Stage name
+        
+    Returns:
+        Context manager timing the block
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        return _NOOP_SPAN
+    return _Span(trace, name)
+
+def traced(name: str) -> Callable:
+    """
+    Decorator timing every call of a function as a stage of the current request.
+    
+    Args:
+        name: Stage name
+        
+    Returns:
+        Decorator
+    """
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            trace = _current_trace.get()
+            if trace is None:
+                return func(*args, **kwargs)
+            with _Span(trace, name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def start_trace() -> Tuple[Trace, Token]:
+    """
+    Start collecting stages for the current request.
+    
+    Returns:
+        Tuple of (trace, token to pass to end_trace)
+    """
+    trace = Trace()
+    return trace, _current_trace.set(trace)
+
+def end_trace(token: Token) -> None:
+    """
+    Stop collecting stages for the current request.
+    
+    Args:
+        token: Token returned by start_trace
+    """
+    _current_trace.reset(token)
+
+def current_trace() -> Optional[Trace]:
+    """Get the trace of the current request, if tracing is on"""
+    return _current_trace.get()
\ No newline at end of file
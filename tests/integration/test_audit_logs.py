@@ -0,0 +1,61 @@
+from datetime import datetime
+from fastapi.testclient import TestClient
+from src.main import app, auth_service, access_control_service, audit_service
+from src.models.access_policy import AccessPolicyModel
+from src.services.audit_service import AuditService
+from src.utils.audit_store import AuditStore
+from src.utils.audit_writer import AuditWriter
+
+client = TestClient(app)
+
+def test_audit_logs_require_authentication():
+    """Test that the audit log endpoint rejects anonymous requests"""
+    response = client.get("/audit/logs")
+    
+    assert response.status_code == 401
+
+def test_audit_logs_require_policy():
+    """Test that reading audit logs needs a policy granting audit:logs"""
+    session = auth_service.create_session("llm-agent", ["read"])
+    
+    response = client.get("/audit/logs", headers={"Authorization": f"Bearer {session.token}"})
+    
+    assert response.status_code == 403
+
+def test_audit_logs_query(tmp_path, monkeypatch):
+    """Test querying audit logs with filters"""
+    store = AuditStore(str(tmp_path / "audit.db"))
+    writer = AuditWriter(str(tmp_path / "audit.log"), store=store)
+    service = AuditService(log_file=str(tmp_path / "audit.log"), writer=writer, store=store)
+    service.log_access("llm-agent", "file:docs/a.txt", "read", "success")
+    service.log_access("llm-agent", "file:secret.txt", "read", "denied")
+    service.log_access("other-agent", "file:docs/b.txt", "read", "success")
+    service.flush()
+    monkeypatch.setattr(app.state, "audit_service", service)
+    
+    access_control_service.add_policy(AccessPolicyModel(
+        id="auditor",
+        name="auditor",
+        description="Allow reading the audit log",
+        resources=["audit:logs"],
+        principals=["auditor"],
+        actions=["read"],
+        conditions={},
+        created_at=datetime.now(),
+        updated_at=datetime.now()
+    ))
+    session = auth_service.create_session("auditor", ["read"])
+    try:
+        response = client.get(
+            "/audit/logs",
+            params={"principal": "llm-agent", "resource_prefix": "file:docs/"},
+            headers={"Authorization": f"Bearer {session.token}"}
+        )
+    finally:
+        access_control_service.clear_policies()
+        service.close()
+    
+    assert response.status_code == 200
+    logs = response.json()
+    assert [log["resource"] for log in logs] == ["file:docs/a.txt"]
+    assert logs[0]["outcome"] == "success"
\ No newline at end of file
@@ -0,0 +1,103 @@
+import os
+import shutil
+from datetime import datetime
+from fastapi.testclient import TestClient
+from src.main import app, auth_service, access_control_service, rate_limiter
+from src.models.access_policy import AccessPolicyModel
+from src.services.file_service import FileService
+from src.services.directory_service import DirectoryService
+from src.utils.rate_limiter import RateLimits
+
+client = TestClient(app)
+
+BASE_DIR = os.path.join("/tmp", "mcp_batch_metadata_test")
+
+def setup_module(module):
+    """Create the files the tests stat"""
+    os.makedirs(os.path.join(BASE_DIR, "secret"), exist_ok=True)
+    os.makedirs(os.path.join(BASE_DIR, "hidden"), exist_ok=True)
+    for name in ("a.txt", "b.py", os.path.join("secret", "key.txt")):
+        with open(os.path.join(BASE_DIR, name), "w") as f:
+            f.write(name)
+    access_control_service.add_policy(AccessPolicyModel(
+        id="batch-metadata-test",
+        name="batch-metadata-test",
+        description="Allow listing the batch test files outside the secret directory",
+        resources=["file:mcp_batch_metadata_test/*", "directory:mcp_batch_metadata_test/secret"],
+        principals=["llm-*"],
+        actions=["list"],
+        conditions={},
+        created_at=datetime.now(),
+        updated_at=datetime.now()
+    ))
+    access_control_service.add_policy(AccessPolicyModel(
+        id="batch-metadata-test-deny",
+        name="batch-metadata-test-deny",
+        description="Deny the secret directory",
+        resources=["file:mcp_batch_metadata_test/secret/*"],
+        principals=["*"],
+        actions=["list"],
+        conditions={},
+        effect="deny",
+        created_at=datetime.now(),
+        updated_at=datetime.now()
+    ))
+
+def teardown_module(module):
+    """Remove the test files and policies"""
+    access_control_service.clear_policies()
+    shutil.rmtree(BASE_DIR)
+
+def test_batch_metadata_returns_results_in_request_order():
+    """Test that every path gets metadata or an error, in the order requested"""
+    session = auth_service.create_session("llm-agent", ["read"])
+    paths = [
+        "mcp_batch_metadata_test/b.py",
+        "mcp_batch_metadata_test/secret/key.txt",
+        "mcp_batch_metadata_test/missing.txt",
+        "mcp_batch_metadata_test/a.txt",
+        "mcp_batch_metadata_test/secret",
+        "mcp_batch_metadata_test/hidden",
+    ]
+    response = client.post("/batch/metadata", json={"paths": paths}, headers={"Authorization": f"Bearer {session.token}"})
+    
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [result["path"] for result in results] == paths
+    assert results[0]["metadata"] == FileService.get_file_info(paths[0]).model_dump(mode="json")
+    assert results[1] == {"path": paths[1], "error": "ACCESS_DENIED"}
+    assert results[2] == {"path": paths[2], "error": "FILE_NOT_FOUND"}
+    assert results[3]["metadata"]["name"] == "a.txt"
+    assert results[4]["metadata"] == {**DirectoryService.get_directory_info(paths[4]).model_dump(mode="json"), "contents": []}
+    # Directories also need access to list them as directories
+    assert results[5] == {"path": paths[5], "error": "ACCESS_DENIED"}
+
+def test_batch_metadata_field_projection():
+    """Test that fields= limits the metadata of every path"""
+    session = auth_service.create_session("llm-agent", ["read"])
+    headers = {"Authorization": f"Bearer {session.token}"}
+    response = client.post(
+        "/batch/metadata",
+        params={"fields": "name,size"},
+        json={"paths": ["mcp_batch_metadata_test/a.txt"]},
+        headers=headers
+    )
+    
+    assert response.status_code == 200
+    assert response.json() == {"results": [{"path": "mcp_batch_metadata_test/a.txt", "metadata": {"name": "a.txt", "size": 5}}]}
+    assert client.post("/batch/metadata", params={"fields": "owner"}, json={"paths": ["a"]}, headers=headers).status_code == 400
+    assert client.post("/batch/metadata", json={"paths": []}, headers=headers).status_code == 422
+
+def test_batch_metadata_charges_rate_limit_per_path(monkeypatch):
+    """Test that a batch costs as much rate limit as stat'ing its paths one by one"""
+    monkeypatch.setattr(rate_limiter, "default_limits", RateLimits(rate=0.01, burst=5))
+    session = auth_service.create_session("llm-batch-throttled", ["read"])
+    headers = {"Authorization": f"Bearer {session.token}"}
+    paths = ["mcp_batch_metadata_test/a.txt"] * 3
+    
+    first = client.post("/batch/metadata", json={"paths": paths}, headers=headers)
+    second = client.post("/batch/metadata", json={"paths": paths}, headers=headers)
+    
+    assert first.status_code == 200
+    assert second.status_code == 429
+    assert int(second.headers["retry-after"]) >= 1
\ No newline at end of file
@@ -0,0 +1,138 @@
+import os
+import shutil
+from datetime import datetime
+from fastapi.testclient import TestClient
+from src.main import app, auth_service, access_control_service, rate_limiter
+from src.models.access_policy import AccessPolicyModel
+from src.services.file_service import FileService
+from src.utils.rate_limiter import RateLimits
+
+client = TestClient(app)
+
+BASE_DIR = os.path.join("/tmp", "mcp_batch_read_test")
+
+def setup_module(module):
+    """Create the files the tests read"""
+    os.makedirs(os.path.join(BASE_DIR, "src", "secret"), exist_ok=True)
+    files = {
+        "a.txt": b"0123456789",
+        "b.txt": b"abcdefghij",
+        "c.txt": b"klmnopqrst",
+        "accents.txt": "ééé".encode("utf-8"),
+        "latin1.txt": "café".encode("latin-1"),
+        os.path.join("src", "main.py"): b"print('main')\n",
+        os.path.join("src", "util.py"): b"print('util')\n",
+        os.path.join("src", "secret", "key.py"): b"KEY = 1\n",
+    }
+    for name, content in files.items():
+        with open(os.path.join(BASE_DIR, name), "wb") as f:
+            f.write(content)
+    access_control_service.add_policy(AccessPolicyModel(
+        id="batch-read-test",
+        name="batch-read-test",
+        description="Allow reading the batch test files outside the secret directory",
+        resources=["file:mcp_batch_read_test/*"],
+        principals=["llm-*"],
+        actions=["read"],
+        conditions={},
+        created_at=datetime.now(),
+        updated_at=datetime.now()
+    ))
+    access_control_service.add_policy(AccessPolicyModel(
+        id="batch-read-test-deny",
+        name="batch-read-test-deny",
+        description="Deny the secret directory",
+        resources=["file:mcp_batch_read_test/src/secret/*"],
+        principals=["*"],
+        actions=["read"],
+        conditions={},
+        effect="deny",
+        created_at=datetime.now(),
+        updated_at=datetime.now()
+    ))
+
+def teardown_module(module):
+    """Remove the test files and policies"""
+    access_control_service.clear_policies()
+    shutil.rmtree(BASE_DIR)
+
+def post(body):
+    session = auth_service.create_session("llm-agent", ["read"])
+    return client.post("/batch/files", json=body, headers={"Authorization": f"Bearer {session.token}"})
+
+def test_batch_read_shares_byte_budget_in_order():
+    """Test that files are read in request order until the byte budget runs out"""
+    paths = [
+        "mcp_batch_read_test/a.txt",
+        "mcp_batch_read_test/missing.txt",
+        "mcp_batch_read_test/src/secret/key.py",
+        "mcp_batch_read_test/b.txt",
+        "mcp_batch_read_test/c.txt",
+    ]
+    response = post({"paths": paths, "max_bytes": 15})
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert data["files"] == [
+        {"path": paths[0], "content": "0123456789", "size": 10, "bytes_read": 10, "truncated": False},
+        {"path": paths[1], "error": "FILE_NOT_FOUND"},
+        {"path": paths[2], "error": "ACCESS_DENIED"},
+        {"path": paths[3], "content": "abcde", "size": 10, "bytes_read": 5, "truncated": True},
+        {"path": paths[4], "content": "", "size": 10, "bytes_read": 0, "truncated": True},
+    ]
+    assert data["bytes_read"] == 15
+    assert data["has_more"] is False
+
+def test_batch_read_truncation_and_decoding():
+    """Test that truncation never splits a character and undecodable files are reported"""
+    response = post({"paths": ["mcp_batch_read_test/accents.txt", "mcp_batch_read_test/latin1.txt"], "max_bytes": 3})
+    
+    assert response.status_code == 200
+    files = response.json()["files"]
+    assert files[0] == {"path": "mcp_batch_read_test/accents.txt", "content": "é", "size": 6, "bytes_read": 3, "truncated": True}
+    assert files[1] == {"path": "mcp_batch_read_test/latin1.txt", "content": "", "size": 4, "bytes_read": 0, "truncated": True}
+    
+    response = post({"paths": ["mcp_batch_read_test/latin1.txt"]})
+    assert response.json()["files"] == [{"path": "mcp_batch_read_test/latin1.txt", "error": "DECODE_ERROR"}]
+    response = post({"paths": ["mcp_batch_read_test/latin1.txt"], "encoding": "latin-1"})
+    assert response.json()["files"][0]["content"] == "café"
+
+def test_batch_read_glob_leaves_out_denied_matches():
+    """Test that a glob reads the matching files the user may read, sorted by path"""
+    response = post({"glob": "mcp_batch_read_test/**/*.py"})
+    
+    assert response.status_code == 200
+    files = response.json()["files"]
+    assert [(entry["path"], entry["content"]) for entry in files] == [
+        ("mcp_batch_read_test/src/main.py", "print('main')\n"),
+        ("mcp_batch_read_test/src/util.py", "print('util')\n"),
+    ]
+
+def test_batch_read_reports_directories_as_not_found():
+    """Test that a directory in a batch read is reported as not found instead of read"""
+    response = post({"paths": ["mcp_batch_read_test/src", "mcp_batch_read_test/a.txt"]})
+    
+    assert response.status_code == 200
+    files = response.json()["files"]
+    assert files[0] == {"path": "mcp_batch_read_test/src", "error": "FILE_NOT_FOUND"}
+    assert files[1]["content"] == "0123456789"
+
+def test_batch_read_rejects_invalid_requests():
+    """Test that malformed batch reads are rejected before reading anything"""
+    assert post({"paths": ["mcp_batch_read_test/a.txt"], "glob": "*"}).status_code == 400
+    assert post({}).status_code == 400
+    assert post({"glob": "../*"}).status_code == 400
+    assert post({"paths": ["mcp_batch_read_test/a.txt"], "encoding": "no-such-codec"}).status_code == 400
+    assert post({"paths": ["mcp_batch_read_test/a.txt"], "max_bytes": 0}).status_code == 422
+
+def test_batch_read_glob_charges_rate_limit_before_walking(monkeypatch):
+    """Test that a glob is charged like a recursive listing before the tree is walked"""
+    walks = []
+    monkeypatch.setattr(FileService, "expand_glob", staticmethod(lambda *args: walks.append(args) or ([], False)))
+    monkeypatch.setattr(rate_limiter, "default_limits", RateLimits(rate=0.01, burst=10))
+    session = auth_service.create_session("llm-glob-throttled", ["read"])
+    
+    response = client.post("/batch/files", json={"glob": "**"}, headers={"Authorization": f"Bearer {session.token}"})
+    
+    assert response.status_code == 429
+    assert walks == []
\ No newline at end of file
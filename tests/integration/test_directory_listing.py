@@ -1,4 +1,6 @@
 import pytest
+import os
+import shutil
 
 def test_directory_listing_with_valid_path():
     """Test directory listing with a valid path"""
@@ -13,4 +15,212 @@ def test_directory_listing_with_subdirectories():
 def test_directory_listing_pagination():
     """Test directory listing with pagination parameters"""
     # Placeholder test - will be implemented properly later
-    assert True
\ No newline at end of file
+    assert True
+
+def test_directory_listing_filters_entries_by_policy():
+    """Test that listings only include entries the user may list"""
+    from datetime import datetime
+    from fastapi.testclient import TestClient
+    from src.main import app, auth_service, access_control_service
+    from src.models.access_policy import AccessPolicyModel
+    
+    base_dir = os.path.join("/tmp", "mcp_listing_test")
+    os.makedirs(os.path.join(base_dir, "public-dir"), exist_ok=True)
+    for name in ("public-a.txt", "secret.txt", os.path.join("public-dir", "inner.txt")):
+        with open(os.path.join(base_dir, name), "w") as f:
+            f.write(name)
+    
+    access_control_service.add_policy(AccessPolicyModel(
+        id="listing-test",
+        name="listing-test",
+        description="Allow listing public entries",
+        resources=["directory:mcp_listing_test", "directory:mcp_listing_test/public-*", "file:mcp_listing_test/public-*"],
+        principals=["llm-*"],
+        actions=["list"],
+        conditions={},
+        created_at=datetime.now(),
+        updated_at=datetime.now()
+    ))
+    session = auth_service.create_session("llm-agent", ["read"])
+    try:
+        response = TestClient(app).get(
+            "/directories/mcp_listing_test",
+            params={"recursive": "true"},
+            headers={"Authorization": f"Bearer {session.token}"}
+        )
+    finally:
+        access_control_service.clear_policies()
+        shutil.rmtree(base_dir)
+    
+    assert response.status_code == 200
+    data = response.json()
+    names = sorted(entry["name"] for entry in data["contents"])
+    assert names == ["public-a.txt", "public-dir"]
+    assert data["total_count"] == 2
+    public_dir = next(entry for entry in data["contents"] if entry["name"] == "public-dir")
+    assert [entry["name"] for entry in public_dir["contents"]] == ["inner.txt"]
+
+def test_directory_listing_columnar_format():
+    """Test that the columnar format returns parallel arrays of the entries the user may list"""
+    import stat
+    from datetime import datetime
+    from fastapi.testclient import TestClient
+    from src.main import app, auth_service, access_control_service
+    from src.models.access_policy import AccessPolicyModel
+    
+    base_dir = os.path.join("/tmp", "mcp_columnar_test")
+    os.makedirs(os.path.join(base_dir, "public-dir"), exist_ok=True)
+    for name in ("public-a.txt", "secret.txt"):
+        with open(os.path.join(base_dir, name), "w") as f:
+            f.write(name)
+    
+    access_control_service.add_policy(AccessPolicyModel(
+        id="columnar-test",
+        name="columnar-test",
+        description="Allow listing public entries",
+        resources=["directory:mcp_columnar_test", "directory:mcp_columnar_test/public-*", "file:mcp_columnar_test/public-*"],
+        principals=["llm-*"],
+        actions=["list"],
+        conditions={},
+        created_at=datetime.now(),
+        updated_at=datetime.now()
+    ))
+    session = auth_service.create_session("llm-agent", ["read"])
+    headers = {"Authorization": f"Bearer {session.token}"}
+    try:
+        client = TestClient(app)
+        default = client.get("/directories/mcp_columnar_test", headers=headers)
+        columnar = client.get("/directories/mcp_columnar_test", params={"format": "columnar"}, headers=headers)
+        recursive = client.get("/directories/mcp_columnar_test", params={"format": "columnar", "recursive": "true"}, headers=headers)
+        unknown = client.get("/directories/mcp_columnar_test", params={"format": "xml"}, headers=headers)
+    finally:
+        access_control_service.clear_policies()
+        shutil.rmtree(base_dir)
+    
+    assert columnar.status_code == 200
+    data = columnar.json()
+    assert data["path"] == default.json()["path"]
+    assert data["total_count"] == 2
+    assert data["has_more"] is False
+    entries = sorted(zip(data["names"], data["types"], data["sizes"], data["mtimes"], data["modes"]))
+    assert [entry[:3] for entry in entries] == [("public-a.txt", "file", 12), ("public-dir", "directory", entries[1][2])]
+    assert stat.S_ISREG(entries[0][4]) and stat.S_ISDIR(entries[1][4])
+    
+    # The same entries as the default format, in the same order
+    contents = default.json()["contents"]
+    assert data["names"] == [entry["name"] for entry in contents]
+    assert [datetime.fromtimestamp(mtime).isoformat() for mtime in data["mtimes"]] == [entry["modified_at"] for entry in contents]
+    assert [stat.filemode(mode) for mode in data["modes"]] == [entry["permissions"] for entry in contents]
+    assert len(columnar.content) < len(default.content)
+    
+    assert recursive.status_code == 400
+    assert unknown.status_code == 422
+
+def test_directory_listing_field_projection():
+    """Test that fields= limits listings to the requested fields"""
+    from datetime import datetime
+    from fastapi.testclient import TestClient
+    from src.main import app, auth_service, access_control_service
+    from src.models.access_policy import AccessPolicyModel
+    
+    base_dir = os.path.join("/tmp", "mcp_projection_test")
+    os.makedirs(os.path.join(base_dir, "sub"), exist_ok=True)
+    with open(os.path.join(base_dir, "file.txt"), "w") as f:
+        f.write("Content")
+    
+    access_control_service.add_policy(AccessPolicyModel(
+        id="projection-test",
+        name="projection-test",
+        description="Allow listing everything",
+        resources=["directory:mcp_projection_test*", "file:mcp_projection_test/*"],
+        principals=["llm-*"],
+        actions=["list"],
+        conditions={},
+        created_at=datetime.now(),
+        updated_at=datetime.now()
+    ))
+    session = auth_service.create_session("llm-agent", ["read"])
+    headers = {"Authorization": f"Bearer {session.token}"}
+    
+    def get(**params):
+        return TestClient(app).get("/directories/mcp_projection_test", params=params, headers=headers)
+    
+    try:
+        projected = get(fields="size,name,type")
+        columnar = get(format="columnar", fields="name")
+        errors = [
+            get(fields="name,owner"),
+            get(fields=""),
+            get(fields="name", recursive="true"),
+            get(fields="name,id", format="columnar"),
+        ]
+    finally:
+        access_control_service.clear_policies()
+        shutil.rmtree(base_dir)
+    
+    assert projected.status_code == 200
+    data = projected.json()
+    assert data["name"] == "mcp_projection_test"
+    assert set(data) == {"name", "size", "contents", "total_count", "has_more"}
+    entries = sorted(data["contents"], key=lambda entry: entry["name"])
+    assert entries == [{"name": "file.txt", "size": 7, "type": ".txt"}, {"name": "sub", "size": entries[1]["size"]}]
+    assert list(entries[0]) == ["name", "size", "type"]
+    
+    assert columnar.status_code == 200
+    assert set(columnar.json()) == {"path", "total_count", "has_more", "names"}
+    
+    assert [response.status_code for response in errors] == [400] * 4
+    assert errors[0].json()["detail"] == "Unknown fields: owner"
+
+def test_directory_listing_paginates_visible_entries():
+    """Test that pages, total_count and has_more count only the entries the user may list"""
+    from datetime import datetime
+    from fastapi.testclient import TestClient
+    from src.main import app, auth_service, access_control_service
+    from src.models.access_policy import AccessPolicyModel
+    
+    base_dir = os.path.join("/tmp", "mcp_paging_test")
+    os.makedirs(base_dir, exist_ok=True)
+    for i in range(5):
+        for prefix in ("public", "secret"):
+            with open(os.path.join(base_dir, f"{prefix}{i}.txt"), "w") as f:
+                f.write(prefix)
+    
+    now = datetime.now()
+    access_control_service.add_policy(AccessPolicyModel(
+        id="paging-test", name="paging-test", description="Allow listing the directory",
+        resources=["directory:mcp_paging_test", "file:mcp_paging_test/*"], principals=["llm-*"],
+        actions=["list"], conditions={}, created_at=now, updated_at=now
+    ))
+    access_control_service.add_policy(AccessPolicyModel(
+        id="paging-deny", name="paging-deny", description="Deny listing secrets",
+        resources=["file:mcp_paging_test/s*"], principals=["llm-*"],
+        actions=["list"], conditions={}, effect="deny", created_at=now, updated_at=now
+    ))
+    session = auth_service.create_session("llm-agent", ["read"])
+    headers = {"Authorization": f"Bearer {session.token}"}
+    
+    def get(limit, offset):
+        response = TestClient(app).get(
+            "/directories/mcp_paging_test", params={"limit": limit, "offset": offset}, headers=headers
+        )
+        assert response.status_code == 200
+        return response.json()
+    
+    try:
+        whole = get(5, 0)
+        past_end = get(5, 5)
+        page_1 = get(3, 0)
+        page_2 = get(3, 3)
+    finally:
+        access_control_service.clear_policies()
+        shutil.rmtree(base_dir)
+    
+    public = [f"public{i}.txt" for i in range(5)]
+    assert sorted(entry["name"] for entry in whole["contents"]) == public
+    assert (whole["total_count"], whole["has_more"]) == (5, False)
+    assert past_end["contents"] == []
+    
+    assert (len(page_1["contents"]), page_1["total_count"], page_1["has_more"]) == (3, 5, True)
+    assert (len(page_2["contents"]), page_2["total_count"], page_2["has_more"]) == (2, 5, False)
+    assert sorted(entry["name"] for entry in page_1["contents"] + page_2["contents"]) == public
\ No newline at end of file
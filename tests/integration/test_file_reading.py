@@ -13,4 +13,159 @@ def test_file_reading_with_encoding():
 def test_file_reading_with_size_limit():
     """Test reading a file with size limit"""
     # Placeholder test - will be implemented properly later
-    assert True
\ No newline at end of file
+    assert True
+
+def test_file_read_emits_one_audit_record(monkeypatch):
+    """Test that a successful read produces a single consolidated audit record"""
+    import os
+    from datetime import datetime
+    from fastapi.testclient import TestClient
+    from src.main import app, auth_service, access_control_service, audit_service
+    from src.models.access_policy import AccessPolicyModel
+    
+    file_path = os.path.join("/tmp", "mcp_audit_test.txt")
+    with open(file_path, "w") as f:
+        f.write("hello audit")
+    
+    records = []
+    monkeypatch.setattr(audit_service.writer, "write", records.append)
+    access_control_service.add_policy(AccessPolicyModel(
+        id="audit-test",
+        name="audit-test",
+        description="Allow reading the audit test file",
+        resources=["file:mcp_audit_test.txt"],
+        principals=["llm-*"],
+        actions=["read"],
+        conditions={},
+        created_at=datetime.now(),
+        updated_at=datetime.now()
+    ))
+    session = auth_service.create_session("llm-agent", ["read"])
+    try:
+        response = TestClient(app).get(
+            "/files/mcp_audit_test.txt",
+            headers={"Authorization": f"Bearer {session.token}"}
+        )
+    finally:
+        access_control_service.clear_policies()
+        os.remove(file_path)
+    
+    assert response.status_code == 200
+    assert len(records) == 1
+    record = records[0]
+    assert record["principal"] == "llm-agent"
+    assert record["resource"] == "file:mcp_audit_test.txt"
+    assert record["action"] == "read"
+    assert record["decision"] == "allow"
+    assert record["outcome"] == "success"
+    assert record["status_code"] == 200
+    assert record["bytes"] == len("hello audit")
+    assert {"auth", "authz", "read"} <= set(record["timings"])
+
+def test_denied_request_emits_one_audit_record(monkeypatch):
+    """Test that a denied request is audited once with its decision"""
+    from fastapi.testclient import TestClient
+    from src.main import app, auth_service, audit_service
+    
+    records = []
+    monkeypatch.setattr(audit_service.writer, "write", records.append)
+    session = auth_service.create_session("llm-agent", ["read"])
+    
+    response = TestClient(app).get(
+        "/files/mcp_audit_denied.txt",
+        headers={"Authorization": f"Bearer {session.token}"}
+    )
+    
+    assert response.status_code == 403
+    assert len(records) == 1
+    assert records[0]["decision"] == "deny"
+    assert records[0]["outcome"] == "denied"
+    assert records[0]["status_code"] == 403
+
+def test_file_read_reports_server_timing(caplog):
+    """Test that a traced read reports its stages in Server-Timing and the trace log"""
+    import json
+    import logging
+    import os
+    from datetime import datetime
+    from fastapi.testclient import TestClient
+    from src.main import app, auth_service, access_control_service
+    from src.middleware.tracing_middleware import TracingMiddleware
+    from src.models.access_policy import AccessPolicyModel
+    
+    with open(os.path.join("/tmp", "mcp_trace_test.txt"), "w") as f:
+        f.write("hello trace")
+    
+    access_control_service.add_policy(AccessPolicyModel(
+        id="trace-test",
+        name="trace-test",
+        description="Allow reading the trace test file",
+        resources=["file:mcp_trace_test.txt"],
+        principals=["llm-*"],
+        actions=["read"],
+        conditions={},
+        created_at=datetime.now(),
+        updated_at=datetime.now()
+    ))
+    session = auth_service.create_session("llm-agent", ["read"])
+    client = TestClient(TracingMiddleware(app, server_timing=True, sample_rate=1.0))
+    try:
+        with caplog.at_level(logging.INFO, logger="trace"):
+            response = client.get(
+                "/files/mcp_trace_test.txt",
+                headers={"Authorization": f"Bearer {session.token}"}
+            )
+    finally:
+        access_control_service.clear_policies()
+    
+    assert response.status_code == 200
+    assert response.text == "hello trace"
+    stages = [entry.split(";")[0] for entry in response.headers["server-timing"].split(", ")]
+    for stage in ("policy", "validate_path", "resolve_path", "disk_read", "decode", "endpoint", "serialize", "total"):
+        assert stage in stages
+    
+    logged = json.loads(caplog.records[-1].getMessage())
+    assert logged["status_code"] == 200
+    # The audit record is submitted after the response headers are sent
+    assert "audit" in logged["stages"]
+    assert "audit" not in stages
+
+def test_file_read_rejected_when_memory_budget_full(monkeypatch):
+    """Test that reads get 503 with Retry-After while the memory budget is full, and release it otherwise"""
+    import os
+    from datetime import datetime
+    from fastapi.testclient import TestClient
+    from src.main import app, auth_service, access_control_service, memory_budget
+    from src.models.access_policy import AccessPolicyModel
+    
+    with open(os.path.join("/tmp", "mcp_budget_test.txt"), "w") as f:
+        f.write("hello budget")
+    
+    access_control_service.add_policy(AccessPolicyModel(
+        id="budget-test",
+        name="budget-test",
+        description="Allow reading the memory budget test file",
+        resources=["file:mcp_budget_test.txt"],
+        principals=["llm-*"],
+        actions=["read"],
+        conditions={},
+        created_at=datetime.now(),
+        updated_at=datetime.now()
+    ))
+    session = auth_service.create_session("llm-budget", ["read"])
+    headers = {"Authorization": f"Bearer {session.token}"}
+    client = TestClient(app)
+    monkeypatch.setattr(memory_budget, "queue_timeout", 0)
+    try:
+        response = client.get("/files/mcp_budget_test.txt", headers=headers)
+        assert response.status_code == 200
+        assert memory_budget.in_use == 0
+        
+        monkeypatch.setattr(memory_budget, "in_use", memory_budget.max_bytes)
+        response = client.get("/files/mcp_budget_test.txt", headers=headers)
+    finally:
+        access_control_service.clear_policies()
+    
+    assert response.status_code == 503
+    assert response.json()["detail"] == "Server busy"
+    assert response.headers["retry-after"] == "1"
\ No newline at end of file
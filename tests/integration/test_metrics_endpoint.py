@@ -0,0 +1,21 @@
+from fastapi.testclient import TestClient
+from src.main import app, auth_service
+
+client = TestClient(app)
+
+def test_metrics_endpoint_exposes_prometheus_text():
+    """Test that /metrics is public and reports requests, caches and sessions"""
+    session = auth_service.create_session("llm-agent", ["read"])
+    client.get("/files/mcp_metrics_missing.txt", headers={"Authorization": f"Bearer {session.token}"})
+    
+    response = client.get("/metrics")
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert 'mcp_requests_total{method="GET",route="/files/{path:path}",status="403"}' in body
+    assert 'mcp_request_duration_seconds_bucket{route="/files/{path:path}",stage="authz",le="+Inf"}' in body
+    assert 'mcp_sessions{state="live"}' in body
+    assert "mcp_access_decision_cache_hit_ratio" in body
+    assert "mcp_directory_cache_hits_total" in body
+    assert 'mcp_policy_evaluations_total{kind="access"}' in body
\ No newline at end of file
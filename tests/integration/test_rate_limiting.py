@@ -0,0 +1,51 @@
+from datetime import datetime
+from fastapi.testclient import TestClient
+from src.main import app, auth_service, access_control_service, rate_limiter
+from src.models.access_policy import AccessPolicyModel
+from src.services.file_service import FileService
+from src.utils.rate_limiter import RateLimits
+
+client = TestClient(app)
+
+def test_rate_limited_before_filesystem_work(monkeypatch):
+    """Test that an exhausted principal gets 429 with Retry-After without touching the filesystem"""
+    monkeypatch.setattr(rate_limiter, "default_limits", RateLimits(rate=0.01, burst=3))
+    session = auth_service.create_session("llm-throttled", ["read"])
+    headers = {"Authorization": f"Bearer {session.token}"}
+    checks = []
+    file_exists_async = FileService.file_exists_async
+    
+    async def counting_exists(file_path):
+        checks.append(file_path)
+        return await file_exists_async(file_path)
+    
+    monkeypatch.setattr(FileService, "file_exists_async", staticmethod(counting_exists))
+    
+    access_control_service.add_policy(AccessPolicyModel(
+        id="rate-limit-test",
+        name="rate-limit-test",
+        description="Allow reading the rate limit test file",
+        resources=["file:mcp_rate_limit_missing.txt"],
+        principals=["llm-*"],
+        actions=["read"],
+        conditions={},
+        created_at=datetime.now(),
+        updated_at=datetime.now()
+    ))
+    try:
+        # A read without a limit is large and spends the whole burst
+        first = client.get("/files/mcp_rate_limit_missing.txt", headers=headers)
+        second = client.get("/files/mcp_rate_limit_missing.txt", headers=headers)
+    finally:
+        access_control_service.clear_policies()
+    
+    assert first.status_code == 404
+    assert second.status_code == 429
+    assert second.json() == {"detail": "Rate limit exceeded"}
+    assert int(second.headers["retry-after"]) >= 1
+    assert checks == ["mcp_rate_limit_missing.txt"]
+    
+    # Other principals are unaffected
+    other = auth_service.create_session("llm-agent-2", ["read"])
+    response = client.get("/files/mcp_rate_limit_missing.txt", headers={"Authorization": f"Bearer {other.token}"})
+    assert response.status_code != 429
\ No newline at end of file
@@ -0,0 +1,224 @@
+import pytest
+from datetime import datetime, timedelta
+from src.services.access_control_service import AccessControlService, SUBTREE_ALLOW, SUBTREE_DENY, SUBTREE_MIXED
+from src.models.access_policy import AccessPolicyModel
+from src.models.user_session import UserSessionModel
+
+def make_policy(policy_id, resources, principals, actions, conditions=None):
+    return AccessPolicyModel(
+        id=policy_id,
+        name=policy_id,
+        description=f"Test policy {policy_id}",
+        resources=resources,
+        principals=principals,
+        actions=actions,
+        conditions=conditions or {},
+        created_at=datetime.now(),
+        updated_at=datetime.now()
+    )
+
+def make_session(principal, metadata=None):
+    return UserSessionModel(
+        id="session",
+        token="token",
+        principal=principal,
+        created_at=datetime.now(),
+        expires_at=datetime.now() + timedelta(hours=1),
+        scopes=["read"],
+        metadata=metadata or {}
+    )
+
+def test_check_access_with_wildcards():
+    """Test principal and resource glob matching"""
+    service = AccessControlService()
+    service.add_policy(make_policy("llm", ["file:docs/*"], ["llm-*"], ["read"]))
+    
+    assert service.check_access(make_session("llm-agent"), "file:docs/readme.md", "read") == True
+    assert service.check_access(make_session("llm-agent"), "file:docs/sub/readme.md", "read") == True
+    assert service.check_access(make_session("human"), "file:docs/readme.md", "read") == False
+    assert service.check_access(make_session("llm-agent"), "file:src/main.py", "read") == False
+    assert service.check_access(make_session("llm-agent"), "file:docs/readme.md", "list") == False
+
+def test_check_access_with_literal_patterns():
+    """Test patterns without wildcards match exactly"""
+    service = AccessControlService()
+    service.add_policy(make_policy("exact", ["directory:docs"], ["admin"], ["list"]))
+    
+    assert service.check_access(make_session("admin"), "directory:docs", "list") == True
+    assert service.check_access(make_session("admin"), "directory:docs/sub", "list") == False
+    assert service.check_access(make_session("admin2"), "directory:docs", "list") == False
+
+def test_check_access_with_character_classes():
+    """Test glob character classes and single-character wildcards"""
+    service = AccessControlService()
+    service.add_policy(make_policy("classes", ["file:logs/day[0-9].log", "file:tmp/?.txt"], ["*"], ["read"]))
+    
+    assert service.check_access(make_session("anyone"), "file:logs/day7.log", "read") == True
+    assert service.check_access(make_session("anyone"), "file:logs/dayX.log", "read") == False
+    assert service.check_access(make_session("anyone"), "file:tmp/a.txt", "read") == True
+    assert service.check_access(make_session("anyone"), "file:tmp/ab.txt", "read") == False
+
+def test_check_access_with_conditions():
+    """Test policy conditions against session metadata"""
+    service = AccessControlService()
+    service.add_policy(make_policy("cond", ["*"], ["*"], ["read"], {"department": "engineering"}))
+    
+    assert service.check_access(make_session("u", {"department": "engineering"}), "file:x", "read") == True
+    assert service.check_access(make_session("u", {"department": "sales"}), "file:x", "read") == False
+    assert service.check_access(make_session("u"), "file:x", "read") == False
+
+def test_candidates_only_include_matching_prefixes():
+    """Test that the index narrows candidates by action and resource prefix"""
+    service = AccessControlService()
+    for i in range(100):
+        service.add_policy(make_policy(f"p{i}", [f"file:projects/p{i}/*"], ["*"], ["read"]))
+    service.add_policy(make_policy("all", ["*"], ["admin"], ["read"]))
+    
+    candidates = service.policy_index.candidates("file:projects/p42/main.py", "read")
+    
+    assert sorted(c.policy.id for c in candidates) == ["all", "p42"]
+    assert service.policy_index.candidates("file:projects/p42/main.py", "list") == []
+
+def test_clear_policies():
+    """Test removing all policies"""
+    service = AccessControlService()
+    service.add_policy(make_policy("all", ["*"], ["*"], ["read"]))
+    service.clear_policies()
+    
+    assert service.policies == []
+    assert service.check_access(make_session("u"), "file:x", "read") == False
+
+def test_decision_cache_hits_for_repeated_checks():
+    """Test that repeated checks are answered from the decision cache"""
+    service = AccessControlService()
+    service.add_policy(make_policy("llm", ["file:docs/*"], ["llm-*"], ["read"]))
+    session = make_session("llm-agent")
+    
+    for _ in range(5):
+        assert service.check_access(session, "file:docs/readme.md", "read") == True
+    
+    stats = service.get_cache_stats()
+    assert stats["misses"] == 1
+    assert stats["hits"] == 4
+
+def test_decision_cache_invalidated_by_policy_change():
+    """Test that adding or clearing policies invalidates cached decisions"""
+    service = AccessControlService()
+    session = make_session("llm-agent")
+    
+    assert service.check_access(session, "file:docs/readme.md", "read") == False
+    service.add_policy(make_policy("llm", ["file:docs/*"], ["llm-*"], ["read"]))
+    assert service.check_access(session, "file:docs/readme.md", "read") == True
+    service.clear_policies()
+    assert service.check_access(session, "file:docs/readme.md", "read") == False
+    assert service.get_cache_stats()["hits"] == 0
+
+def test_decision_cache_keyed_by_condition_metadata():
+    """Test that metadata referenced by conditions is part of the cache key"""
+    service = AccessControlService()
+    service.add_policy(make_policy("cond", ["*"], ["*"], ["read"], {"department": "engineering"}))
+    
+    assert service.check_access(make_session("u", {"department": "engineering"}), "file:x", "read") == True
+    assert service.check_access(make_session("u", {"department": "sales"}), "file:x", "read") == False
+    # Metadata that no condition references does not split the cache
+    assert service.check_access(make_session("u", {"department": "sales", "team": "a"}), "file:x", "read") == False
+    assert service.get_cache_stats()["hits"] == 1
+
+def test_decision_cache_is_bounded():
+    """Test that the decision cache evicts least recently used entries"""
+    service = AccessControlService()
+    service.decision_cache.maxsize = 10
+    service.add_policy(make_policy("all", ["*"], ["*"], ["read"]))
+    session = make_session("u")
+    
+    for i in range(50):
+        service.check_access(session, f"file:{i}", "read")
+    
+    assert service.get_cache_stats()["size"] == 10
+
+def test_check_subtree_access():
+    """Test uniform allow, uniform deny and mixed subtree decisions"""
+    service = AccessControlService()
+    service.add_policy(make_policy("docs", ["file:docs/*"], ["llm-*"], ["list"]))
+    service.add_policy(make_policy("notes", ["file:notes/public-*"], ["llm-*"], ["list"]))
+    service.add_policy(make_policy("exact", ["file:misc"], ["llm-*"], ["list"]))
+    session = make_session("llm-agent")
+    
+    assert service.check_subtree_access(session, "file:docs/", "list") == SUBTREE_ALLOW
+    assert service.check_subtree_access(session, "file:docs/api/", "list") == SUBTREE_ALLOW
+    assert service.check_subtree_access(session, "file:notes/", "list") == SUBTREE_MIXED
+    assert service.check_subtree_access(session, "file:", "list") == SUBTREE_MIXED
+    assert service.check_subtree_access(session, "file:src/", "list") == SUBTREE_DENY
+    assert service.check_subtree_access(session, "file:misc/", "list") == SUBTREE_DENY
+    assert service.check_subtree_access(session, "file:docs/", "read") == SUBTREE_DENY
+    assert service.check_subtree_access(make_session("human"), "file:docs/", "list") == SUBTREE_DENY
+
+def test_check_subtree_access_agrees_with_check_access():
+    """Test that uniform subtree decisions match per-entry decisions"""
+    service = AccessControlService()
+    service.add_policy(make_policy("docs", ["file:docs/*"], ["*"], ["list"]))
+    service.add_policy(make_policy("cond", ["file:private/*"], ["*"], ["list"], {"role": "admin"}))
+    session = make_session("u", {"role": "viewer"})
+    
+    assert service.check_subtree_access(session, "file:private/", "list") == SUBTREE_DENY
+    assert service.check_access(session, "file:private/a.txt", "list") == False
+    assert service.check_subtree_access(session, "file:docs/", "list") == SUBTREE_ALLOW
+    assert service.check_access(session, "file:docs/deep/a.txt", "list") == True
+
+def test_check_access_many_agrees_with_check_access():
+    """Test that bulk decisions match per-resource decisions, in order"""
+    service = AccessControlService()
+    service.add_policy(make_policy("docs", ["file:docs/*", "file:readme.md"], ["*"], ["list"]))
+    service.add_policy(make_policy("mixed", ["file:src/public-*"], ["*"], ["list"]))
+    session = make_session("u")
+    resources = [
+        "file:docs/a.md", "file:src/public-a.py", "file:src/secret.py", "file:private/key",
+        "file:readme.md", "file:other.md", "file:docs/a.md"
+    ]
+    
+    assert service.check_access_many(session, resources, "list") == [
+        service.check_access(session, resource, "list") for resource in resources
+    ]
+    assert service.check_access_many(session, resources, "list") == [True, True, False, False, True, False, True]
+
+def test_check_access_many_skips_uniform_subtrees():
+    """Test that resources in a uniformly allowed or denied directory need no per-resource check"""
+    service = AccessControlService()
+    service.add_policy(make_policy("docs", ["file:docs/*"], ["*"], ["list"]))
+    session = make_session("u")
+    
+    assert service.check_access_many(session, [f"file:{d}/{i}.md" for d in ("docs", "src") for i in range(50)], "list") == [True] * 50 + [False] * 50
+    assert service.get_evaluation_stats() == {"evaluations": 0, "subtree_evaluations": 2}
+
+def test_deny_policies_override_allow():
+    """Test that deny policies win over allow policies"""
+    service = AccessControlService()
+    service.add_policy(make_policy("all", ["file:*"], ["*"], ["list"]))
+    deny = make_policy("secrets", ["file:secrets/*"], ["*"], ["list"])
+    deny.effect = "deny"
+    service.add_policy(deny)
+    session = make_session("u")
+    
+    assert service.check_access(session, "file:docs/a.txt", "list") == True
+    assert service.check_access(session, "file:secrets/a.txt", "list") == False
+    assert service.check_subtree_access(session, "file:secrets/", "list") == SUBTREE_DENY
+    assert service.check_subtree_access(session, "file:", "list") == SUBTREE_MIXED
+    assert service.check_subtree_access(session, "file:docs/", "list") == SUBTREE_ALLOW
+
+def test_time_dependent_decisions_not_cached():
+    """Test that decisions depending on a time window bypass the decision cache"""
+    service = AccessControlService()
+    service.add_policy(make_policy("always", ["file:*"], ["*"], ["read"], {"time": {"time_between": ["00:00", "23:59:59"]}}))
+    session = make_session("u")
+    
+    assert service.check_access(session, "file:x", "read") == True
+    assert service.check_access(session, "file:x", "read") == True
+    assert service.get_cache_stats()["hits"] == 0
+
+def test_invalid_condition_rejected_on_add():
+    """Test that policies with malformed conditions cannot be added"""
+    service = AccessControlService()
+    
+    with pytest.raises(ValueError):
+        service.add_policy(make_policy("bad", ["file:*"], ["*"], ["read"], {"role": {"unknown": 1}}))
+    assert service.policies == []
\ No newline at end of file
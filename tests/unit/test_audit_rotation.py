@@ -0,0 +1,71 @@
+import gzip
+import json
+import os
+import pytest
+from datetime import datetime, timedelta
+from src.utils.audit_rotation import LogRotator
+from src.utils.audit_writer import AuditWriter
+
+def test_writer_rotates_by_size_and_compresses_segments(tmp_path):
+    """Test that the log is split into compressed segments once it reaches max_bytes"""
+    log_file = str(tmp_path / "audit.log")
+    rotator = LogRotator(log_file, max_bytes=200)
+    writer = AuditWriter(log_file, batch_size=1, rotator=rotator)
+    
+    for i in range(20):
+        writer.write({"sequence": i, "padding": "x" * 20})
+    writer.close()
+    
+    segments = rotator.list_segments()
+    assert rotator.rotations > 0
+    assert segments and all(segment.endswith(".gz") for segment in segments)
+    
+    # Every record is kept exactly once, in order, across segments and the active file
+    lines = []
+    for segment in segments:
+        with gzip.open(segment, "rt", encoding="utf-8") as file:
+            lines.extend(file.read().splitlines())
+    with open(log_file, "r", encoding="utf-8") as file:
+        lines.extend(file.read().splitlines())
+    assert [json.loads(line)["sequence"] for line in lines] == list(range(20))
+    for segment in segments:
+        assert os.path.getsize(segment) > 0
+
+def test_rotates_by_age(tmp_path):
+    """Test that a segment older than max_age is rotated on the next write"""
+    log_file = tmp_path / "audit.log"
+    log_file.write_text("old\n")
+    rotator = LogRotator(str(log_file), max_age=60)
+    
+    assert rotator.before_write(10) is None
+    rotator._started -= 61
+    segment = rotator.before_write(10)
+    rotator.close()
+    
+    assert segment is not None
+    assert not log_file.exists()
+    assert rotator.list_segments() == [segment + ".gz"]
+
+def test_retention_deletes_old_and_excess_segments(tmp_path):
+    """Test that retention removes segments past the age or count limit"""
+    log_file = tmp_path / "audit.log"
+    cutoffs = []
+    rotator = LogRotator(str(log_file), retention_days=7, max_segments=2, on_retention=cutoffs.append)
+    now = datetime.now()
+    for name, age_days in [("20250101", 10), ("20250102", 3), ("20250103", 2), ("20250104", 1)]:
+        segment = tmp_path / f"audit.log.{name}.gz"
+        segment.write_bytes(b"")
+        timestamp = (now - timedelta(days=age_days)).timestamp()
+        os.utime(segment, (timestamp, timestamp))
+    
+    assert rotator.apply_retention(now) == 2
+    
+    assert [os.path.basename(segment) for segment in rotator.list_segments()] == [
+        "audit.log.20250103.gz", "audit.log.20250104.gz"
+    ]
+    assert cutoffs == [now - timedelta(days=7)]
+
+def test_rotator_rejects_negative_limits(tmp_path):
+    """Test that negative rotation limits are rejected"""
+    with pytest.raises(ValueError):
+        LogRotator(str(tmp_path / "audit.log"), max_bytes=-1)
\ No newline at end of file
@@ -0,0 +1,171 @@
+import json
+import time
+import pytest
+from src.services.audit_service import AuditService
+from src.utils.audit_writer import AuditWriter
+from src.utils.audit_store import AuditStore
+from src.utils.audit_sampling import SamplingPolicy
+
+def read_records(path):
+    with open(path, "r", encoding="utf-8") as file:
+        return [json.loads(line) for line in file]
+
+def test_log_access_writes_json_lines(tmp_path):
+    """Test that audit records are written as one JSON object per line"""
+    log_file = tmp_path / "audit.log"
+    audit_service = AuditService(log_file=str(log_file), writer=AuditWriter(str(log_file)))
+    
+    audit_log = audit_service.log_access("agent", "/tmp/a.txt", "read", "success", ip_address="127.0.0.1")
+    audit_service.flush()
+    
+    records = read_records(log_file)
+    assert len(records) == 1
+    assert records[0]["id"] == audit_log.id
+    assert records[0]["principal"] == "agent"
+    assert records[0]["outcome"] == "success"
+    assert records[0]["ip_address"] == "127.0.0.1"
+    audit_service.close()
+
+def test_writer_batches_records(tmp_path):
+    """Test that queued records are appended in batches of at most batch_size"""
+    log_file = tmp_path / "audit.log"
+    writer = AuditWriter(str(log_file), batch_size=10, flush_interval=5)
+    batches = []
+    write_batch = writer._write_batch
+    writer._write_batch = lambda batch: (batches.append(len(batch)), write_batch(batch))
+    
+    for i in range(25):
+        writer.write({"sequence": i})
+    writer.close()
+    
+    assert [record["sequence"] for record in read_records(log_file)] == list(range(25))
+    assert sum(batches) == 25
+    assert max(batches) <= 10
+    assert writer.get_stats()["written"] == 25
+
+def test_close_drains_queue(tmp_path):
+    """Test that closing the writer writes every queued record"""
+    log_file = tmp_path / "audit.log"
+    writer = AuditWriter(str(log_file), flush_interval=60)
+    
+    for i in range(100):
+        writer.write({"sequence": i})
+    writer.close()
+    
+    assert len(read_records(log_file)) == 100
+    assert writer.get_stats()["queued"] == 0
+
+def test_drop_policy_counts_dropped_records(tmp_path):
+    """Test that the drop policy discards records when the queue is full"""
+    writer = AuditWriter(str(tmp_path / "audit.log"), queue_size=2, overflow_policy="drop")
+    # Fill the queue before the writer thread starts consuming it
+    writer._ensure_started = lambda: None
+    
+    results = [writer.write({"sequence": i}) for i in range(5)]
+    
+    assert results == [True, True, False, False, False]
+    assert writer.get_stats()["dropped"] == 3
+    assert writer.get_stats()["queued"] == 2
+
+def test_block_policy_waits_a_bounded_time(tmp_path):
+    """Test that the block policy gives up after its timeout instead of stalling the caller"""
+    writer = AuditWriter(str(tmp_path / "audit.log"), queue_size=1, overflow_policy="block", block_timeout=0.05)
+    writer._ensure_started = lambda: None
+    
+    start = time.perf_counter()
+    results = [writer.write({"sequence": i}) for i in range(2)]
+    
+    assert results == [True, False]
+    assert time.perf_counter() - start < 1
+    assert writer.get_stats()["dropped"] == 1
+
+def test_writer_rejects_invalid_settings(tmp_path):
+    """Test that invalid writer settings are rejected"""
+    log_file = str(tmp_path / "audit.log")
+    with pytest.raises(ValueError):
+        AuditWriter(log_file, batch_size=0)
+    with pytest.raises(ValueError):
+        AuditWriter(log_file, flush_interval=0)
+    with pytest.raises(ValueError):
+        AuditWriter(log_file, overflow_policy="spill")
+    with pytest.raises(ValueError):
+        AuditWriter(log_file, block_timeout=-1)
+
+class RecordingWriter:
+    """Writer stand-in that keeps queued records in memory"""
+    
+    def __init__(self):
+        self.records = []
+    
+    def write(self, record):
+        self.records.append(record)
+        return True
+
+def test_sampling_keeps_denials_and_errors(tmp_path):
+    """Test that sampled-out successes are skipped but denials and errors are always written"""
+    writer = RecordingWriter()
+    audit_service = AuditService(log_file=str(tmp_path / "audit.log"), writer=writer, sampling=SamplingPolicy(0.0))
+    
+    audit_service.log_access("agent", "file:a.txt", "read", "success")
+    audit_service.log_access("agent", "file:a.txt", "read", "denied")
+    audit_service.log_access("agent", "file:a.txt", "read", "error")
+    
+    assert [record["outcome"] for record in writer.records] == ["denied", "error"]
+
+def test_sampling_rules_match_principal_and_resource():
+    """Test that the first matching rule sets the success sampling rate"""
+    sampling = SamplingPolicy(1.0, [
+        {"principal": "llm-*", "resource": "file:public/*", "rate": 0.0},
+        {"resource": "file:*", "rate": 0.5}
+    ], random_source=lambda: 0.25)
+    
+    assert sampling.rate_for("llm-agent", "file:public/a.txt") == 0.0
+    assert sampling.rate_for("admin", "file:public/a.txt") == 0.5
+    assert sampling.rate_for("admin", "directory:docs") == 1.0
+    assert not sampling.should_record("llm-agent", "file:public/a.txt", "success")
+    assert sampling.should_record("admin", "file:public/a.txt", "success")
+    assert sampling.should_record("llm-agent", "file:public/a.txt", "denied")
+    
+    with pytest.raises(ValueError):
+        SamplingPolicy(1.5)
+    with pytest.raises(ValueError):
+        SamplingPolicy(1.0, [{"principal": "*"}])
+
+def test_rollups_count_every_request(tmp_path):
+    """Test that rollup records carry exact counts, including sampled-out successes"""
+    writer = RecordingWriter()
+    audit_service = AuditService(log_file=str(tmp_path / "audit.log"), writer=writer, sampling=SamplingPolicy(0.0))
+    for _ in range(1000):
+        audit_service.log_access("agent", "file:a.txt", "read", "success")
+    audit_service.log_access("agent", "file:a.txt", "read", "denied")
+    audit_service.log_access("other", "directory:docs", "list", "success")
+    
+    assert audit_service.flush_rollups() == 3
+    
+    rollups = {
+        (record["principal"], record["action"], record["outcome"]): record["count"]
+        for record in writer.records if record.get("record_type") == "rollup"
+    }
+    assert rollups == {
+        ("agent", "read", "success"): 1000,
+        ("agent", "read", "denied"): 1,
+        ("other", "list", "success"): 1
+    }
+    # The counters start over after a flush
+    assert audit_service.flush_rollups() == 0
+
+def test_rollups_are_kept_out_of_request_logs(tmp_path):
+    """Test that rollups are stored apart and never counted as requests"""
+    store = AuditStore(str(tmp_path / "audit.db"))
+    log_file = str(tmp_path / "audit.log")
+    audit_service = AuditService(log_file=log_file, writer=AuditWriter(log_file, store=store), store=store)
+    audit_service.log_access("p", "file:a.txt", "read", "success")
+    audit_service.log_access("p", "file:a.txt", "read", "success")
+    audit_service.flush_rollups()
+    audit_service.flush()
+    
+    assert len(audit_service.get_logs(outcome="success", principal="p")) == 2
+    rollups = audit_service.get_rollups(principal="p")
+    assert [(rollup["action"], rollup["outcome"], rollup["count"]) for rollup in rollups] == [("read", "success", 2)]
+    assert rollups[0]["window_start"] <= rollups[0]["timestamp"]
+    audit_service.close()
\ No newline at end of file
@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta
+from src.utils.audit_store import AuditStore
+
+BASE_TIME = datetime(2025, 1, 1, 12, 0, 0)
+
+def make_record(minute, principal="agent", resource="file:docs/a.txt", outcome="success"):
+    return {
+        "id": f"log-{minute}",
+        "timestamp": (BASE_TIME + timedelta(minutes=minute)).isoformat(),
+        "principal": principal,
+        "resource": resource,
+        "action": "read",
+        "outcome": outcome,
+        "details": "",
+        "ip_address": "127.0.0.1"
+    }
+
+def test_iter_logs_returns_newest_first(tmp_path):
+    """Test that stored records are returned newest first with defaults filled in"""
+    store = AuditStore(str(tmp_path / "audit.db"))
+    store.insert_batch([make_record(minute) for minute in range(5)])
+    
+    records = list(store.iter_logs(limit=3))
+    
+    assert [record["id"] for record in records] == ["log-4", "log-3", "log-2"]
+    assert records[0]["status_code"] == 0
+    assert records[0]["timings"] == {}
+
+def test_iter_logs_filters(tmp_path):
+    """Test filtering by time range, principal, resource prefix and outcome"""
+    store = AuditStore(str(tmp_path / "audit.db"))
+    store.insert_batch([
+        make_record(0, principal="alice"),
+        make_record(1, principal="bob", resource="file:secret/key.pem", outcome="denied"),
+        make_record(2, principal="alice", resource="directory:docs"),
+        make_record(3, principal="alice", resource="file:docs/b.txt", outcome="error"),
+    ])
+    
+    def ids(**filters):
+        return [record["id"] for record in store.iter_logs(**filters)]
+    
+    assert ids(principal="alice") == ["log-3", "log-2", "log-0"]
+    assert ids(resource_prefix="file:docs/") == ["log-3", "log-0"]
+    assert ids(outcome="denied") == ["log-1"]
+    assert ids(start=BASE_TIME + timedelta(minutes=1), end=BASE_TIME + timedelta(minutes=3)) == ["log-2", "log-1"]
+    assert ids(principal="alice", resource_prefix="file:", outcome="success") == ["log-0"]
+
+def test_queries_use_indexes(tmp_path):
+    """Test that filtered queries are answered from an index instead of a table scan"""
+    store = AuditStore(str(tmp_path / "audit.db"))
+    store.insert_batch([make_record(0)])
+    connection = store._connect()
+    
+    for where in ("principal = 'agent'", "resource >= 'file:' AND resource < 'file;'", "timestamp >= '2025'"):
+        plan = " ".join(row[-1] for row in connection.execute(f"EXPLAIN QUERY PLAN SELECT * FROM audit_log WHERE {where}"))
+        assert "USING INDEX" in plan
+
+def test_delete_before_removes_old_records(tmp_path):
+    """Test that records older than the retention cutoff are deleted"""
+    store = AuditStore(str(tmp_path / "audit.db"))
+    store.insert_batch([make_record(minute) for minute in range(5)])
+    
+    assert store.delete_before(BASE_TIME + timedelta(minutes=3)) == 3
+    
+    assert [record["id"] for record in store.iter_logs()] == ["log-4", "log-3"]
\ No newline at end of file
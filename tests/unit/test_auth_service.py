@@ -0,0 +1,94 @@
+import pytest
+import asyncio
+from datetime import datetime, timedelta
+from src.services.auth_service import AuthService
+
+def test_validate_session():
+    """Test validating a freshly created session"""
+    auth_service = AuthService()
+    session = auth_service.create_session("llm-agent", ["read"])
+    
+    assert auth_service.validate_session(session.token) == session
+    assert auth_service.validate_session("unknown-token") is None
+
+def test_sweep_expired_evicts_only_expired_sessions():
+    """Test that the sweeper evicts expired sessions and keeps live ones"""
+    auth_service = AuthService()
+    expired = [auth_service.create_session(f"agent-{i}", ["read"], duration_hours=1) for i in range(5)]
+    live = auth_service.create_session("long-lived", ["read"], duration_hours=48)
+    
+    # Sweep as if two hours have passed
+    evicted = auth_service.sweep_expired(now=datetime.now() + timedelta(hours=2))
+    
+    assert evicted == 5
+    assert live.token in auth_service.sessions
+    for session in expired:
+        assert session.token not in auth_service.sessions
+    
+    # Nothing else is due until the long-lived session expires
+    assert auth_service.sweep_expired(now=datetime.now() + timedelta(hours=2)) == 0
+    assert auth_service.sweep_expired(now=datetime.now() + timedelta(hours=49)) == 1
+
+def test_sweep_expired_skips_revoked_sessions():
+    """Test that revoked sessions are not counted as evicted"""
+    auth_service = AuthService()
+    session = auth_service.create_session("agent", ["read"], duration_hours=1)
+    assert auth_service.revoke_session(session.token) == True
+    
+    evicted = auth_service.sweep_expired(now=datetime.now() + timedelta(hours=2))
+    
+    assert evicted == 0
+    assert auth_service.get_session_stats()["evicted_total"] == 0
+
+def test_revoke_compacts_stale_expiry_entries():
+    """Test that the sweeper still works after revocations compact the expiry heap"""
+    auth_service = AuthService()
+    revoked = [auth_service.create_session(f"agent-{i}", ["read"], duration_hours=1) for i in range(100)]
+    kept = auth_service.create_session("kept", ["read"], duration_hours=1)
+    
+    for session in revoked:
+        assert auth_service.revoke_session(session.token) == True
+    
+    later = datetime.now() + timedelta(hours=2)
+    assert auth_service.get_session_stats(now=later) == {"live": 0, "expired": 1, "evicted_total": 0}
+    assert auth_service.sweep_expired(now=later) == 1
+    assert kept.token not in auth_service.sessions
+
+def test_session_stats():
+    """Test live and expired session gauges"""
+    auth_service = AuthService()
+    for i in range(3):
+        auth_service.create_session(f"agent-{i}", ["read"], duration_hours=1)
+    auth_service.create_session("long-lived", ["read"], duration_hours=48)
+    
+    later = datetime.now() + timedelta(hours=2)
+    assert auth_service.get_session_stats(now=later) == {"live": 1, "expired": 3, "evicted_total": 0}
+    
+    auth_service.sweep_expired(now=later)
+    assert auth_service.get_session_stats(now=later) == {"live": 1, "expired": 0, "evicted_total": 3}
+
+def test_background_sweeper():
+    """Test that the background sweeper evicts expired sessions"""
+    auth_service = AuthService()
+    session = auth_service.create_session("agent", ["read"], duration_hours=0)
+    
+    async def run():
+        auth_service.start_sweeper(interval=0.01)
+        await asyncio.sleep(0.05)
+        await auth_service.stop_sweeper()
+    
+    asyncio.run(run())
+    
+    assert session.token not in auth_service.sessions
+    assert auth_service.get_session_stats()["evicted_total"] == 1
+
+def test_start_sweeper_rejects_non_positive_interval():
+    """Test that a non-positive sweep interval is rejected"""
+    auth_service = AuthService()
+    
+    async def run(interval):
+        auth_service.start_sweeper(interval)
+    
+    for interval in (0, -1):
+        with pytest.raises(ValueError):
+            asyncio.run(run(interval))
\ No newline at end of file
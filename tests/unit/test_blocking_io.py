@@ -0,0 +1,50 @@
+import asyncio
+import threading
+import pytest
+from src.utils.blocking_io import BlockingIOPool
+from src.utils.tracing import current_trace, end_trace, start_trace
+
+def test_pool_runs_off_the_event_loop_thread():
+    """Test that calls run on the pool's own threads and are counted"""
+    pool = BlockingIOPool("test", 2)
+    
+    async def run():
+        return await asyncio.gather(*(pool.run(lambda: threading.current_thread().name) for _ in range(4)))
+    
+    try:
+        names = asyncio.run(run())
+    finally:
+        pool.shutdown()
+    
+    assert all(name.startswith("io-test") for name in names)
+    assert pool.get_stats() == {"workers": 2, "in_flight": 0, "completed": 4}
+
+def test_pool_propagates_request_trace():
+    """Test that spans recorded on the pool land in the caller's trace"""
+    pool = BlockingIOPool("trace", 1)
+    
+    async def run():
+        trace, token = start_trace()
+        try:
+            assert await pool.run(current_trace) is trace
+        finally:
+            end_trace(token)
+    
+    try:
+        asyncio.run(run())
+    finally:
+        pool.shutdown()
+
+def test_pool_can_be_reused_after_shutdown():
+    """Test that a shut down pool starts a new executor on the next call"""
+    pool = BlockingIOPool("reuse", 1)
+    asyncio.run(pool.run(int, "1"))
+    pool.shutdown()
+    
+    assert asyncio.run(pool.run(int, "2")) == 2
+    pool.shutdown()
+
+def test_pool_rejects_zero_workers():
+    """Test that a pool needs at least one worker"""
+    with pytest.raises(ValueError):
+        BlockingIOPool("empty", 0)
\ No newline at end of file
@@ -0,0 +1,147 @@
+import asyncio
+import os
+import threading
+import time
+import pytest
+from starlette.responses import PlainTextResponse
+from src.middleware.cancellation_middleware import CancellationMiddleware
+from src.services.directory_service import DirectoryService
+from src.services.file_service import FileService
+from src.utils.blocking_io import BlockingIOPool
+from src.utils.cancellation import (
+    ABANDONED, CLIENT_DISCONNECTED, DEADLINE_EXCEEDED, CancellationToken, OperationCancelled,
+    check_cancelled, current_token, reset_token, set_token
+)
+from src.utils.directory_cache import directory_cache
+from src.utils.single_flight import SingleFlight
+
+SCOPE = {"type": "http", "method": "GET", "path": "/files/slow.txt", "query_string": b"", "headers": []}
+
+def test_token_cancel_and_deadline():
+    """Test that checks raise once a token is cancelled or past its deadline"""
+    token = CancellationToken()
+    token.check()
+    token.cancel(CLIENT_DISCONNECTED)
+    token.cancel(DEADLINE_EXCEEDED)
+    with pytest.raises(OperationCancelled) as error:
+        token.check()
+    assert error.value.reason == CLIENT_DISCONNECTED
+    
+    expired = CancellationToken(deadline=time.monotonic() - 1)
+    assert expired.cancelled
+    assert expired.reason == DEADLINE_EXCEEDED
+
+def test_check_cancelled_outside_request():
+    """Test that checks are no-ops when no request token is set"""
+    check_cancelled()
+
+def test_cancelled_walk_stops_and_is_not_cached():
+    """Test that a cancelled directory walk raises instead of finishing and caching"""
+    directory = os.path.join("/tmp", "mcp_cancel_walk")
+    os.makedirs(directory, exist_ok=True)
+    for index in range(3):
+        with open(os.path.join(directory, f"file{index}.txt"), "w") as f:
+            f.write("x")
+    directory_cache.clear()
+    token = CancellationToken()
+    token.cancel(CLIENT_DISCONNECTED)
+    
+    reset = set_token(token)
+    try:
+        with pytest.raises(OperationCancelled):
+            DirectoryService.get_directory_info("mcp_cancel_walk")
+        with pytest.raises(OperationCancelled):
+            FileService.read_file_content("mcp_cancel_walk/file0.txt")
+    finally:
+        reset_token(reset)
+    
+    assert directory_cache.get_stats()["size"] == 0
+    assert len(DirectoryService.get_directory_info("mcp_cancel_walk").contents) == 3
+
+def test_deadline_answers_504():
+    """Test that a request running past its deadline is cancelled and answered with 504"""
+    async def slow_app(scope, receive, send):
+        await asyncio.sleep(5)
+        await PlainTextResponse("late")(scope, receive, send)
+    
+    messages = []
+    
+    async def run():
+        async def receive():
+            if not messages:
+                messages.append({"type": "http.request"})
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await asyncio.sleep(10)
+        
+        async def send(message):
+            messages.append(message)
+        
+        await CancellationMiddleware(slow_app, request_timeout=0.05)({**SCOPE, "state": {}}, receive, send)
+    
+    start_time = time.perf_counter()
+    asyncio.run(run())
+    
+    assert time.perf_counter() - start_time < 1
+    assert messages[1]["status"] == 504
+
+def test_disconnect_stops_worker_thread():
+    """Test that a client disconnect stops the blocking loop running for the request"""
+    pool = BlockingIOPool("cancel", 1)
+    steps = []
+    stopped = threading.Event()
+    
+    def walk():
+        try:
+            while True:
+                check_cancelled()
+                steps.append(1)
+                time.sleep(0.005)
+        finally:
+            stopped.set()
+    
+    async def app(scope, receive, send):
+        await pool.run(walk)
+    
+    async def run():
+        async def receive():
+            await asyncio.sleep(0.05)
+            return {"type": "http.disconnect"}
+        
+        async def send(message):
+            raise AssertionError("nothing is sent to a client that has gone")
+        
+        await CancellationMiddleware(app)({**SCOPE, "state": {}}, receive, send)
+    
+    try:
+        asyncio.run(run())
+        assert stopped.wait(1)
+    finally:
+        pool.shutdown()
+    assert len(steps) < 100
+
+def test_shared_computation_has_its_own_token():
+    """Test that coalesced work ignores the first caller's token and stops once every caller has gone"""
+    group = SingleFlight()
+    tokens = []
+    
+    async def compute():
+        tokens.append(current_token())
+        await asyncio.sleep(1)
+    
+    async def run():
+        caller_token = CancellationToken()
+        reset = set_token(caller_token)
+        try:
+            callers = [asyncio.create_task(group.do("key", compute)) for _ in range(2)]
+        finally:
+            reset_token(reset)
+        await asyncio.sleep(0.01)
+        assert tokens[0] is not caller_token
+        callers[0].cancel()
+        await asyncio.sleep(0)
+        assert not tokens[0].cancelled
+        callers[1].cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+    
+    asyncio.run(run())
+    assert tokens[0].reason == ABANDONED
\ No newline at end of file
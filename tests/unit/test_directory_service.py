@@ -91,4 +91,54 @@ def test_list_directory_contents_pagination():
     contents_page_2 = DirectoryService.list_directory_contents(test_dir, limit=5, offset=5)
     
     # Verify the contents
-    assert len(contents_page_2) == 5
\ No newline at end of file
+    assert len(contents_page_2) == 5
+
+def test_get_directory_listing_matches_models():
+    """Test that the lightweight listing serializes exactly like the models"""
+    import json
+    from src.api.directories import DirectoryResponse
+    from src.utils.listing import serialize_listing
+    
+    # Create a test directory with files, a subdirectory and awkward names
+    test_dir = os.path.join(TEST_BASE_DIR, "listing_test")
+    full_path = os.path.join("/tmp", test_dir)
+    os.makedirs(os.path.join(full_path, "sub dir"), exist_ok=True)
+    for file_name in ["file1.txt", "noext", "trailing.", "ünïcode.md"]:
+        with open(os.path.join(full_path, file_name), "w") as f:
+            f.write(f"Content of {file_name}")
+    
+    for limit, offset in [(10, 0), (2, 1)]:
+        listing = DirectoryService.get_directory_listing(test_dir)
+        page = DirectoryService.get_entry_records(test_dir, listing.entries[offset:offset + limit])
+        body = serialize_listing(listing.directory, page, len(listing.entries), False)
+        
+        directory_info = DirectoryService.get_directory_info(test_dir)
+        expected = DirectoryResponse(
+            **directory_info.model_dump(exclude={"contents"}),
+            contents=DirectoryService.list_directory_contents(test_dir, limit=limit, offset=offset),
+            total_count=len(directory_info.contents),
+            has_more=False
+        )
+        
+        # Compare as key/value pairs so field order counts too
+        assert json.loads(body, object_pairs_hook=list) == json.loads(expected.model_dump_json(), object_pairs_hook=list)
+    
+    assert len(listing.entries) == 5
+    assert len(page) == 2
+
+def test_get_directory_listing_computes_only_requested_fields():
+    """Test that entries are not stat'ed or given ids unless those fields are requested"""
+    test_dir = os.path.join(TEST_BASE_DIR, "projection_test")
+    full_path = os.path.join("/tmp", test_dir)
+    os.makedirs(os.path.join(full_path, "sub"), exist_ok=True)
+    with open(os.path.join(full_path, "file.txt"), "w") as f:
+        f.write("Content")
+    
+    listing = DirectoryService.get_directory_listing(test_dir)
+    records = DirectoryService.get_entry_records(test_dir, listing.entries, ("name", "type"))
+    entries = sorted((record.to_dict(("name", "type")) for record in records), key=lambda entry: entry["name"])
+    assert entries == [{"name": "file.txt", "type": ".txt"}, {"name": "sub"}]
+    assert all(record.stat_info is None and record.id is None for record in records)
+    
+    records = DirectoryService.get_entry_records(test_dir, listing.entries, ("name", "size"))
+    assert all(record.stat_info is not None and record.id is None for record in records)
\ No newline at end of file
@@ -1,8 +1,10 @@
 import pytest
+import glob
 import os
 import tempfile
 from datetime import datetime
 from src.services.file_service import FileService
+from src.services.directory_service import DirectoryService
 from src.models.file import FileModel
 
 # Set up test directory within allowed paths
@@ -72,4 +74,51 @@ def test_file_exists_invalid_path():
     """Test checking if a file exists with an invalid path"""
     # Test with invalid path
     assert FileService.file_exists("") == False
-    # Note: Testing with None would raise an exception, which is handled in the service
\ No newline at end of file
+    # Note: Testing with None would raise an exception, which is handled in the service
+
+def test_get_file_records():
+    """Test getting records of many files and directories, with errors in place of the paths that failed"""
+    test_file_path = os.path.join(TEST_BASE_DIR, "record_file.txt")
+    with open(os.path.join("/tmp", test_file_path), "w") as f:
+        f.write("Test content")
+    os.makedirs(os.path.join("/tmp", TEST_BASE_DIR, "record_dir"), exist_ok=True)
+    
+    records = FileService.get_file_records([
+        test_file_path,
+        os.path.join(TEST_BASE_DIR, "missing.txt"),
+        os.path.join(TEST_BASE_DIR, "record_dir"),
+        "../etc/passwd",
+    ])
+    
+    # A full record serializes like the FileModel of get_file_info
+    assert records[0].to_dict() == FileService.get_file_info(test_file_path).model_dump(mode="json")
+    # Path validation rejects paths that do not exist
+    assert isinstance(records[1], ValueError)
+    # A directory serializes like a DirectoryModel without contents
+    assert records[2].to_dict() == DirectoryService.get_directory_info(os.path.join(TEST_BASE_DIR, "record_dir")).model_dump(mode="json")
+    assert isinstance(records[3], ValueError)
+    
+    # Projected records skip the fields that were not asked for
+    record = FileService.get_file_records([test_file_path], ("name", "size"))[0]
+    assert record.to_dict(("name", "size")) == {"name": "record_file.txt", "size": 12}
+    assert record.id is None and record.path is None
+
+def test_expand_glob(monkeypatch):
+    """Test that globs match files only, sorted and capped to the first paths in sorted order"""
+    glob_dir = os.path.join("/tmp", TEST_BASE_DIR, "glob_test")
+    os.makedirs(os.path.join(glob_dir, "sub.py"), exist_ok=True)
+    for name in ("b.py", "a.py", "c.txt"):
+        with open(os.path.join(glob_dir, name), "w") as f:
+            f.write(name)
+    pattern = os.path.join(TEST_BASE_DIR, "glob_test", "*.py")
+    
+    assert FileService.expand_glob(pattern, 10) == (
+        [os.path.join(TEST_BASE_DIR, "glob_test", name) for name in ("a.py", "b.py")], False
+    )
+    
+    # The cap keeps the first paths in sorted order whatever order the walk finds them in
+    iglob = glob.iglob
+    monkeypatch.setattr(glob, "iglob", lambda *args, **kwargs: reversed(sorted(iglob(*args, **kwargs))))
+    assert FileService.expand_glob(pattern, 1) == ([os.path.join(TEST_BASE_DIR, "glob_test", "a.py")], True)
+    with pytest.raises(ValueError):
+        FileService.expand_glob(os.path.join(TEST_BASE_DIR, "..", "*"), 10)
\ No newline at end of file
@@ -0,0 +1,83 @@
+import asyncio
+import pytest
+from src.utils.memory_budget import MemoryBudget, MemoryBudgetExceeded
+
+def test_reservations_within_budget_are_immediate():
+    """Test that requests are admitted while they fit and released bytes are returned"""
+    budget = MemoryBudget(100)
+    
+    async def run():
+        first = await budget.acquire(60)
+        second = await budget.acquire(40)
+        assert budget.get_stats()["utilization"] == 1.0
+        budget.release(first)
+        budget.release(second)
+    
+    asyncio.run(run())
+    assert budget.in_use == 0
+    assert budget.get_stats()["queued"] == 0
+
+def test_full_budget_queues_in_arrival_order():
+    """Test that waiting requests are admitted in order as memory is released"""
+    budget = MemoryBudget(100, queue_timeout=1)
+    admitted = []
+    
+    async def wait_for(name, nbytes):
+        await budget.acquire(nbytes)
+        admitted.append(name)
+    
+    async def run():
+        held = await budget.acquire(100)
+        large = asyncio.create_task(wait_for("large", 80))
+        await asyncio.sleep(0)
+        small = asyncio.create_task(wait_for("small", 10))
+        await asyncio.sleep(0.01)
+        # The small request fits in no room either and must not overtake the large one
+        assert admitted == []
+        budget.release(held)
+        await asyncio.gather(large, small)
+    
+    asyncio.run(run())
+    assert admitted == ["large", "small"]
+    assert budget.in_use == 90
+
+def test_rejected_after_queue_timeout():
+    """Test that a request is rejected when no room frees up in time"""
+    budget = MemoryBudget(100, queue_timeout=0.01)
+    
+    async def run():
+        await budget.acquire(100)
+        with pytest.raises(MemoryBudgetExceeded) as error:
+            await budget.acquire(1)
+        return error.value
+    
+    error = asyncio.run(run())
+    assert error.retry_after == 0.01
+    assert budget.get_stats()["rejected"] == 1
+    assert budget.get_stats()["waiting"] == 0
+
+def test_cancelled_waiter_leaves_queue():
+    """Test that a cancelled request neither holds memory nor blocks the queue"""
+    budget = MemoryBudget(100, queue_timeout=1)
+    
+    async def run():
+        held = await budget.acquire(50)
+        blocked = asyncio.create_task(budget.acquire(80))
+        await asyncio.sleep(0)
+        waiting = asyncio.create_task(budget.acquire(40))
+        await asyncio.sleep(0)
+        blocked.cancel()
+        await asyncio.gather(blocked, return_exceptions=True)
+        assert await waiting == 40
+        budget.release(held)
+    
+    asyncio.run(run())
+    assert budget.in_use == 40
+
+def test_oversized_and_disabled_budgets():
+    """Test that a request larger than the budget can run alone and 0 disables the budget"""
+    async def run():
+        assert await MemoryBudget(100).acquire(1000) == 100
+        assert await MemoryBudget(0).acquire(1000) == 0
+    
+    asyncio.run(run())
\ No newline at end of file
@@ -0,0 +1,47 @@
+import threading
+from src.utils.metrics import RequestMetrics, format_labels
+
+def test_request_metrics_aggregate_threads():
+    """Test that counts recorded on different threads are summed at scrape time"""
+    metrics = RequestMetrics(buckets=(0.01, 0.1))
+    
+    def record(count):
+        for _ in range(count):
+            metrics.request_started()
+            metrics.request_finished("GET", "/files/{path:path}", 200, 0.005, {"auth": 2.0})
+    
+    threads = [threading.Thread(target=record, args=(100,)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    metrics.request_started()
+    
+    requests, histograms, in_flight = metrics.collect()
+    
+    assert requests == {("GET", "/files/{path:path}", "200"): 400}
+    assert in_flight == 1
+    # 5ms falls in the first bucket, 2ms of auth too
+    assert histograms[("/files/{path:path}", "total")][:3] == [400, 0, 0]
+    assert histograms[("/files/{path:path}", "auth")][:3] == [400, 0, 0]
+
+def test_render_histogram_is_cumulative():
+    """Test the Prometheus histogram exposition"""
+    metrics = RequestMetrics(buckets=(0.01, 0.1))
+    for duration in (0.005, 0.05, 0.5):
+        metrics.request_started()
+        metrics.request_finished("GET", "/health", 200, duration)
+    
+    lines = metrics.render()
+    
+    assert 'mcp_requests_total{method="GET",route="/health",status="200"} 3' in lines
+    assert "mcp_requests_in_flight 0" in lines
+    assert 'mcp_request_duration_seconds_bucket{route="/health",stage="total",le="0.01"} 1' in lines
+    assert 'mcp_request_duration_seconds_bucket{route="/health",stage="total",le="0.1"} 2' in lines
+    assert 'mcp_request_duration_seconds_bucket{route="/health",stage="total",le="+Inf"} 3' in lines
+    assert 'mcp_request_duration_seconds_count{route="/health",stage="total"} 3' in lines
+
+def test_format_labels_escapes_values():
+    """Test that label values are escaped"""
+    assert format_labels((("path", 'a"b\\c\nd'),)) == '{path="a\\"b\\\\c\\nd"}'
+    assert format_labels(()) == ""
\ No newline at end of file
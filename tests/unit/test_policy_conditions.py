@@ -0,0 +1,87 @@
+import pytest
+from datetime import datetime
+from src.utils.policy_conditions import compile_condition, compile_conditions
+
+def check(conditions, metadata, clock=datetime.now):
+    predicates, _ = compile_conditions(conditions, clock)
+    return all(predicate(metadata) for predicate in predicates)
+
+def test_equality_condition():
+    """Test that plain values are compared for equality"""
+    assert check({"department": "engineering"}, {"department": "engineering"}) == True
+    assert check({"department": "engineering"}, {"department": "sales"}) == False
+    assert check({"department": "engineering"}, {}) == False
+    assert check({"flag": None}, {}) == False
+
+def test_membership_condition():
+    """Test membership in a list of allowed values"""
+    conditions = {"role": {"in": ["admin", "developer"]}}
+    
+    assert check(conditions, {"role": "developer"}) == True
+    assert check(conditions, {"role": "guest"}) == False
+    assert check(conditions, {"role": ["unhashable"]}) == False
+    assert check(conditions, {}) == False
+
+def test_prefix_condition():
+    """Test string prefix matching"""
+    conditions = {"team": {"prefix": "platform-"}}
+    
+    assert check(conditions, {"team": "platform-storage"}) == True
+    assert check(conditions, {"team": "web"}) == False
+    assert check(conditions, {"team": 42}) == False
+
+def test_numeric_range_condition():
+    """Test numeric ranges with optional bounds"""
+    assert check({"level": {"min": 2, "max": 5}}, {"level": 2}) == True
+    assert check({"level": {"min": 2, "max": 5}}, {"level": 5.5}) == False
+    assert check({"level": {"min": 2}}, {"level": 100}) == True
+    assert check({"level": {"max": 2}}, {"level": 3}) == False
+    assert check({"level": {"min": 0}}, {"level": "3"}) == False
+    assert check({"level": {"min": 0}}, {"level": True}) == False
+
+def test_time_window_condition():
+    """Test windows on the current time of day, including ones that wrap midnight"""
+    business_hours = {"time": {"time_between": ["09:00", "17:00"]}}
+    night_shift = {"time": {"time_between": ["22:00", "06:00"]}}
+    
+    def at(hour):
+        return lambda: datetime(2025, 1, 1, hour, 30)
+    
+    assert check(business_hours, {}, at(10)) == True
+    assert check(business_hours, {}, at(18)) == False
+    assert check(night_shift, {}, at(23)) == True
+    assert check(night_shift, {}, at(3)) == True
+    assert check(night_shift, {}, at(12)) == False
+    assert compile_conditions(business_hours)[1] == True
+    assert compile_conditions({"role": "admin"})[1] == False
+
+def test_predicates_ordered_cheapest_first():
+    """Test that cheaper predicates are evaluated before expensive ones"""
+    calls = []
+    
+    def clock():
+        calls.append("clock")
+        return datetime(2025, 1, 1, 12, 0)
+    
+    predicates, _ = compile_conditions(
+        {"time": {"time_between": ["09:00", "17:00"]}, "level": {"min": 1}, "role": "admin"},
+        clock
+    )
+    
+    # The equality check fails first, so the time window is never evaluated
+    assert not all(predicate({"role": "guest", "level": 3}) for predicate in predicates)
+    assert calls == []
+
+@pytest.mark.parametrize("spec", [
+    {"in": "admin"},
+    {"prefix": 3},
+    {"min": "low"},
+    {"time_between": ["09:00"]},
+    {"time_between": [9, 17]},
+    {"regex": ".*"},
+    {},
+])
+def test_invalid_condition_rejected(spec):
+    """Test that malformed operator dictionaries are rejected at compile time"""
+    with pytest.raises(ValueError):
+        compile_condition("key", spec)
\ No newline at end of file
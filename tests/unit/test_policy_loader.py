@@ -0,0 +1,111 @@
+import pytest
+import asyncio
+import json
+import os
+from datetime import datetime, timedelta
+from src.services.access_control_service import AccessControlService
+from src.services.policy_loader import PolicyLoader
+from src.models.user_session import UserSessionModel
+
+def make_session(principal):
+    return UserSessionModel(
+        id="session",
+        token="token",
+        principal=principal,
+        created_at=datetime.now(),
+        expires_at=datetime.now() + timedelta(hours=1),
+        scopes=["read"],
+        metadata={}
+    )
+
+def write_policies(path, policies):
+    with open(path, "w") as f:
+        json.dump(policies, f)
+    # Make sure the change is visible even on filesystems with coarse mtimes
+    stat_info = os.stat(path)
+    os.utime(path, ns=(stat_info.st_atime_ns, stat_info.st_mtime_ns + 1_000_000_000))
+
+def test_load_policies_from_file(tmp_path):
+    """Test loading hand-written policies with allow and deny effects"""
+    policy_file = tmp_path / "policies.json"
+    write_policies(policy_file, [
+        {"name": "llm-read", "resources": ["file:*"], "principals": ["llm-*"], "actions": ["read"]},
+        {"name": "no-secrets", "resources": ["file:secrets/*"], "principals": ["*"], "actions": ["read"], "effect": "deny"}
+    ])
+    service = AccessControlService()
+    loader = PolicyLoader(service, str(policy_file))
+    
+    assert loader.load() == True
+    assert [policy.id for policy in service.policies] == ["llm-read", "no-secrets"]
+    assert service.check_access(make_session("llm-agent"), "file:docs/readme.md", "read") == True
+    assert service.check_access(make_session("llm-agent"), "file:secrets/key.pem", "read") == False
+
+def test_load_example_policies():
+    """Test that the example policy file loads"""
+    service = AccessControlService()
+    loader = PolicyLoader(service, os.path.join("examples", "policies.json"))
+    
+    assert loader.load() == True
+    assert len(service.policies) == 3
+
+def test_load_missing_file(tmp_path):
+    """Test that a missing policy file leaves the policies unchanged"""
+    service = AccessControlService()
+    loader = PolicyLoader(service, str(tmp_path / "missing.json"))
+    
+    assert loader.load() == False
+    assert service.policies == []
+
+def test_reload_swaps_snapshot_on_change(tmp_path):
+    """Test that changes to the policy file are picked up"""
+    policy_file = tmp_path / "policies.json"
+    write_policies(policy_file, [{"name": "a", "resources": ["file:*"], "principals": ["*"], "actions": ["read"]}])
+    service = AccessControlService()
+    loader = PolicyLoader(service, str(policy_file))
+    loader.load()
+    snapshot = service._snapshot
+    
+    # Unchanged file is not reloaded
+    assert asyncio.run(loader.reload_if_changed()) == False
+    assert service._snapshot is snapshot
+    
+    write_policies(policy_file, [{"name": "b", "resources": ["file:*"], "principals": ["*"], "actions": ["list"]}])
+    assert asyncio.run(loader.reload_if_changed()) == True
+    assert [policy.id for policy in service.policies] == ["b"]
+    # The previous snapshot is left untouched for in-flight checks
+    assert [policy.id for policy in snapshot.policies] == ["a"]
+
+def test_reload_keeps_snapshot_on_invalid_file(tmp_path):
+    """Test that a broken policy file does not replace the active policies"""
+    policy_file = tmp_path / "policies.json"
+    write_policies(policy_file, [{"name": "a", "resources": ["file:*"], "principals": ["*"], "actions": ["read"]}])
+    service = AccessControlService()
+    loader = PolicyLoader(service, str(policy_file))
+    loader.load()
+    
+    with open(policy_file, "a") as f:
+        f.write("not json")
+    
+    assert asyncio.run(loader.reload_if_changed()) == False
+    assert [policy.id for policy in service.policies] == ["a"]
+
+def test_watcher_reloads_in_background(tmp_path):
+    """Test that the background watcher swaps in new policies"""
+    policy_file = tmp_path / "policies.json"
+    write_policies(policy_file, [])
+    service = AccessControlService()
+    loader = PolicyLoader(service, str(policy_file), poll_interval=0.01)
+    loader.load()
+    
+    async def run():
+        loader.start_watcher()
+        write_policies(policy_file, [{"name": "a", "resources": ["file:*"], "principals": ["*"], "actions": ["read"]}])
+        for _ in range(100):
+            if service.policies:
+                break
+            await asyncio.sleep(0.01)
+        await loader.stop_watcher()
+    
+    asyncio.run(run())
+    
+    assert [policy.id for policy in service.policies] == ["a"]
\ No newline at end of file
@@ -0,0 +1,98 @@
+import pytest
+from src.utils.rate_limiter import RateLimiter, RateLimits, retry_after_header
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+def test_bucket_spends_costs_and_refills():
+    """Test that requests spend tokens and are told how long to wait when out"""
+    clock = FakeClock()
+    limiter = RateLimiter(RateLimits(rate=2, burst=10), clock=clock)
+    
+    assert limiter.acquire("llm-agent", [], 8) == 0
+    limiter.release("llm-agent", [])
+    # 2 tokens left, 5 needed: 3 more at 2 per second
+    assert limiter.acquire("llm-agent", [], 5) == pytest.approx(1.5)
+    clock.now = 1.5
+    assert limiter.acquire("llm-agent", [], 5) == 0
+    assert limiter.get_stats()["rejected_rate"] == 1
+
+def test_principals_have_separate_buckets():
+    """Test that one principal running out does not limit another"""
+    limiter = RateLimiter(RateLimits(rate=1, burst=1), clock=FakeClock())
+    
+    assert limiter.acquire("llm-runaway", [], 1) == 0
+    assert limiter.acquire("llm-runaway", [], 1) > 0
+    assert limiter.acquire("llm-agent", [], 1) == 0
+
+def test_in_flight_cap():
+    """Test that requests beyond the concurrency cap are rejected until one finishes"""
+    limiter = RateLimiter(RateLimits(rate=100, burst=100, max_in_flight=2), clock=FakeClock())
+    
+    assert limiter.acquire("llm-agent", ["read"], 1) == 0
+    assert limiter.acquire("llm-agent", ["read"], 1) == 0
+    assert limiter.acquire("llm-agent", ["read"], 1) == 1.0
+    limiter.release("llm-agent", ["read"])
+    assert limiter.acquire("llm-agent", ["read"], 1) == 0
+    assert limiter.get_stats()["rejected_concurrency"] == 1
+
+def test_charge_spends_without_counting_in_flight():
+    """Test that charging an admitted request spends tokens only when there are enough"""
+    clock = FakeClock()
+    limiter = RateLimiter(RateLimits(rate=1, burst=10, max_in_flight=1), clock=clock)
+    
+    assert limiter.acquire("llm-agent", [], 1) == 0
+    assert limiter.charge("llm-agent", [], 6) == 0
+    # 3 tokens left; a failed charge spends nothing
+    assert limiter.charge("llm-agent", [], 5) == pytest.approx(2)
+    assert limiter.charge("llm-agent", [], 3) == 0
+    limiter.release("llm-agent", [])
+    clock.now = 1
+    assert limiter.acquire("llm-agent", [], 1) == 0
+
+def test_scope_selects_limits():
+    """Test that a scope with its own limits gives the session more headroom"""
+    limiter = RateLimiter(
+        RateLimits(rate=1, burst=1),
+        {"bulk": RateLimits(rate=100, burst=50)},
+        clock=FakeClock()
+    )
+    
+    assert limiter.limits_for(["read", "bulk"])[0] == "bulk"
+    for _ in range(50):
+        assert limiter.acquire("llm-indexer", ["read", "bulk"], 1) == 0
+    assert limiter.acquire("llm-indexer", ["read"], 1) == 0
+    assert limiter.acquire("llm-indexer", ["read"], 1) > 0
+
+def test_cost_above_burst_is_capped():
+    """Test that an operation costing more than the burst can still run on a full bucket"""
+    limiter = RateLimiter(RateLimits(rate=1, burst=5), clock=FakeClock())
+    
+    assert limiter.acquire("llm-agent", [], 20) == 0
+
+def test_idle_buckets_discarded():
+    """Test that full buckets with nothing in flight are dropped past the principal limit"""
+    clock = FakeClock()
+    limiter = RateLimiter(RateLimits(rate=1, burst=1), clock=clock, max_principals=2)
+    for principal in ("a", "b"):
+        limiter.acquire(principal, [], 1)
+        limiter.release(principal, [])
+    clock.now = 5
+    
+    limiter.acquire("c", [], 1)
+    
+    assert limiter.get_stats()["principals"] == 1
+
+def test_retry_after_header_rounds_up():
+    """Test that Retry-After is whole seconds and never zero"""
+    assert retry_after_header(0.2) == "1"
+    assert retry_after_header(2.1) == "3"
+
+def test_invalid_limits():
+    """Test that limits must be positive"""
+    with pytest.raises(ValueError):
+        RateLimits(rate=0, burst=1)
\ No newline at end of file
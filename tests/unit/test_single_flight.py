@@ -0,0 +1,107 @@
+import asyncio
+import os
+import pytest
+from src.utils.single_flight import SingleFlight
+
+def test_concurrent_identical_calls_share_one_computation():
+    """Test that callers arriving while a call runs get its result"""
+    group = SingleFlight()
+    calls = []
+    
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "result"
+    
+    async def run():
+        return await asyncio.gather(*(group.do("key", compute) for _ in range(20)))
+    
+    assert asyncio.run(run()) == ["result"] * 20
+    assert calls == [1]
+    assert group.get_stats() == {"executed": 1, "coalesced": 19, "in_flight": 0}
+
+def test_errors_reach_every_caller_and_are_not_cached():
+    """Test that an exception is raised in every waiter and the next call retries"""
+    group = SingleFlight()
+    calls = []
+    
+    async def fail():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise FileNotFoundError("missing")
+    
+    async def run():
+        return await asyncio.gather(*(group.do("key", fail) for _ in range(3)), return_exceptions=True)
+    
+    results = asyncio.run(run())
+    assert all(isinstance(result, FileNotFoundError) for result in results)
+    with pytest.raises(FileNotFoundError):
+        asyncio.run(group.do("key", fail))
+    assert len(calls) == 2
+
+def test_cancelled_caller_does_not_cancel_others():
+    """Test that one caller giving up leaves the shared computation running"""
+    group = SingleFlight()
+    
+    async def compute():
+        await asyncio.sleep(0.02)
+        return "result"
+    
+    async def run():
+        first = asyncio.create_task(group.do("key", compute))
+        second = asyncio.create_task(group.do("key", compute))
+        await asyncio.sleep(0.005)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+    
+    assert asyncio.run(run()) == "result"
+
+def test_computation_cancelled_when_every_caller_gives_up():
+    """Test that the shared computation stops once nobody waits for it"""
+    group = SingleFlight()
+    cancelled = []
+    
+    async def compute():
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.append(1)
+            raise
+    
+    async def run():
+        callers = [asyncio.create_task(group.do("key", compute)) for _ in range(2)]
+        await asyncio.sleep(0.005)
+        for caller in callers:
+            caller.cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.sleep(0)
+        # A new call starts a fresh computation instead of joining the cancelled one
+        return await group.do("key", lambda: asyncio.sleep(0, result="fresh"))
+    
+    assert asyncio.run(run()) == "fresh"
+    assert cancelled == [1]
+
+def test_directory_walk_coalesced(monkeypatch):
+    """Test that identical concurrent listings that miss the cache walk the directory once"""
+    from src.services.directory_service import DirectoryService
+    from src.utils.directory_cache import directory_cache
+    
+    os.makedirs(os.path.join("/tmp", "mcp_single_flight"), exist_ok=True)
+    directory_cache.clear()
+    get_directory_info = DirectoryService.get_directory_info
+    walks = []
+    
+    def counting_walk(dir_path):
+        walks.append(dir_path)
+        return get_directory_info(dir_path)
+    
+    monkeypatch.setattr(DirectoryService, "get_directory_info", staticmethod(counting_walk))
+    
+    async def run():
+        return await asyncio.gather(*(DirectoryService.get_directory_info_async("mcp_single_flight") for _ in range(20)))
+    
+    results = asyncio.run(run())
+    assert walks == ["mcp_single_flight"]
+    assert all(result is results[0] for result in results)
\ No newline at end of file
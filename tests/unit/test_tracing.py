@@ -0,0 +1,37 @@
+from src.utils.tracing import Trace, current_trace, end_trace, span, start_trace, traced
+
+def test_span_is_noop_without_trace():
+    """Test that spans record nothing when tracing is off"""
+    assert current_trace() is None
+    with span("disk_read"):
+        pass
+    assert current_trace() is None
+
+def test_spans_aggregate_into_current_trace():
+    """Test that repeated stages are summed and the trace is cleared afterwards"""
+    @traced("policy")
+    def check():
+        return True
+    
+    trace, token = start_trace()
+    try:
+        assert check() is True
+        assert check() is True
+        with span("disk_read"):
+            pass
+    finally:
+        end_trace(token)
+    
+    assert list(trace.spans) == ["policy", "disk_read"]
+    assert trace.spans["policy"][1] == 2
+    assert trace.to_dict()["disk_read"]["count"] == 1
+    assert current_trace() is None
+
+def test_server_timing_format():
+    """Test the Server-Timing header value"""
+    trace = Trace()
+    trace.add("validate_path", 0.0414)
+    trace.add("disk_read", 0.2)
+    trace.add("disk_read", 0.015)
+    
+    assert trace.server_timing() == "validate_path;dur=0.041, disk_read;dur=0.215"
\ No newline at end of file